@@ -8,12 +8,17 @@ SUPPORTED_FORMATS = {
     ".xlsx": "Excel 2007+ (*.xlsx)",
     ".xls": "Excel 97-2003 (*.xls)",
     ".csv": "Valores separados por comas (*.csv)",
+    ".parquet": "Apache Parquet (*.parquet)",
+    ".jsonl": "JSON Lines (*.jsonl)",
+    ".sqlite": "Base de datos SQLite (*.sqlite)",
+    ".sqlite3": "Base de datos SQLite (*.sqlite3)",
+    ".db": "Base de datos SQLite (*.db)",
     ".json": "JavaScript Object Notation (*.json)",
     ".txt": "Archivo de texto (*.txt)"
 }
 
 # Extensiones de archivo de entrada
-INPUT_EXTENSIONS = [".xlsx", ".xls"]
+INPUT_EXTENSIONS = [".xlsx", ".xls", ".csv", ".parquet", ".jsonl", ".sqlite", ".sqlite3", ".db"]
 
 # Extensiones de archivo de salida
 OUTPUT_EXTENSIONS = [".xlsx", ".csv", ".json", ".txt"]
@@ -94,7 +99,19 @@ MATRICULA_TYPES = {
 # Tipos de mapeo
 MAPPING_TYPES = {
     "simple": "Mapeo Simple",
-    "multi_column": "Mapeo Multi-columna"
+    "multi_column": "Mapeo Multi-columna",
+    "join": "Mapeo por Join (claves tipadas)",
+    "compact": "Mapeo Compacto (catálogos grandes)",
+    "range": "Mapeo por Rangos (tramos)"
+}
+
+# Políticas de normalización de claves de mapeo
+KEY_POLICIES = {
+    "text": "Texto exacto",
+    "integer": "Entero (1 = 1.0 = 001)",
+    "numeric": "Numérico (1.5 = 1.50)",
+    "zero_padded": "Código con ceros a la izquierda",
+    "date": "Fecha (AAAA-MM-DD)"
 }
 
 # Colores de interfaz
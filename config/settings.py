@@ -24,9 +24,19 @@ class AppSettings:
     window_min_height: int = 800
     
     # Configuración de archivos
-    max_file_size_mb: int = 100
-    supported_formats: tuple = (".xlsx", ".xls")
+    max_file_size_mb: int = 100  # Por encima de este tamaño el archivo fuente .xlsx se procesa por lotes
+    stream_chunk_rows: int = 50000  # Filas por lote al recorrer un archivo fuente por streaming
+    supported_formats: tuple = (".xlsx", ".xls", ".csv", ".parquet", ".jsonl", ".sqlite", ".sqlite3", ".db")
     default_export_format: str = ".xlsx"
+    reader_engine: str = "auto"  # auto (calamine si está instalado, si no xml), calamine, xml, openpyxl, xlrd
+    max_load_workers: int = 0  # Procesos para leer varias hojas en paralelo (0 = según CPU)
+    projected_load_enabled: bool = False  # Cargar del archivo fuente solo las columnas que usa la configuración
+    schema_load_enabled: bool = True  # Validar al cargar las filas que no cumplen los tipos declarados
+    
+    # Optimización de tipos tras la carga (category, enteros/flotantes reducidos, texto Arrow)
+    dtype_optimization_enabled: bool = True
+    category_max_ratio: float = 0.5  # Texto con hasta este porcentaje de valores distintos pasa a category
+    arrow_strings: bool = False  # Resto del texto como string[pyarrow] (requiere pyarrow)
     
     # Configuración de interfaz
     theme: str = "default"
@@ -38,6 +48,21 @@ class AppSettings:
     auto_backup: bool = True
     max_preview_rows: int = 100
     
+    # Configuración de cache de mapeos
+    mapping_cache_enabled: bool = True
+    mapping_cache_dir: str = "cache/mapeos"
+    mapping_cache_max_mb: int = 200
+    
+    # Configuración de cache de cargas (DataFrames ya leídos de Excel)
+    load_cache_enabled: bool = True
+    load_cache_dir: str = "cache/cargas"
+    load_cache_max_mb: int = 1000
+    load_cache_format: str = "parquet"  # parquet, feather o pickle
+    
+    # Copias en disco (Arrow IPC) de los datos cargados para los procesos trabajadores
+    snapshot_dir: str = "cache/snapshots"
+    max_split_workers: int = 0  # Procesos para escribir las partes de una división (0 = según CPU)
+    
     # Configuración de logging
     log_level: str = "INFO"
     log_file: str = "excel_builder.log"
@@ -8,11 +8,19 @@ from .column_manager import ColumnManager
 from .numeric_generator import NumericGenerator
 from .mapping_manager import MappingManager
 from .export_manager import ExportManager
+from .disk_cache import DiskCache
+from .mapping_index import MappingIndex
+from .mapping_registry import MappingRegistry
+from .background_loader import BackgroundLoader
 
 __all__ = [
     'FileManager',
     'ColumnManager', 
     'NumericGenerator',
     'MappingManager',
-    'ExportManager'
+    'ExportManager',
+    'DiskCache',
+    'MappingIndex',
+    'MappingRegistry',
+    'BackgroundLoader'
 ]
\ No newline at end of file
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Carga de archivos en segundo plano para no bloquear la interfaz
+"""
+
+import logging
+import queue
+import threading
+from typing import Any, Callable, List, Optional, Tuple
+
+from utils.exceptions import LoadCancelledError
+
+class BackgroundLoader:
+    """
+    Ejecutar una tarea de carga en un hilo y entregar sus eventos al hilo de la interfaz.
+
+    La tarea recibe el propio cargador para publicar eventos (vista previa, avance) y
+    consultar cancel_event. La interfaz recoge los eventos con poll() desde su bucle
+    (en Tk, con after()), de modo que los widgets solo se tocan desde el hilo principal.
+    Eventos: ('preview', datos), ('progress', (porcentaje, mensaje)), ('done', resultado),
+    ('error', excepción) y ('cancelled', None).
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.cancel_event = threading.Event()
+        self._events: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, task: Callable[['BackgroundLoader'], Any]):
+        """Iniciar la tarea en un hilo nuevo (solo una a la vez)"""
+        if self.is_running():
+            raise RuntimeError("Ya hay una carga en curso")
+
+        self.cancel_event = threading.Event()
+        self._events = queue.Queue()
+        self._thread = threading.Thread(target=self._run, args=(task,), name="carga-archivo", daemon=True)
+        self._thread.start()
+
+    def _run(self, task: Callable[['BackgroundLoader'], Any]):
+        """Ejecutar la tarea y publicar su resultado, su error o su cancelación"""
+        try:
+            result = task(self)
+            self.publish('done', result)
+        except LoadCancelledError:
+            self.publish('cancelled', None)
+        except Exception as e:
+            self.logger.error(f"Error en la carga en segundo plano: {e}")
+            self.publish('error', e)
+
+    def publish(self, kind: str, payload: Any = None):
+        """Publicar un evento para el hilo de la interfaz"""
+        self._events.put((kind, payload))
+
+    def report_progress(self, percent: float, message: str):
+        """Publicar el avance de la tarea (compatible con progress_callback de FileManager)"""
+        self.publish('progress', (percent, message))
+
+    def cancel(self):
+        """Pedir la cancelación; la tarea se detiene en su siguiente etapa"""
+        self.cancel_event.set()
+
+    def is_running(self) -> bool:
+        """Indicar si la tarea sigue en ejecución"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def poll(self) -> List[Tuple[str, Any]]:
+        """Recoger los eventos publicados desde la última consulta"""
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Esperar a que termine la tarea; devuelve True si terminó"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.is_running()
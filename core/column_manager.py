@@ -3,10 +3,54 @@
 Gestor de configuración de columnas
 """
 
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Sequence
 import logging
 from models.column_config import ColumnConfig, DataType
 
+# Nombres comunes de columnas de agrupación y palabras clave con que se buscan en la fuente
+GROUPING_NAME_MAPPINGS = {
+    'nombre programa': ['nombre', 'programa'],
+    'fecha': ['fecha'],
+    'fecha (dd/mm/aa)': ['fecha'],
+    'tema': ['tema', 'nombre', 'programa'],
+    'programa': ['programa', 'nombre'],
+    'nombre': ['nombre', 'programa']
+}
+
+def find_grouping_column(group_col: str, columns: Sequence[Any]) -> Optional[Any]:
+    """
+    Buscar la columna fuente que corresponde a una columna de agrupación: por nombre
+    exacto, sin distinguir mayúsculas, por palabras clave y, como último recurso, por
+    similitud de palabras. Devuelve None si ninguna coincide.
+    """
+    # 1. Búsqueda exacta
+    if group_col in columns:
+        return group_col
+    
+    group_lower = group_col.lower()
+    
+    # 2. Búsqueda por nombre en minúsculas
+    for col in columns:
+        if str(col).lower() == group_lower:
+            return col
+    
+    # 3. Búsqueda por palabras clave específicas
+    for key, keywords in GROUPING_NAME_MAPPINGS.items():
+        if any(keyword in group_lower for keyword in [key] + keywords):
+            for col in columns:
+                if any(keyword in str(col).lower() for keyword in keywords):
+                    return col
+    
+    # 4. Búsqueda por similitud (último recurso)
+    group_words = set(group_lower.split())
+    for col in columns:
+        col_words = set(str(col).lower().split())
+        if group_words and col_words:
+            similarity = len(group_words.intersection(col_words)) / len(group_words.union(col_words))
+            if similarity > 0.3:  # 30% de similitud
+                return col
+    return None
+
 class ColumnManager:
     """Gestor para configuración y manejo de columnas"""
     
@@ -120,6 +164,42 @@ class ColumnManager:
         """Obtener columnas que provienen del archivo fuente"""
         return [col for col in self.columns if col.source_column and not col.is_generated]
     
+    def get_referenced_source_columns(self, available_columns: Optional[Sequence[Any]] = None) -> List[str]:
+        """
+        Obtener las columnas del archivo fuente que usa la configuración (origen, mapeo y agrupación).
+        
+        Con available_columns (los encabezados de la fuente), las columnas de agrupación se
+        resuelven con las mismas reglas que la exportación (find_grouping_column).
+        """
+        referenced = []
+        for col in self.get_all_columns():
+            referenced.append(col.source_column)
+            referenced.append(col.mapping_source)
+            for group_col in col.numeric_grouping_columns or []:
+                if available_columns is not None:
+                    group_col = find_grouping_column(group_col, available_columns) or group_col
+                referenced.append(group_col)
+        return list(dict.fromkeys(name for name in referenced if name))
+    
+    def get_source_schema(self) -> Dict[str, str]:
+        """
+        Obtener el tipo de dato declarado para cada columna fuente ({columna: tipo}).
+        
+        Las columnas fuente usadas con tipos distintos quedan fuera: su tipo se infiere al cargar.
+        """
+        schema: Dict[str, str] = {}
+        conflicts = set()
+        for col in self.get_all_columns():
+            if col.is_generated or not col.source_column:
+                continue
+            declared = schema.setdefault(col.source_column, col.data_type.value)
+            if declared != col.data_type.value:
+                conflicts.add(col.source_column)
+        
+        if conflicts:
+            self.logger.info(f"Columnas fuente con tipos distintos, se inferirá su tipo: {sorted(conflicts)}")
+        return {name: data_type for name, data_type in schema.items() if name not in conflicts}
+    
     def get_generated_columns(self) -> List[ColumnConfig]:
         """Obtener columnas generadas"""
         return [col for col in self.columns if col.is_generated]
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Cache en disco para estructuras derivadas de archivos Excel
+"""
+
+import hashlib
+import importlib.util
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import pandas as pd
+
+# Memoria de huellas ya calculadas en esta sesión: (ruta, tamaño, mtime) -> hash de contenido
+_content_hash_memo: Dict[Tuple[str, int, int], str] = {}
+
+def file_fingerprint(file_path: str) -> Dict[str, Any]:
+    """Obtener la huella de un archivo: ruta, tamaño, fecha de modificación y hash del contenido"""
+    path = Path(file_path).resolve()
+    stat = path.stat()
+    memo_key = (str(path), stat.st_size, stat.st_mtime_ns)
+
+    content_hash = _content_hash_memo.get(memo_key)
+    if content_hash is None:
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        content_hash = digest.hexdigest()
+        _content_hash_memo[memo_key] = content_hash
+
+    return {
+        'path': str(path),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'content_hash': content_hash
+    }
+
+class DiskCache:
+    """Cache en disco con desalojo LRU por tamaño total"""
+
+    def __init__(self, cache_dir: str, max_size_mb: int = 200, suffix: str = ".pkl"):
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.suffix = suffix
+        self.logger = logging.getLogger(__name__)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Crear clave de cache estable a partir de sus componentes"""
+        return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        """Ruta del archivo de una entrada"""
+        return self.cache_dir / f"{key}{self.suffix}"
+
+    def _load(self, path: Path) -> Any:
+        """Leer el contenido de una entrada"""
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def _dump(self, value: Any, path: Path):
+        """Escribir el contenido de una entrada"""
+        with open(path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Obtener una entrada del cache o None si no existe"""
+        path = self._entry_path(key)
+        if not path.exists():
+            self.misses += 1
+            return None
+
+        try:
+            value = self._load(path)
+            # Actualizar fecha de uso para el desalojo LRU
+            os.utime(path, None)
+            self.hits += 1
+            return value
+        except Exception as e:
+            self.logger.warning(f"Entrada de cache inválida {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any) -> bool:
+        """Guardar una entrada en el cache"""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._entry_path(key)
+            temp_path = path.with_suffix(path.suffix + ".tmp")
+
+            self._dump(value, temp_path)
+            os.replace(temp_path, path)
+
+            self.evict()
+            return True
+        except Exception as e:
+            self.logger.error(f"Error guardando entrada de cache: {e}")
+            return False
+
+    def evict(self) -> int:
+        """Eliminar las entradas menos usadas hasta respetar el tamaño máximo"""
+        if not self.cache_dir.exists():
+            return 0
+
+        entries = [(p, p.stat()) for p in self.cache_dir.glob(f"*{self.suffix}")]
+        total_size = sum(stat.st_size for _, stat in entries)
+        removed = 0
+
+        for path, stat in sorted(entries, key=lambda entry: entry[1].st_mtime):
+            if total_size <= self.max_size_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= stat.st_size
+            removed += 1
+
+        if removed:
+            self.logger.info(f"Cache: {removed} entradas desalojadas")
+        return removed
+
+    def clear(self):
+        """Eliminar todas las entradas del cache"""
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob(f"*{self.suffix}"):
+                path.unlink(missing_ok=True)
+        self.logger.info("Cache limpiado")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Obtener estadísticas de uso del cache"""
+        entries = list(self.cache_dir.glob(f"*{self.suffix}")) if self.cache_dir.exists() else []
+        return {
+            'entries': len(entries),
+            'size_mb': round(sum(p.stat().st_size for p in entries) / (1024 * 1024), 2),
+            'max_size_mb': round(self.max_size_bytes / (1024 * 1024), 2),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+class FrameCache(DiskCache):
+    """
+    Cache en disco de DataFrames leídos de Excel.
+
+    Guarda en Parquet o Feather cuando pyarrow está instalado; los DataFrames que
+    el formato columnar no admite (columnas de tipos mezclados, nombres no
+    textuales) y las instalaciones sin pyarrow usan pickle.
+    """
+
+    def __init__(self, cache_dir: str, max_size_mb: int = 1000, file_format: str = "parquet"):
+        super().__init__(cache_dir, max_size_mb, suffix=".frame")
+        if file_format in ("parquet", "feather") and importlib.util.find_spec("pyarrow") is None:
+            self.logger.info("pyarrow no está instalado: el cache de cargas usará pickle")
+            file_format = "pickle"
+        self.file_format = file_format
+
+    def _load(self, path: Path) -> Any:
+        """Leer una entrada detectando su formato por la cabecera del archivo"""
+        with open(path, 'rb') as f:
+            magic = f.read(6)
+        if magic[:4] == b'PAR1':
+            return pd.read_parquet(path)
+        if magic == b'ARROW1':
+            return pd.read_feather(path)
+        return super()._load(path)
+
+    def _dump(self, value: Any, path: Path):
+        """Escribir una entrada en formato columnar si es posible"""
+        if isinstance(value, pd.DataFrame) and self.file_format in ("parquet", "feather"):
+            try:
+                if self.file_format == "parquet":
+                    value.to_parquet(path)
+                else:
+                    value.to_feather(path)
+                return
+            except Exception as e:
+                self.logger.debug(f"DataFrame no admitido por {self.file_format}, se usa pickle: {e}")
+        super()._dump(value, path)
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Optimización de tipos de datos de los DataFrames cargados
+"""
+
+import logging
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from pandas.api.types import (infer_dtype, is_bool_dtype, is_float_dtype, is_integer_dtype,
+                              is_object_dtype, is_string_dtype)
+
+logger = logging.getLogger(__name__)
+
+def arrow_string_dtype() -> Optional[Any]:
+    """Tipo de texto respaldado por Arrow con NaN como valor faltante (None si no hay pyarrow)"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return None
+    try:
+        return pd.StringDtype('pyarrow', na_value=np.nan)
+    except TypeError:
+        # pandas < 2.3: mismo comportamiento con el alias 'pyarrow_numpy'
+        try:
+            return pd.StringDtype('pyarrow_numpy')
+        except (TypeError, ValueError):
+            return None
+
+def _column_memory(series: pd.Series) -> int:
+    """Memoria de una columna en bytes, incluyendo el contenido de los textos"""
+    return int(series.memory_usage(deep=True, index=False))
+
+def _optimize_text(series: pd.Series, category_max_ratio: float, string_dtype: Optional[Any]) -> pd.Series:
+    """Convertir texto de baja cardinalidad a category y, opcionalmente, el resto a texto Arrow"""
+    # Solo columnas de texto puro: las mezclas de números y texto conservan sus valores originales
+    if infer_dtype(series, skipna=True) != 'string':
+        return series
+
+    if len(series) and series.nunique(dropna=True) <= len(series) * category_max_ratio:
+        candidate = series.astype('category')
+    elif string_dtype is not None and series.dtype != string_dtype:
+        candidate = series.astype(string_dtype)
+    else:
+        return series
+
+    return candidate if _column_memory(candidate) < _column_memory(series) else series
+
+def _optimize_number(series: pd.Series) -> pd.Series:
+    """Reducir enteros al tipo más pequeño y flotantes a float32 solo si no se pierde precisión"""
+    if is_integer_dtype(series):
+        return pd.to_numeric(series, downcast='integer')
+
+    if series.dtype == np.float64:
+        candidate = series.astype(np.float32)
+        if np.array_equal(candidate.to_numpy(dtype=np.float64), series.to_numpy(), equal_nan=True):
+            return candidate
+    return series
+
+def optimize_dtypes(df: pd.DataFrame,
+                    category_max_ratio: float = 0.5,
+                    arrow_strings: bool = False) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Reducir la memoria de un DataFrame recién cargado.
+
+    El texto con pocos valores distintos (hasta category_max_ratio del total de filas)
+    pasa a category; con arrow_strings el resto del texto pasa a texto Arrow. Los enteros
+    se reducen al tipo más pequeño y los flotantes a float32 cuando los valores no cambian.
+    Los valores faltantes siguen siendo NaN. Devuelve el DataFrame optimizado y un informe
+    con la memoria antes y después.
+    """
+    string_dtype = arrow_string_dtype() if arrow_strings else None
+    if arrow_strings and string_dtype is None:
+        logger.warning("pyarrow no está instalado: el texto se mantiene con el tipo de pandas")
+
+    memory_before = int(df.memory_usage(deep=True).sum())
+    optimized = {}
+    conversions = {}
+
+    for position, col in enumerate(df.columns):
+        series = df.iloc[:, position]
+        if is_bool_dtype(series):
+            continue
+        if is_object_dtype(series) or is_string_dtype(series):
+            result = _optimize_text(series, category_max_ratio, string_dtype)
+        elif is_integer_dtype(series) or is_float_dtype(series):
+            result = _optimize_number(series)
+        else:
+            continue
+
+        if result is not series:
+            optimized[position] = result
+            conversions[col] = f"{series.dtype} -> {result.dtype}"
+
+    if optimized:
+        df = df.copy(deep=False)
+        for position, series in optimized.items():
+            df.isetitem(position, series)
+
+    memory_after = int(df.memory_usage(deep=True).sum())
+    report = {
+        'memory_before_mb': round(memory_before / (1024 * 1024), 2),
+        'memory_after_mb': round(memory_after / (1024 * 1024), 2),
+        'saved_percent': round(100 * (1 - memory_after / memory_before), 1) if memory_before else 0.0,
+        'conversions': conversions
+    }
+
+    if conversions:
+        logger.info(f"Tipos optimizados en {len(conversions)} columnas: "
+                    f"{report['memory_before_mb']:.2f} MB -> {report['memory_after_mb']:.2f} MB "
+                    f"({report['saved_percent']}% menos)")
+    return df, report
@@ -3,9 +3,11 @@
 Gestor de exportación de archivos Excel - Versión Optimizada
 """
 
+import hashlib
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Callable, Tuple
 import logging
 from datetime import datetime
 from openpyxl import Workbook
@@ -13,6 +15,9 @@ from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils.dataframe import dataframe_to_rows
 from config.settings import AppSettings
 from models.column_config import ColumnConfig, DataType
+from core.mapping_index import normalize_keys, normalize_text_keys, summarize_lookup, merge_lookup_stats
+from core.mapping_registry import mapping_config_key
+from core.column_manager import find_grouping_column
 
 class ExportManager:
     """Gestor para exportación de archivos Excel con formato - Versión Optimizada"""
@@ -21,6 +26,7 @@ class ExportManager:
         self.settings = settings
         self.workbook = None
         self.worksheet = None
+        self.last_export_path: Optional[Path] = None
         self.mapping_config = None
         self.mapping_manager = None
         # Inicializar el generador numérico inmediatamente
@@ -32,6 +38,138 @@ class ExportManager:
         self._mapping_cache = {}
         self._date_format_cache = {}
         self._column_letter_cache = {}
+        self._lookup_tables = {}
+        self._key_tables: Dict[Tuple, Tuple] = {}  # Índices de búsqueda por (columna clave, política, huella de claves)
+        self._value_matrices: Dict[Tuple, np.ndarray] = {}  # Valores de las columnas de cada grupo de mapeos
+        
+        # Valores de mapeo resueltos por columna y estadísticas de aciertos/fallos
+        self._resolved_columns: Dict[int, np.ndarray] = {}
+        self.mapping_stats: Dict[str, Dict[str, Any]] = {}
+        
+    def _uses_dynamic_mapping(self, col_config: ColumnConfig) -> bool:
+        """Indicar si la columna tiene configuración de mapeo dinámico"""
+        return bool(getattr(col_config, 'mapping_source', None) and
+                    getattr(col_config, 'mapping_key_column', None) and
+                    getattr(col_config, 'mapping_value_column', None) and
+                    self.mapping_config)
+    
+    def _key_policy(self, col_config: ColumnConfig) -> str:
+        """Política de normalización de claves de una columna con mapeo"""
+        return getattr(col_config, 'mapping_key_policy', None) or 'text'
+    
+    def _get_mapping_data(self, col_config: ColumnConfig) -> Optional[Dict]:
+        """Obtener el diccionario de mapeo de una columna por (columna clave, columna valor)"""
+        config_key = mapping_config_key(col_config.mapping_key_column, col_config.mapping_value_column,
+                                        self._key_policy(col_config))
+        if config_key in self.mapping_config:
+            return self.mapping_config[config_key]
+        # Compatibilidad con configuraciones indexadas solo por la columna clave
+        return self.mapping_config.get(col_config.mapping_key_column)
+    
+    def _get_lookup_table(self, table_key: Tuple, mapping_data: Dict,
+                          key_policy: str = 'text') -> Tuple[pd.Index, pd.Index, np.ndarray, np.ndarray]:
+        """Obtener índices de búsqueda (exacto y sin mayúsculas) de un mapeo"""
+        if table_key not in self._lookup_tables:
+            mapping_keys = pd.Index(list(mapping_data.keys()), dtype=object)
+            mapping_values = pd.Series(list(mapping_data.values()), dtype=object).to_numpy()
+            
+            if key_policy != 'text':
+                # Las claves ya normalizadas no cambian; las de configuraciones antiguas sí
+                mapping_keys = pd.Index(normalize_keys(mapping_keys, key_policy), dtype=object)
+                last = ~mapping_keys.duplicated(keep='last')
+                mapping_keys, mapping_values = mapping_keys[last], mapping_values[last]
+            
+            # Los mapeos con las mismas claves comparten los índices de búsqueda
+            keys_digest = hashlib.blake2b(
+                pd.util.hash_pandas_object(mapping_keys, index=False).to_numpy().tobytes(), digest_size=16
+            ).hexdigest()
+            shared_key = (table_key[0], key_policy, len(mapping_keys), keys_digest)
+            key_tables = self._key_tables.get(shared_key)
+            
+            if key_tables is None:
+                # Para la comparación sin mayúsculas gana la primera clave, como en la búsqueda fila a fila
+                folded_keys = pd.Series(normalize_text_keys(mapping_keys), dtype=object).str.lower()
+                first_folded = ~folded_keys.duplicated(keep='first').to_numpy()
+                key_tables = (
+                    mapping_keys,
+                    pd.Index(folded_keys[first_folded]),
+                    np.flatnonzero(first_folded)
+                )
+                self._key_tables[shared_key] = key_tables
+            
+            self._lookup_tables[table_key] = (*key_tables, mapping_values)
+        return self._lookup_tables[table_key]
+    
+    def _locate_keys(self, keys: np.ndarray, exact_index: pd.Index, folded_index: pd.Index,
+                     folded_positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Resolver la posición de cada clave en el mapeo: devuelve posiciones (-1 si no existe), aciertos exactos y aciertos sin distinguir mayúsculas"""
+        positions = exact_index.get_indexer(keys)
+        hits = positions >= 0
+        
+        # Búsqueda sin distinguir mayúsculas solo para las claves no encontradas
+        casefold_hits = np.zeros(len(keys), dtype=bool)
+        if not hits.all() and len(folded_index):
+            folded = folded_index.get_indexer(pd.Series(keys[~hits], dtype=object).str.lower())
+            casefold_hits[~hits] = folded >= 0
+            positions[casefold_hits] = folded_positions[folded[folded >= 0]]
+        
+        return positions, hits, casefold_hits
+    
+    def _resolve_mapped_columns(self, data: pd.DataFrame, columns_config: List[ColumnConfig]):
+        """Resolver de forma vectorizada todas las columnas con mapeo dinámico y registrar aciertos/fallos"""
+        self._resolved_columns.clear()
+        
+        # Agrupar las columnas que buscan la misma columna fuente en las mismas claves
+        groups: Dict[Tuple[str, str, int], List[Tuple[ColumnConfig, Tuple, Tuple]]] = {}
+        for col_config in columns_config:
+            if getattr(col_config, 'is_numeric_generator', False) or not self._uses_dynamic_mapping(col_config):
+                continue
+            
+            if col_config.mapping_source not in data.columns:
+                self._resolved_columns[id(col_config)] = np.full(len(data), '', dtype=object)
+                continue
+            
+            mapping_data = self._get_mapping_data(col_config)
+            if mapping_data is None:
+                self._resolved_columns[id(col_config)] = normalize_text_keys(data[col_config.mapping_source])
+                continue
+            
+            key_policy = self._key_policy(col_config)
+            table_key = mapping_config_key(col_config.mapping_key_column, col_config.mapping_value_column, key_policy)
+            lookup_table = self._get_lookup_table(table_key, mapping_data, key_policy)
+            group_key = (col_config.mapping_source, key_policy, id(lookup_table[0]))
+            groups.setdefault(group_key, []).append((col_config, table_key, lookup_table))
+        
+        for (source_column, key_policy, _), members in groups.items():
+            exact_index, folded_index, folded_positions, _ = members[0][2]
+            
+            # Una sola búsqueda de claves para todas las columnas valor del grupo
+            source_text = normalize_text_keys(data[source_column])
+            keys = source_text if key_policy == 'text' else normalize_keys(source_text, key_policy)
+            positions, hits, casefold_hits = self._locate_keys(keys, exact_index, folded_index, folded_positions)
+            found = positions >= 0
+            
+            # Si no se encuentra, se devuelve el valor original. La matriz de valores del grupo
+            # se construye una vez por exportación, como los índices de búsqueda
+            matrix_key = tuple(table_key for _, table_key, _ in members)
+            value_matrix = self._value_matrices.get(matrix_key)
+            if value_matrix is None:
+                value_matrix = np.column_stack([lookup_table[3] for _, _, lookup_table in members])
+                self._value_matrices[matrix_key] = value_matrix
+            gathered = value_matrix[positions[found]]
+            lookup_stats = summarize_lookup(source_text, hits, casefold_hits, 'casefold_hits')
+            
+            for column_index, (col_config, _, _) in enumerate(members):
+                values = source_text.copy()
+                values[found] = gathered[:, column_index]
+                self._resolved_columns[id(col_config)] = values
+                
+                column_stats = self.mapping_stats.setdefault(col_config.display_name, {
+                    'source_column': col_config.mapping_source,
+                    'key_column': col_config.mapping_key_column,
+                    'value_column': col_config.mapping_value_column
+                })
+                merge_lookup_stats(column_stats, lookup_stats)
         
     def _preprocess_numeric_groups(self, data: pd.DataFrame, col_config: ColumnConfig):
         """Pre-procesar grupos para asignar números correctamente"""
@@ -41,60 +179,16 @@ class ExportManager:
         # Limpiar contadores existentes
         self.numeric_generator.counters.clear()
         
+        # Resolver las columnas de agrupación una vez (todas las filas comparten encabezados)
+        grouping_cols = [find_grouping_column(group_col, data.columns)
+                         for group_col in col_config.numeric_grouping_columns]
+        
         # Procesar todos los datos para identificar grupos únicos
         unique_groups = set()
         for _, row in data.iterrows():
             group_values = []
-            for group_col in col_config.numeric_grouping_columns:
-                # Buscar la columna con diferentes variaciones del nombre
-                found_col = None
-                
-                # 1. Búsqueda exacta
-                if group_col in row.index:
-                    found_col = group_col
-                # 2. Búsqueda por nombre en minúsculas
-                elif group_col.lower() in [col.lower() for col in row.index]:
-                    for col in row.index:
-                        if col.lower() == group_col.lower():
-                            found_col = col
-                            break
-                # 3. Búsqueda por palabras clave específicas
-                else:
-                    # Mapeo de nombres comunes
-                    name_mappings = {
-                        'nombre programa': ['nombre', 'programa'],
-                        'fecha': ['fecha'],
-                        'fecha (dd/mm/aa)': ['fecha'],
-                        'tema': ['tema', 'nombre', 'programa'],
-                        'programa': ['programa', 'nombre'],
-                        'nombre': ['nombre', 'programa']
-                    }
-                    
-                    # Buscar en el mapeo
-                    for key, keywords in name_mappings.items():
-                        if any(keyword in group_col.lower() for keyword in [key] + keywords):
-                            # Buscar columnas que contengan estas palabras clave
-                            for col in row.index:
-                                col_lower = col.lower()
-                                if any(keyword in col_lower for keyword in keywords):
-                                    found_col = col
-                                    break
-                            if found_col:
-                                break
-                
-                # 4. Búsqueda por similitud (último recurso)
-                if not found_col:
-                    for col in row.index:
-                        # Si más del 70% de las palabras coinciden
-                        group_words = set(group_col.lower().split())
-                        col_words = set(col.lower().split())
-                        if group_words and col_words:
-                            similarity = len(group_words.intersection(col_words)) / len(group_words.union(col_words))
-                            if similarity > 0.3:  # 30% de similitud
-                                found_col = col
-                                break
-                
-                if found_col:
+            for found_col in grouping_cols:
+                if found_col is not None:
                     group_value = str(row[found_col])
                     group_values.append(group_value)
             
@@ -108,7 +202,8 @@ class ExportManager:
         
         self.logger.info(f"Pre-procesados {len(unique_groups)} grupos únicos para generador numérico")
     
-    def _get_column_value(self, row: pd.Series, col_config: ColumnConfig, full_data: pd.DataFrame = None) -> Any:
+    def _get_column_value(self, row: pd.Series, col_config: ColumnConfig, full_data: pd.DataFrame = None,
+                          row_position: int = None) -> Any:
         """Obtener valor de columna según configuración, aplicando mapeos y generadores si están configurados"""
         
         # Si es un generador numérico, generar valor
@@ -119,55 +214,8 @@ class ExportManager:
                     # Crear clave de grupo basada en los valores de las columnas de agrupación
                     group_values = []
                     for group_col in col_config.numeric_grouping_columns:
-                        # Buscar la columna con diferentes variaciones del nombre
-                        found_col = None
-                        
-                        # 1. Búsqueda exacta
-                        if group_col in row.index:
-                            found_col = group_col
-                        # 2. Búsqueda por nombre en minúsculas
-                        elif group_col.lower() in [col.lower() for col in row.index]:
-                            for col in row.index:
-                                if col.lower() == group_col.lower():
-                                    found_col = col
-                                    break
-                        # 3. Búsqueda por palabras clave específicas
-                        else:
-                            # Mapeo de nombres comunes
-                            name_mappings = {
-                                'nombre programa': ['nombre', 'programa'],
-                                'fecha': ['fecha'],
-                                'fecha (dd/mm/aa)': ['fecha'],
-                                'tema': ['tema', 'nombre', 'programa'],
-                                'programa': ['programa', 'nombre'],
-                                'nombre': ['nombre', 'programa']
-                            }
-                            
-                            # Buscar en el mapeo
-                            for key, keywords in name_mappings.items():
-                                if any(keyword in group_col.lower() for keyword in [key] + keywords):
-                                    # Buscar columnas que contengan estas palabras clave
-                                    for col in row.index:
-                                        col_lower = col.lower()
-                                        if any(keyword in col_lower for keyword in keywords):
-                                            found_col = col
-                                            break
-                                    if found_col:
-                                        break
-                        
-                        # 4. Búsqueda por similitud (último recurso)
-                        if not found_col:
-                            for col in row.index:
-                                # Si más del 70% de las palabras coinciden
-                                group_words = set(group_col.lower().split())
-                                col_words = set(col.lower().split())
-                                if group_words and col_words:
-                                    similarity = len(group_words.intersection(col_words)) / len(group_words.union(col_words))
-                                    if similarity > 0.3:  # 30% de similitud
-                                        found_col = col
-                                        break
-                        
-                        if found_col:
+                        found_col = find_grouping_column(group_col, row.index)
+                        if found_col is not None:
                             group_value = str(row[found_col])
                             group_values.append(group_value)
                     
@@ -200,29 +248,36 @@ class ExportManager:
             hasattr(col_config, 'mapping_value_column') and col_config.mapping_value_column and 
             self.mapping_config):
             
+            # Usar el valor ya resuelto de forma vectorizada si está disponible
+            resolved = self._resolved_columns.get(id(col_config))
+            if resolved is not None and row_position is not None:
+                return resolved[row_position]
+            
             try:
                 # Obtener valor de la columna fuente
                 if col_config.mapping_source in row.index:
                     source_value = str(row[col_config.mapping_source]).strip()
+                    key_policy = self._key_policy(col_config)
+                    lookup_value = source_value if key_policy == 'text' else normalize_keys([source_value], key_policy)[0]
                     
                     # Usar cache para mapeos
-                    cache_key = f"{col_config.mapping_key_column}_{source_value}"
+                    cache_key = (col_config.mapping_key_column, col_config.mapping_value_column, key_policy, source_value)
                     if cache_key in self._mapping_cache:
                         return self._mapping_cache[cache_key]
                     
                     # Buscar en la configuración de mapeo
-                    if col_config.mapping_key_column in self.mapping_config:
-                        mapping_data = self.mapping_config[col_config.mapping_key_column]
+                    mapping_data = self._get_mapping_data(col_config)
+                    if mapping_data is not None:
                         
                         # Buscar el valor en el mapeo (comparación exacta primero, luego case-insensitive)
-                        if source_value in mapping_data:
-                            result = mapping_data[source_value]
+                        if lookup_value in mapping_data:
+                            result = mapping_data[lookup_value]
                             self._mapping_cache[cache_key] = result
                             return result
                         
                         # Buscar con comparación case-insensitive
                         for key, value in mapping_data.items():
-                            if str(key).strip().lower() == source_value.lower():
+                            if str(key).strip().lower() == lookup_value.lower():
                                 result = value
                                 self._mapping_cache[cache_key] = result
                                 return result
@@ -263,6 +318,10 @@ class ExportManager:
             
             # Limpiar cache
             self._mapping_cache.clear()
+            self._lookup_tables.clear()
+            self._key_tables.clear()
+            self._value_matrices.clear()
+            self.mapping_stats = {}
             
             # Pre-procesar grupos numéricos para todas las columnas que lo necesiten
             for col_config in columns_config:
@@ -272,6 +331,9 @@ class ExportManager:
             # Limitar filas si se especifica
             preview_data = data.head(max_rows) if max_rows else data
             
+            # Resolver mapeos dinámicos de la vista previa
+            self._resolve_mapped_columns(preview_data, columns_config)
+            
             # Crear DataFrame de vista previa
             preview_df = pd.DataFrame()
             
@@ -279,8 +341,8 @@ class ExportManager:
             for col_config in columns_config:
                 column_values = []
                 
-                for idx, row in preview_data.iterrows():
-                    value = self._get_column_value(row, col_config, data)
+                for position, (idx, row) in enumerate(preview_data.iterrows()):
+                    value = self._get_column_value(row, col_config, data, row_position=position)
                     formatted_value = self._format_value(value, col_config)
                     column_values.append(formatted_value)
                 
@@ -402,6 +464,9 @@ class ExportManager:
         self._mapping_cache.clear()
         self._date_format_cache.clear()
         self._column_letter_cache.clear()
+        # Los índices de búsqueda de los mapeos se conservan entre partes de una misma
+        # exportación; se reconstruyen al inicio de la siguiente exportación o vista previa
+        self._resolved_columns.clear()
         self.logger.info("Recursos de exportación limpiados")
     
     def export_excel(self, source_data: pd.DataFrame, column_configs: List[ColumnConfig], 
@@ -416,6 +481,10 @@ class ExportManager:
             self._mapping_cache.clear()
             self._date_format_cache.clear()
             self._column_letter_cache.clear()
+            self._lookup_tables.clear()
+            self._key_tables.clear()
+            self._value_matrices.clear()
+            self.mapping_stats = {}
             
             if progress_callback:
                 progress_callback(10)
@@ -447,7 +516,9 @@ class ExportManager:
             
             # Crear archivo Excel
             sheet_name = export_config.get('sheet_name', 'Datos') if export_config else 'Datos'
-            success = self.create_excel_file(source_data, column_configs, output_file, sheet_name)
+            include_report = bool(export_config and export_config.get('include_mapping_report'))
+            success = self.create_excel_file(source_data, column_configs, output_file, sheet_name,
+                                             include_mapping_report=include_report)
             
             if progress_callback:
                 progress_callback(90)
@@ -462,7 +533,8 @@ class ExportManager:
                 'success': True,
                 'file_path': output_file,
                 'rows_processed': len(source_data),
-                'files_created': 1
+                'files_created': 1,
+                'mapping_stats': self.mapping_stats
             }
             
         except PermissionError as pe:
@@ -591,7 +663,8 @@ class ExportManager:
         return str(value)
     
     def create_excel_file(self, source_data: pd.DataFrame, column_configs: List[ColumnConfig], 
-                         output_file: str, sheet_name: str = "Datos") -> bool:
+                         output_file: str, sheet_name: str = "Datos",
+                         include_mapping_report: bool = False) -> bool:
         """Crear archivo Excel con datos y configuración - Versión Optimizada"""
         try:
             # Crear workbook
@@ -606,6 +679,10 @@ class ExportManager:
             # Aplicar configuración de columnas
             self._apply_column_configuration(source_data, column_configs)
             
+            # Agregar hoja con el reporte de aciertos/fallos de mapeo
+            if include_mapping_report and self.mapping_stats:
+                self._write_mapping_report_sheet(self.workbook, self.mapping_stats)
+            
             # Guardar archivo con manejo de conflictos
             export_path = Path(self.settings.default_export_dir) / output_file
             export_path.parent.mkdir(parents=True, exist_ok=True)
@@ -625,6 +702,7 @@ class ExportManager:
             # Intentar guardar el archivo
             try:
                 self.workbook.save(export_path)
+                self.last_export_path = export_path
                 self.logger.info(f"Archivo Excel creado: {export_path}")
                 return True
             except PermissionError as pe:
@@ -634,6 +712,7 @@ class ExportManager:
                 temp_path = Path(self.settings.default_export_dir) / temp_name
                 
                 self.workbook.save(temp_path)
+                self.last_export_path = temp_path
                 self.logger.warning(f"Archivo guardado con nombre temporal debido a permisos: {temp_path}")
                 return True
                 
@@ -653,6 +732,9 @@ class ExportManager:
                 if hasattr(col_config, 'is_numeric_generator') and col_config.is_numeric_generator:
                     self._preprocess_numeric_groups(data, col_config)
             
+            # Resolver mapeos dinámicos de forma vectorizada
+            self._resolve_mapped_columns(data, columns_config)
+            
             # Crear encabezados
             headers = [col_config.display_name for col_config in columns_config]
             self.worksheet.append(headers)
@@ -677,7 +759,7 @@ class ExportManager:
                 
                 for row_idx, (_, row) in enumerate(batch_data.iterrows(), batch_start + 2):
                     for col_idx, col_config in enumerate(columns_config, 1):
-                        value = self._get_column_value(row, col_config, data)
+                        value = self._get_column_value(row, col_config, data, row_position=row_idx - 2)
                         formatted_value = self._format_value(value, col_config)
                         
                         cell = self.worksheet.cell(row=row_idx, column=col_idx)
@@ -721,6 +803,7 @@ class ExportManager:
                 base_output_file = Path(base_output_file).stem
             
             sheet_name = export_config.get('sheet_name', 'Datos') if export_config else 'Datos'
+            include_report = bool(export_config and export_config.get('include_mapping_report'))
             created_files = []
             
             for file_index in range(num_files):
@@ -745,7 +828,10 @@ class ExportManager:
                 self.logger.info(f"Creando archivo {file_index + 1}/{num_files}: {output_file} con {len(file_data)} filas")
                 
                 # Crear archivo Excel para esta parte
-                success = self.create_excel_file(file_data, column_configs, output_file, sheet_name)
+                # El reporte de mapeo acumulado se agrega a la última parte
+                is_last_file = file_index == num_files - 1
+                success = self.create_excel_file(file_data, column_configs, output_file, sheet_name,
+                                                 include_mapping_report=include_report and is_last_file)
                 
                 if not success:
                     raise Exception(f"Error al crear el archivo {output_file}")
@@ -770,10 +856,193 @@ class ExportManager:
                     'total_files': num_files,
                     'max_rows_per_file': max_rows_per_file,
                     'base_filename': base_output_file
-                }
+                },
+                'mapping_stats': self.mapping_stats
             }
             
         except Exception as e:
             error_msg = f"Error en exportación de archivo grande: {e}"
             self.logger.error(error_msg)
-            raise Exception(error_msg)
\ No newline at end of file
+            raise Exception(error_msg)
+    
+    def _iter_row_blocks(self, chunks: Iterable[pd.DataFrame], block_rows: int) -> Iterator[pd.DataFrame]:
+        """Reagrupar lotes de cualquier tamaño en bloques de block_rows filas (el último puede ser menor)"""
+        pending: List[pd.DataFrame] = []
+        pending_rows = 0
+        for chunk in chunks:
+            while len(chunk):
+                take = min(block_rows - pending_rows, len(chunk))
+                pending.append(chunk.iloc[:take])
+                pending_rows += take
+                chunk = chunk.iloc[take:]
+                if pending_rows == block_rows:
+                    yield pd.concat(pending) if len(pending) > 1 else pending[0]
+                    pending, pending_rows = [], 0
+        if pending_rows:
+            yield pd.concat(pending) if len(pending) > 1 else pending[0]
+    
+    def export_excel_stream(self, source_chunks: Iterable[pd.DataFrame], column_configs: List[ColumnConfig],
+                            mapping_config: Dict = None, export_config: Dict = None,
+                            progress_callback: Callable = None, total_rows: int = None) -> Dict[str, Any]:
+        """
+        Exportar un archivo fuente recorrido por lotes (FileManager.iter_source_chunks).
+        
+        Los lotes se reagrupan en partes de 10,000 filas, igual que en la exportación de
+        archivos grandes, de modo que nunca hay en memoria más de dos partes. La validación
+        se hace con la primera parte. total_rows (estimado) solo se usa para el progreso.
+        """
+        try:
+            self.mapping_config = mapping_config
+            
+            self._mapping_cache.clear()
+            self._date_format_cache.clear()
+            self._column_letter_cache.clear()
+            self._lookup_tables.clear()
+            self._key_tables.clear()
+            self._value_matrices.clear()
+            self.mapping_stats = {}
+            
+            if progress_callback:
+                progress_callback(10)
+            
+            max_rows_per_file = 10000
+            base_output_file = export_config.get('output_file') if export_config else None
+            if not base_output_file:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                base_output_file = f"excel_export_{timestamp}"
+            else:
+                base_output_file = Path(base_output_file).stem
+            
+            sheet_name = export_config.get('sheet_name', 'Datos') if export_config else 'Datos'
+            include_report = bool(export_config and export_config.get('include_mapping_report'))
+            
+            blocks = self._iter_row_blocks(source_chunks, max_rows_per_file)
+            current = next(blocks, None)
+            if current is None:
+                raise ValueError("El archivo fuente no contiene filas")
+            
+            errors = self.validate_export_data(current, column_configs)
+            if errors:
+                raise ValueError(f"Errores de validación: {'; '.join(errors)}")
+            
+            created_paths: List[Path] = []
+            rows_processed = 0
+            while current is not None:
+                # Se lee la parte siguiente para saber si la actual es la última
+                following = next(blocks, None)
+                is_last_file = following is None
+                part_number = len(created_paths) + 1
+                
+                if is_last_file and part_number == 1:
+                    output_file = f"{base_output_file}.xlsx"
+                else:
+                    output_file = f"{base_output_file}_parte_{part_number:03d}.xlsx"
+                
+                self.logger.info(f"Creando parte {part_number} por streaming: {output_file} con {len(current)} filas")
+                success = self.create_excel_file(current, column_configs, output_file, sheet_name,
+                                                 include_mapping_report=include_report and is_last_file)
+                if not success:
+                    raise Exception(f"Error al crear el archivo {output_file}")
+                
+                created_paths.append(self.last_export_path)
+                rows_processed += len(current)
+                self.cleanup()
+                
+                if progress_callback and total_rows:
+                    progress_callback(20 + min(rows_processed / total_rows, 1) * 70)
+                current = following
+            
+            # Con el total ya conocido, las partes se renombran como en la exportación dividida
+            num_files = len(created_paths)
+            created_files = []
+            for part_number, part_path in enumerate(created_paths, 1):
+                if num_files > 1:
+                    final_path = part_path.with_name(
+                        f"{base_output_file}_parte_{part_number:03d}_de_{num_files:03d}{part_path.suffix}"
+                    )
+                    if not final_path.exists():
+                        part_path = part_path.rename(final_path)
+                created_files.append(part_path.name)
+            
+            if progress_callback:
+                progress_callback(100)
+            
+            self.logger.info(f"Exportación por streaming completada: {rows_processed} filas en {num_files} archivos")
+            
+            return {
+                'success': True,
+                'file_path': created_files[0],
+                'rows_processed': rows_processed,
+                'files_created': num_files,
+                'all_files': created_files,
+                'split_info': {
+                    'total_files': num_files,
+                    'max_rows_per_file': max_rows_per_file,
+                    'base_filename': base_output_file
+                },
+                'mapping_stats': self.mapping_stats
+            }
+            
+        except Exception as e:
+            error_msg = f"Error en exportación por streaming: {e}"
+            self.logger.error(error_msg)
+            raise Exception(error_msg)
+    
+    def build_mapping_report(self, mapping_stats: Dict[str, Dict[str, Any]] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Construir tablas de resumen por columna y de claves faltantes con su frecuencia"""
+        mapping_stats = self.mapping_stats if mapping_stats is None else mapping_stats
+        
+        summary_rows = []
+        missing_rows = []
+        for column_name, stats in mapping_stats.items():
+            summary_rows.append({
+                'Columna': column_name,
+                'Columna clave': stats.get('key_column', ''),
+                'Aciertos': stats.get('hits', 0),
+                'Sin distinguir mayúsculas': stats.get('casefold_hits', 0),
+                'Fallos': stats.get('misses', 0),
+                'Claves faltantes distintas': len(stats.get('missed_keys', {}))
+            })
+            for key, count in stats.get('missed_keys', {}).items():
+                missing_rows.append({'Columna': column_name, 'Clave faltante': key, 'Frecuencia': count})
+        
+        summary_df = pd.DataFrame(summary_rows, columns=['Columna', 'Columna clave', 'Aciertos', 'Sin distinguir mayúsculas',
+                                                         'Fallos', 'Claves faltantes distintas'])
+        missing_df = pd.DataFrame(missing_rows, columns=['Columna', 'Clave faltante', 'Frecuencia'])
+        if not missing_df.empty:
+            missing_df = missing_df.sort_values(['Columna', 'Frecuencia'], ascending=[True, False], kind='stable')
+        
+        return summary_df, missing_df
+    
+    def _write_mapping_report_sheet(self, workbook: Workbook, mapping_stats: Dict[str, Dict[str, Any]],
+                                    sheet_name: str = "Reporte Mapeo"):
+        """Escribir el reporte de mapeo en una hoja del workbook"""
+        summary_df, missing_df = self.build_mapping_report(mapping_stats)
+        worksheet = workbook.create_sheet(title=sheet_name)
+        header_font = Font(bold=True)
+        
+        for table in (summary_df, missing_df):
+            worksheet.append(list(table.columns))
+            for cell in worksheet[worksheet.max_row]:
+                cell.font = header_font
+            for values in table.itertuples(index=False):
+                worksheet.append(list(values))
+            worksheet.append([])
+    
+    def export_mapping_report(self, output_file: str, mapping_stats: Dict[str, Dict[str, Any]] = None) -> bool:
+        """Exportar el reporte de aciertos/fallos de mapeo como archivo Excel independiente"""
+        try:
+            workbook = Workbook()
+            workbook.remove(workbook.active)
+            self._write_mapping_report_sheet(workbook, self.mapping_stats if mapping_stats is None else mapping_stats)
+            
+            export_path = Path(self.settings.default_export_dir) / output_file
+            export_path.parent.mkdir(parents=True, exist_ok=True)
+            workbook.save(export_path)
+            
+            self.logger.info(f"Reporte de mapeo exportado: {export_path}")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error exportando reporte de mapeo: {e}")
+            return False
@@ -3,15 +3,35 @@
 Gestor de archivos Excel
 """
 
+import glob
+import threading
+import time
+import uuid
+import weakref
 import pandas as pd
 from pathlib import Path
-from typing import Optional, Dict, List, Any
+from typing import Callable, Optional, Dict, Iterator, List, Any, Sequence, Tuple, Union
 import logging
 from config.settings import AppSettings
+from core.disk_cache import FrameCache, file_fingerprint
+from core.dtype_optimizer import optimize_dtypes
+from core.readers import iter_excel_frames, list_sheet_names, probe_workbook, read_excel_file, read_excel_sheets
+from core.schema import validate_schema
+from core.snapshot import write_snapshot
+from core.sqlite_reader import Filter, build_source_query, is_sqlite
+from utils.exceptions import LoadCancelledError, ValidationError
+
+# Avance de una carga: (porcentaje, mensaje)
+ProgressCallback = Callable[[float, str], None]
 
 class FileManager:
     """Gestor para cargar y analizar archivos Excel"""
     
+    # Estado del archivo fuente que se restaura si se cancela una carga
+    _SOURCE_STATE = ('source_file', 'source_df', 'source_load_info', 'source_sheets', 'source_active_sheets',
+                     'source_all_columns', 'source_projection', '_source_total_rows', '_source_preview',
+                     'source_streaming', 'source_parts', 'source_file_column', 'source_sheet_column')
+    
     def __init__(self, settings: AppSettings):
         self.settings = settings
         self.logger = logging.getLogger(__name__)
@@ -19,25 +39,249 @@ class FileManager:
         self.base_file: Optional[Path] = None
         self.source_df: Optional[pd.DataFrame] = None
         self.base_df: Optional[pd.DataFrame] = None
+        self.source_load_info: Dict[str, Any] = {}
+        self.base_load_info: Dict[str, Any] = {}
+        self.source_sheets: List[str] = []  # Hojas del libro fuente
+        self.source_active_sheets: List[str] = []  # Hojas cargadas en source_df
+        self.base_sheets: List[str] = []
+        self.base_active_sheet: Optional[str] = None
         
-    def load_source_file(self, file_path: str) -> Dict[str, Any]:
-        """Cargar archivo Excel fuente"""
-        try:
-            path = Path(file_path)
+        # Carga proyectada: solo se leen las columnas fuente que usa la configuración
+        self.source_all_columns: List[Any] = []  # Encabezados de la hoja fuente
+        self.source_projection: Optional[List[Any]] = None  # Columnas leídas (None = todas)
+        self.projection_request: Optional[List[Any]] = None  # Columnas pedidas por la configuración
+        self._source_total_rows = 0
+        self._source_preview: Optional[pd.DataFrame] = None
+        
+        # Tipos declarados en la configuración ({columna: tipo}), que se validan al cargar
+        self.schema_request: Dict[Any, str] = {}
+        
+        # Archivos fuente por encima de max_file_size_mb: source_df solo contiene la vista previa
+        # y los datos se recorren por lotes con iter_source_chunks
+        self.source_streaming = False
+        
+        # Fuente de varios archivos u hojas con los mismos encabezados: (archivo, hoja) de cada
+        # parte y columnas opcionales con el archivo y la hoja de cada fila (None = sin columna)
+        self.source_parts: List[Tuple[Path, str]] = []
+        self.source_file_column: Optional[str] = None
+        self.source_sheet_column: Optional[str] = None
+        
+        # Snapshot en disco de source_df para procesos trabajadores (y el DataFrame del que se escribió)
+        self.source_snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_frame: Optional[weakref.ref] = None
+        
+        # Cache de DataFrames ya leídos, por huella del archivo
+        self.load_cache: Optional[FrameCache] = None
+        if settings.load_cache_enabled:
+            self.load_cache = FrameCache(settings.load_cache_dir, settings.load_cache_max_mb,
+                                         settings.load_cache_format)
+        
+    def _load_cache_key(self, file_path: str, sheet_name: Any, columns: Optional[List[Any]] = None) -> Optional[str]:
+        """Clave del cache de cargas para una hoja de un archivo (y, si se proyecta, sus columnas)"""
+        if self.load_cache is None or is_sqlite(file_path):
+            # SQLite ya lee solo lo pedido, y los cambios en modo WAL no alteran el archivo principal
+            return None
+        fingerprint = file_fingerprint(file_path)
+        projection = ('columnas', tuple(columns)) if columns is not None else ()
+        return self.load_cache.make_key('carga', fingerprint['path'], fingerprint['size'],
+                                        fingerprint['mtime'], fingerprint['content_hash'], sheet_name,
+                                        *projection)
+    
+    def _get_cached_dataframe(self, file_path: str, sheet_name: Any,
+                              columns: Optional[List[Any]] = None) -> Tuple[Optional[str], Optional[pd.DataFrame], Dict[str, Any]]:
+        """Buscar una hoja en el cache de cargas: devuelve clave, DataFrame (o None) e información de carga"""
+        start_time = time.perf_counter()
+        cache_key = self._load_cache_key(file_path, sheet_name, columns)
+        cached = self.load_cache.get(cache_key) if cache_key else None
+        load_info = {}
+        if cached is not None:
+            load_info = {
+                'reader_engine': 'cache',
+                'load_time': round(time.perf_counter() - start_time, 3),
+                'cache_hit': True
+            }
+            self.logger.info(f"{Path(file_path).name} [{sheet_name}] leído desde el cache de cargas "
+                             f"en {load_info['load_time']:.2f} s")
+        return cache_key, cached, load_info
+    
+    def _load_dataframe(self, file_path: str, sheet_name: Any = 0,
+                        columns: Optional[List[Any]] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """Leer una hoja de Excel (o solo las columnas indicadas) consultando primero el cache de cargas"""
+        cache_key, cached, load_info = self._get_cached_dataframe(file_path, sheet_name, columns)
+        if cached is not None:
+            return cached, load_info
+        
+        read_kwargs = {}
+        if columns is not None:
+            # Posiciones en lugar de nombres: los encabezados numéricos se confundirían con índices
+            read_kwargs['usecols'] = [self.source_all_columns.index(col) for col in columns]
+        df, load_info = read_excel_file(file_path, self.settings.reader_engine, sheet_name=sheet_name,
+                                        **read_kwargs)
+        load_info['cache_hit'] = False
+        
+        if cache_key:
+            self.load_cache.set(cache_key, df)
+        
+        return df, load_info
+    
+    def _source_schema(self) -> Dict[Any, str]:
+        """Esquema que se valida al cargar el archivo fuente (vacío si la validación está desactivada)"""
+        return dict(self.schema_request) if self.settings.schema_load_enabled else {}
+    
+    def _validate_source_schema(self, df: pd.DataFrame, load_info: Dict[str, Any],
+                                schema: Dict[Any, str]):
+        """
+        Validar las columnas del esquema (sobre los tipos que infirió pandas, sin cambiar
+        los valores) y guardar en la información de carga las filas no conformes
+        """
+        load_info.pop('schema_report', None)
+        if not schema:
+            return
+        # Las columnas que existen en la hoja pero no se proyectaron no se validan
+        schema = {col: data_type for col, data_type in schema.items()
+                  if col in df.columns or col not in self.source_all_columns}
+        load_info['schema_report'] = validate_schema(df, schema)
+    
+    def _optimize_loaded(self, df: pd.DataFrame, load_info: Dict[str, Any]) -> pd.DataFrame:
+        """Reducir la memoria de un DataFrame recién cargado y guardar el informe en la información de carga"""
+        if not self.settings.dtype_optimization_enabled or df.empty:
+            return df
+        df, load_info['dtype_report'] = optimize_dtypes(df, self.settings.category_max_ratio,
+                                                        self.settings.arrow_strings)
+        return df
+    
+    def get_sheet_names(self, file_path: str) -> List[str]:
+        """Obtener los nombres de las hojas de un libro sin leer sus datos"""
+        return list_sheet_names(file_path)
+    
+    def load_sheets(self, file_path: str, sheet_names: List[str] = None) -> Dict[str, pd.DataFrame]:
+        """Cargar varias hojas de un libro; las que no están en cache se leen en paralelo"""
+        sheet_names = sheet_names or self.get_sheet_names(file_path)
+        frames: Dict[str, pd.DataFrame] = {}
+        cache_keys: Dict[str, Optional[str]] = {}
+        
+        for sheet_name in sheet_names:
+            cache_key, cached, _ = self._get_cached_dataframe(file_path, sheet_name)
+            cache_keys[sheet_name] = cache_key
+            if cached is not None:
+                frames[sheet_name] = cached
+        
+        pending = [name for name in sheet_names if name not in frames]
+        if pending:
+            loaded = read_excel_sheets(file_path, pending, self.settings.reader_engine,
+                                       self.settings.max_load_workers)
+            for sheet_name, (df, _) in loaded.items():
+                frames[sheet_name] = df
+                if cache_keys[sheet_name]:
+                    self.load_cache.set(cache_keys[sheet_name], df)
+        
+        self.logger.info(f"{len(sheet_names)} hojas cargadas de {Path(file_path).name} "
+                         f"({len(sheet_names) - len(pending)} desde cache)")
+        return {name: frames[name] for name in sheet_names}
+    
+    def _validate_source_path(self, file_path: str) -> Path:
+        """Validar existencia, formato y tamaño del archivo fuente"""
+        path = Path(file_path)
+        
+        if not path.exists():
+            raise FileNotFoundError(f"El archivo no existe: {file_path}")
+            
+        if path.suffix.lower() not in self.settings.supported_formats:
+            raise ValueError(f"Formato no soportado: {path.suffix}")
             
+        # Los .xlsx, CSV, Parquet, JSON Lines y SQLite grandes se procesan por lotes; los .xls no admiten streaming
+        if self.exceeds_stream_threshold(path) and path.suffix.lower() == '.xls':
+            raise ValueError(f"Archivo muy grande (máximo {self.settings.max_file_size_mb}MB para {path.suffix})")
+        
+        return path
+    
+    def exceeds_stream_threshold(self, file_path: str) -> bool:
+        """Indicar si un archivo supera el tamaño a partir del cual se procesa por lotes"""
+        return Path(file_path).stat().st_size > self.settings.max_file_size_mb * 1024 * 1024
+    
+    def get_load_cache_statistics(self) -> Dict[str, Any]:
+        """Obtener aciertos, fallos y tamaño del cache de cargas"""
+        if self.load_cache is None:
+            return {}
+        return self.load_cache.get_statistics()
+        
+    def _report_load(self, progress_callback: Optional[ProgressCallback],
+                     cancel_event: Optional[threading.Event], percent: float, message: str):
+        """Informar el avance de una carga y detenerla si se pidió cancelarla"""
+        if cancel_event is not None and cancel_event.is_set():
+            raise LoadCancelledError("Carga cancelada por el usuario")
+        if progress_callback:
+            progress_callback(percent, message)
+    
+    def read_source_preview(self, file_path: str, sheet_name: str = None) -> Dict[str, Any]:
+        """
+        Leer solo las primeras max_preview_rows filas de una hoja, sin cambiar el archivo
+        fuente cargado, para mostrarlas mientras se carga el archivo completo.
+        """
+        path = self._validate_source_path(file_path)
+        sheets = self.get_sheet_names(file_path)
+        sheet_name = sheet_name or sheets[0]
+        preview, load_info = read_excel_file(path, self.settings.reader_engine, sheet_name=sheet_name,
+                                             nrows=self.settings.max_preview_rows)
+        return {
+            'file_path': str(path),
+            'file_name': path.name,
+            'sheets': sheets,
+            'active_sheet': sheet_name,
+            'columns': list(preview.columns),
+            'preview': preview,
+            'preview_rows': len(preview),
+            'load_time': load_info.get('load_time')
+        }
+    
+    def load_source_file(self, file_path: str, sheet_name: str = None,
+                         progress_callback: Optional[ProgressCallback] = None,
+                         cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        Cargar archivo Excel fuente (la hoja indicada o la primera).
+        
+        progress_callback recibe el avance por etapas; si cancel_event se activa, la carga
+        se detiene en la siguiente etapa con LoadCancelledError y se conserva el archivo
+        fuente anterior.
+        """
+        state = self._source_state()
+        try:
             # Validaciones
-            if not path.exists():
-                raise FileNotFoundError(f"El archivo no existe: {file_path}")
-                
-            if path.suffix.lower() not in self.settings.supported_formats:
-                raise ValueError(f"Formato no soportado: {path.suffix}")
-                
-            if path.stat().st_size > self.settings.max_file_size_mb * 1024 * 1024:
-                raise ValueError(f"Archivo muy grande (máximo {self.settings.max_file_size_mb}MB)")
+            self._report_load(progress_callback, cancel_event, 0, "Validando archivo")
+            path = self._validate_source_path(file_path)
             
             # Cargar archivo
-            self.source_df = pd.read_excel(file_path)
+            sheets = self.get_sheet_names(file_path)
+            sheet_name = sheet_name or sheets[0]
+            self._source_preview = None
+            self.source_streaming = False
+            self.source_parts = []
+            schema = self._source_schema()
+            self._report_load(progress_callback, cancel_event, 10, f"Leyendo la hoja {sheet_name}")
+            if self.exceeds_stream_threshold(path):
+                info = self._open_source_stream(path, sheets, sheet_name)
+                self._report_load(progress_callback, cancel_event, 100, "Archivo abierto por lotes")
+                return info
+            if self.settings.projected_load_enabled:
+                # Encabezados y número de filas sin leer los datos de la hoja
+                sheet_info = probe_workbook(file_path, [sheet_name])['sheets'][sheet_name]
+                self.source_all_columns = sheet_info['column_names']
+                self._source_total_rows = sheet_info['rows']
+                self.source_projection = self._projected_columns()
+                df, load_info = self._load_projected_source(file_path, sheet_name, self.source_projection)
+            else:
+                df, load_info = self._load_dataframe(file_path, sheet_name)
+                self.source_all_columns = list(df.columns)
+                self.source_projection = None
+            self._report_load(progress_callback, cancel_event, 80, "Validando tipos de datos")
+            self._validate_source_schema(df, load_info, schema)
+            df = self._optimize_loaded(df, load_info)
+            self._report_load(progress_callback, cancel_event, 100, "Carga completa")
+            self.source_df = df
+            self.source_load_info = load_info
             self.source_file = path
+            self.source_sheets = sheets
+            self.source_active_sheets = [sheet_name]
             
             self.logger.info(f"Archivo fuente cargado: {file_path}")
             self.logger.info(f"Dimensiones: {self.source_df.shape}")
@@ -45,12 +289,434 @@ class FileManager:
             # Retornar información del archivo
             return self.get_source_info()
             
+        except LoadCancelledError:
+            self._restore_source_state(state)
+            self.logger.info(f"Carga cancelada: {file_path}")
+            raise
         except Exception as e:
+            # El archivo fuente anterior sigue cargado: no se deja un estado a medias
+            self._restore_source_state(state)
             self.logger.error(f"Error cargando archivo fuente: {e}")
             raise e  # Re-lanzar la excepción para que sea manejada por el UI
     
-    def load_base_file(self, file_path: str) -> Dict[str, Any]:
-        """Cargar archivo Excel base para mapeo"""
+    def load_source_query(self, file_path: str, source: str, filters: Optional[List[Filter]] = None,
+                          progress_callback: Optional[ProgressCallback] = None,
+                          cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        Cargar como archivo fuente una tabla o consulta de una base de datos SQLite.
+        
+        source es el nombre de una tabla o vista, o una consulta SELECT; filters son filtros
+        simples (columna, operador, valor) que se añaden como WHERE. La consulta resultante
+        ocupa el lugar de la hoja activa, de modo que la proyección de columnas, la vista
+        previa (LIMIT) y la lectura por lotes de archivos grandes (fetchmany) se resuelven
+        en SQLite y el resto del proceso recibe DataFrames como con cualquier otro archivo.
+        """
+        if not is_sqlite(file_path):
+            raise ValueError(f"No es una base de datos SQLite: {file_path}")
+        query = build_source_query(source, filters)
+        self.logger.info(f"Consulta fuente: {query}")
+        return self.load_source_file(file_path, query, progress_callback=progress_callback,
+                                     cancel_event=cancel_event)
+    
+    def _source_state(self) -> Dict[str, Any]:
+        """Copia (superficial) del estado del archivo fuente"""
+        return {name: getattr(self, name) for name in self._SOURCE_STATE}
+    
+    def _restore_source_state(self, state: Dict[str, Any]):
+        """Volver al estado del archivo fuente guardado con _source_state"""
+        for name, value in state.items():
+            setattr(self, name, value)
+    
+    def _open_source_stream(self, path: Path, sheets: List[str], sheet_name: str) -> Dict[str, Any]:
+        """Abrir un archivo fuente grande por streaming: se leen encabezados, filas y vista previa"""
+        start_time = time.perf_counter()
+        sheet_info = probe_workbook(path, [sheet_name])['sheets'][sheet_name]
+        self.source_all_columns = sheet_info['column_names']
+        self._source_total_rows = sheet_info['rows']
+        self.source_projection = self._projected_columns() if self.settings.projected_load_enabled else None
+        
+        if path.suffix.lower() == '.xlsx':
+            # La vista previa sale del mismo recorrido que los lotes: mismos encabezados
+            # (tras las filas vacías iniciales) que probe_workbook y la proyección
+            frames = iter_excel_frames(path, None, sheet_name, self.settings.max_preview_rows)
+            try:
+                self.source_df = next(frames, pd.DataFrame(columns=self.source_all_columns))
+            finally:
+                frames.close()
+        else:
+            self.source_df, _ = read_excel_file(path, self.settings.reader_engine, sheet_name=sheet_name,
+                                                nrows=self.settings.max_preview_rows)
+        self.source_streaming = True
+        self.source_load_info = {
+            'reader_engine': 'streaming',
+            'load_time': round(time.perf_counter() - start_time, 3),
+            'cache_hit': False
+        }
+        self.source_file = path
+        self.source_sheets = sheets
+        self.source_active_sheets = [sheet_name]
+        
+        self.logger.info(f"Archivo fuente abierto por streaming: {path} "
+                         f"({self._source_total_rows} filas, lotes de {self.settings.stream_chunk_rows})")
+        return self.get_source_info()
+    
+    def iter_source_chunks(self, chunk_rows: int = None) -> Iterator[pd.DataFrame]:
+        """
+        Recorrer el archivo fuente en lotes de DataFrame con los mismos encabezados.
+        
+        Si el archivo se abrió por streaming los lotes se leen de la hoja activa
+        (solo las columnas proyectadas, si la carga proyectada está activa); si está
+        cargado en memoria se devuelven porciones de source_df. Una fuente de varios
+        archivos (load_source_files) se recorre parte por parte como un único conjunto.
+        """
+        if self.source_df is None:
+            raise ValueError("No se ha cargado un archivo fuente")
+        chunk_rows = chunk_rows or self.settings.stream_chunk_rows
+        
+        if self.source_parts:
+            yield from self._iter_source_parts(chunk_rows)
+            return
+        
+        if not self.source_streaming:
+            for start in range(0, len(self.source_df), chunk_rows):
+                yield self.source_df.iloc[start:start + chunk_rows]
+            return
+        
+        yield from iter_excel_frames(self.source_file, self.source_projection,
+                                     self.source_active_sheets[0], chunk_rows)
+    
+    def expand_source_paths(self, file_paths: Union[str, Path, Sequence[Union[str, Path]]]) -> List[Path]:
+        """
+        Rutas de archivo a partir de una ruta, un patrón glob (*, ?, [...]) o una lista de
+        ambos. Los patrones se expanden en orden alfabético y solo incluyen formatos soportados.
+        """
+        if isinstance(file_paths, (str, Path)):
+            file_paths = [file_paths]
+        
+        paths = []
+        for entry in map(str, file_paths):
+            if not any(char in entry for char in '*?['):
+                paths.append(Path(entry))
+                continue
+            matches = [Path(match) for match in sorted(glob.glob(entry, recursive=True))
+                       if Path(match).suffix.lower() in self.settings.supported_formats]
+            if not matches:
+                raise FileNotFoundError(f"Ningún archivo coincide con el patrón: {entry}")
+            paths.extend(matches)
+        
+        # Un archivo incluido por dos patrones se lee una sola vez
+        return list(dict.fromkeys(paths))
+    
+    def load_source_files(self, file_paths: Union[str, Path, Sequence[Union[str, Path]]],
+                          sheet_names: Optional[List[str]] = None,
+                          file_column: Optional[str] = "Archivo", sheet_column: Optional[str] = None,
+                          progress_callback: Optional[ProgressCallback] = None,
+                          cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        Abrir varios archivos (y hojas) con los mismos encabezados como un único conjunto de datos.
+        
+        file_paths son rutas o patrones glob; de cada archivo se toman las hojas sheet_names
+        (la primera si es None). Todas las partes deben tener los encabezados de la primera,
+        en el mismo orden; si no, se lanza ValidationError con las diferencias de cada parte.
+        Los datos no se concatenan: source_df solo contiene la vista previa de la primera
+        parte e iter_source_chunks recorre las partes una tras otra, como en el streaming de
+        un archivo grande. file_column y sheet_column (None para omitirlas) añaden a cada
+        fila el nombre del archivo y la hoja de los que proviene.
+        """
+        state = self._source_state()
+        try:
+            self._report_load(progress_callback, cancel_event, 0, "Buscando archivos")
+            paths = [self._validate_source_path(str(path)) for path in self.expand_source_paths(file_paths)]
+            if not paths:
+                raise ValueError("No se indicó ningún archivo fuente")
+            
+            parts = []
+            for path in paths:
+                available = self.get_sheet_names(str(path))
+                for sheet_name in sheet_names or available[:1]:
+                    if sheet_name not in available and not is_sqlite(path):
+                        raise ValueError(f"La hoja '{sheet_name}' no existe en {path.name}")
+                    parts.append((path, sheet_name))
+            
+            start_time = time.perf_counter()
+            header = None
+            total_rows = 0
+            mismatches = []
+            for i, (path, sheet_name) in enumerate(parts):
+                self._report_load(progress_callback, cancel_event, 10 + 80 * i / len(parts),
+                                  f"Revisando encabezados de {path.name} [{sheet_name}]")
+                sheet_info = probe_workbook(path, [sheet_name])['sheets'][sheet_name]
+                total_rows += sheet_info['rows']
+                if header is None:
+                    header = sheet_info['column_names']
+                elif sheet_info['column_names'] != header:
+                    mismatches.append(self._header_difference(path, sheet_name, header,
+                                                              sheet_info['column_names']))
+            if mismatches:
+                raise ValidationError(f"Los encabezados de {len(mismatches)} de {len(parts)} partes "
+                                      f"no coinciden con los de {parts[0][0].name}", errors=mismatches)
+            
+            extra_columns = [col for col in (file_column, sheet_column) if col]
+            duplicated = [col for col in extra_columns if col in header]
+            if duplicated:
+                raise ValueError(f"Las columnas {duplicated} ya existen en los archivos fuente")
+            
+            self._report_load(progress_callback, cancel_event, 90, "Leyendo vista previa")
+            self.source_parts = parts
+            self.source_file_column = file_column
+            self.source_sheet_column = sheet_column
+            self.source_all_columns = extra_columns + header
+            self._source_total_rows = total_rows
+            self._source_preview = None
+            self.source_projection = self._projected_columns() if self.settings.projected_load_enabled else None
+            preview, _ = read_excel_file(parts[0][0], self.settings.reader_engine, sheet_name=parts[0][1],
+                                         nrows=self.settings.max_preview_rows)
+            self.source_df = self._label_part(preview, *parts[0])
+            self.source_streaming = True
+            self.source_load_info = {
+                'reader_engine': 'streaming',
+                'load_time': round(time.perf_counter() - start_time, 3),
+                'cache_hit': False
+            }
+            self.source_file = parts[0][0]
+            self.source_sheets = self.get_sheet_names(str(parts[0][0]))
+            self.source_active_sheets = list(dict.fromkeys(sheet_name for _, sheet_name in parts))
+            self._report_load(progress_callback, None, 100, "Archivos abiertos por lotes")
+            
+            self.logger.info(f"Fuente de {len(paths)} archivos ({len(parts)} partes, {total_rows} filas) "
+                             f"abierta por streaming")
+            return self.get_source_info()
+            
+        except LoadCancelledError:
+            self._restore_source_state(state)
+            self.logger.info("Carga de varios archivos cancelada")
+            raise
+        except Exception as e:
+            self._restore_source_state(state)
+            self.logger.error(f"Error cargando varios archivos fuente: {e}")
+            raise e
+    
+    @staticmethod
+    def _header_difference(path: Path, sheet_name: str, expected: List[Any], found: List[Any]) -> str:
+        """Descripción de la diferencia entre los encabezados de una parte y los esperados"""
+        missing = [col for col in expected if col not in found]
+        extra = [col for col in found if col not in expected]
+        if not missing and not extra:
+            return f"{path.name} [{sheet_name}]: columnas en otro orden"
+        details = []
+        if missing:
+            details.append(f"faltan {missing}")
+        if extra:
+            details.append(f"sobran {extra}")
+        return f"{path.name} [{sheet_name}]: {', '.join(details)}"
+    
+    def _label_part(self, frame: pd.DataFrame, path: Path, sheet_name: str) -> pd.DataFrame:
+        """Añadir al inicio las columnas con el archivo y la hoja de la parte (si se leen)"""
+        labels = {}
+        for column, value in ((self.source_file_column, path.name), (self.source_sheet_column, sheet_name)):
+            if column and (self.source_projection is None or column in self.source_projection):
+                labels[column] = value
+        if not labels:
+            return frame
+        frame = frame.assign(**labels)
+        return frame[list(labels) + [col for col in frame.columns if col not in labels]]
+    
+    def _iter_source_parts(self, chunk_rows: int) -> Iterator[pd.DataFrame]:
+        """
+        Recorrer las partes de una fuente de varios archivos en lotes de chunk_rows filas.
+        
+        Los lotes cruzan el límite entre archivos (solo el último puede ser menor) y el
+        índice es continuo; en memoria hay como mucho un lote y el resto de la lectura anterior.
+        """
+        extra_columns = {self.source_file_column, self.source_sheet_column}
+        read_columns = None
+        if self.source_projection is not None:
+            read_columns = [col for col in self.source_projection if col not in extra_columns]
+        
+        pending: List[pd.DataFrame] = []
+        pending_rows = 0
+        start = 0
+        for path, sheet_name in self.source_parts:
+            for frame in iter_excel_frames(path, read_columns, sheet_name, chunk_rows):
+                pending.append(self._label_part(frame, path, sheet_name))
+                pending_rows += len(frame)
+                while pending_rows >= chunk_rows:
+                    combined = pd.concat(pending) if len(pending) > 1 else pending[0]
+                    chunk, rest = combined.iloc[:chunk_rows], combined.iloc[chunk_rows:]
+                    chunk.index = pd.RangeIndex(start, start + chunk_rows)
+                    start += chunk_rows
+                    yield chunk
+                    pending, pending_rows = ([rest], len(rest)) if len(rest) else ([], 0)
+        
+        if pending_rows:
+            chunk = pd.concat(pending) if len(pending) > 1 else pending[0]
+            chunk.index = pd.RangeIndex(start, start + pending_rows)
+            yield chunk
+    
+    def _projected_columns(self) -> List[Any]:
+        """Columnas pedidas por la configuración que existen en la hoja, en el orden del archivo"""
+        requested = set(self.projection_request or [])
+        return [col for col in self.source_all_columns if col in requested]
+    
+    def _load_projected_source(self, file_path: str, sheet_name: Any,
+                               columns: List[Any]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """Leer solo las columnas indicadas; sin columnas basta con el número de filas"""
+        if not columns:
+            load_info = {'reader_engine': 'probe', 'load_time': 0.0, 'cache_hit': False}
+            return pd.DataFrame(index=pd.RangeIndex(self._source_total_rows)), load_info
+        
+        df, load_info = self._load_dataframe(file_path, sheet_name, columns)
+        self.logger.info(f"Carga proyectada: {len(columns)} de {len(self.source_all_columns)} columnas")
+        return df, load_info
+    
+    def set_source_projection(self, columns: Optional[List[Any]]) -> bool:
+        """
+        Indicar las columnas fuente que usa la configuración.
+        
+        Con la carga proyectada activa, si la configuración empieza a usar una columna
+        que no se leyó, la hoja se vuelve a leer con las columnas necesarias.
+        Devuelve True si se releyó el archivo.
+        """
+        needed = self.request_source_projection(columns)
+        if needed is None:
+            return False
+        self.reload_source_columns(needed)
+        return True
+    
+    def request_source_projection(self, columns: Optional[List[Any]]) -> Optional[List[Any]]:
+        """
+        Registrar las columnas fuente que usa la configuración sin releer el archivo.
+        
+        Devuelve las columnas con las que hay que releer la hoja (reload_source_columns)
+        si la carga proyectada no leyó alguna de ellas, o None si no hace falta releer.
+        """
+        self.projection_request = list(columns) if columns is not None else None
+        if self.source_streaming:
+            # Por streaming no hay nada que releer: los lotes siguientes usarán las nuevas columnas
+            if self.settings.projected_load_enabled:
+                self.source_projection = self._projected_columns()
+            return None
+        if (not self.settings.projected_load_enabled or self.source_df is None or
+                self.source_projection is None or len(self.source_active_sheets) != 1):
+            return None
+        
+        needed = self._projected_columns()
+        if set(needed) <= set(self.source_projection):
+            return None
+        return needed
+    
+    def reload_source_columns(self, columns: List[Any],
+                              progress_callback: Optional[ProgressCallback] = None,
+                              cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        Releer la hoja activa con las columnas indicadas (avance y cancelación como en
+        load_source_file). Si falla o se cancela, la hoja leída antes sigue cargada.
+        """
+        state = self._source_state()
+        try:
+            self._reread_source(columns, progress_callback, cancel_event)
+            self.logger.info(f"Archivo fuente releído con las columnas: {columns}")
+            return self.get_source_info()
+        except LoadCancelledError:
+            self._restore_source_state(state)
+            self.logger.info("Relectura del archivo fuente cancelada")
+            raise
+        except Exception as e:
+            self._restore_source_state(state)
+            self.logger.error(f"Error releyendo columnas del archivo fuente: {e}")
+            raise e
+    
+    def _reread_source(self, columns: Optional[List[Any]],
+                       progress_callback: Optional[ProgressCallback] = None,
+                       cancel_event: Optional[threading.Event] = None):
+        """Releer la hoja activa (las columnas indicadas, o todas con None) y validar el esquema actual"""
+        sheet_name = self.source_active_sheets[0]
+        self._report_load(progress_callback, cancel_event, 10, f"Releyendo la hoja {sheet_name}")
+        if columns is None:
+            df, load_info = self._load_dataframe(str(self.source_file), sheet_name)
+        else:
+            df, load_info = self._load_projected_source(str(self.source_file), sheet_name, columns)
+        self._report_load(progress_callback, cancel_event, 80, "Validando tipos de datos")
+        self._validate_source_schema(df, load_info, self._source_schema())
+        df = self._optimize_loaded(df, load_info)
+        self._report_load(progress_callback, cancel_event, 100, "Relectura completa")
+        self.source_df = df
+        self.source_load_info = load_info
+        self.source_projection = columns
+    
+    def set_source_schema(self, schema: Optional[Dict[Any, str]]):
+        """
+        Indicar los tipos de dato declarados para las columnas fuente ({columna: tipo}).
+        
+        Se validan al cargar el archivo fuente sobre los tipos que infiere pandas, sin
+        cambiar los valores. Si ya hay una hoja en memoria se valida de nuevo sin releerla.
+        """
+        self.schema_request = dict(schema or {})
+        if self.source_df is None or self.source_streaming or self.source_parts:
+            return
+        self._validate_source_schema(self.source_df, self.source_load_info, self._source_schema())
+    
+    def load_source_sheets(self, file_path: str, sheet_names: List[str] = None,
+                           sheet_column: str = "Hoja",
+                           progress_callback: Optional[ProgressCallback] = None,
+                           cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        Cargar varias hojas del archivo fuente como un único conjunto de datos
+        (avance y cancelación como en load_source_file)
+        """
+        state = self._source_state()
+        try:
+            self._report_load(progress_callback, cancel_event, 0, "Validando archivo")
+            path = self._validate_source_path(file_path)
+            sheets = self.get_sheet_names(file_path)
+            sheet_names = sheet_names or sheets
+            
+            self._report_load(progress_callback, cancel_event, 10, f"Leyendo {len(sheet_names)} hojas")
+            start_time = time.perf_counter()
+            frames = self.load_sheets(file_path, sheet_names)
+            self._report_load(progress_callback, cancel_event, 70, "Combinando hojas")
+            
+            # Cada fila conserva la hoja de la que proviene
+            combined = pd.concat(
+                [df.assign(**{sheet_column: name}) for name, df in frames.items()],
+                ignore_index=True
+            )
+            combined = combined[[sheet_column] + [col for col in combined.columns if col != sheet_column]]
+            self._report_load(progress_callback, cancel_event, 80, "Optimizando tipos de datos")
+            
+            self.source_all_columns = list(combined.columns)
+            self.source_streaming = False
+            self.source_parts = []
+            self.source_projection = None
+            self._source_preview = None
+            self.source_file = path
+            self.source_sheets = sheets
+            self.source_active_sheets = list(sheet_names)
+            self.source_load_info = {
+                'reader_engine': self.settings.reader_engine,
+                'load_time': round(time.perf_counter() - start_time, 3),
+                'cache_hit': False
+            }
+            # Se optimiza el conjunto combinado: las categorías de cada hoja no se conservan al concatenar
+            self.source_df = self._optimize_loaded(combined, self.source_load_info)
+            self._report_load(progress_callback, None, 100, "Carga completa")
+            
+            self.logger.info(f"Archivo fuente cargado: {file_path} ({len(sheet_names)} hojas)")
+            self.logger.info(f"Dimensiones: {self.source_df.shape}")
+            
+            return self.get_source_info()
+            
+        except LoadCancelledError:
+            self._restore_source_state(state)
+            self.logger.info(f"Carga cancelada: {file_path}")
+            raise
+        except Exception as e:
+            self._restore_source_state(state)
+            self.logger.error(f"Error cargando hojas del archivo fuente: {e}")
+            raise e
+    
+    def load_base_file(self, file_path: str, sheet_name: str = None) -> Dict[str, Any]:
+        """Cargar archivo Excel base para mapeo (la hoja indicada o la primera)"""
         try:
             path = Path(file_path)
             
@@ -62,8 +728,14 @@ class FileManager:
                 raise ValueError(f"Formato no soportado: {path.suffix}")
             
             # Cargar archivo
-            self.base_df = pd.read_excel(file_path)
+            sheets = self.get_sheet_names(file_path)
+            sheet_name = sheet_name or sheets[0]
+            df, load_info = self._load_dataframe(file_path, sheet_name)
+            self.base_df = self._optimize_loaded(df, load_info)
+            self.base_load_info = load_info
             self.base_file = path
+            self.base_sheets = sheets
+            self.base_active_sheet = sheet_name
             
             self.logger.info(f"Archivo base cargado: {file_path}")
             
@@ -82,9 +754,9 @@ class FileManager:
             return False
     
     def get_source_columns(self) -> List[str]:
-        """Obtener lista de columnas del archivo fuente"""
+        """Obtener lista de columnas del archivo fuente (todas, aunque la carga sea proyectada)"""
         if self.source_df is not None:
-            return list(self.source_df.columns)
+            return list(self.source_all_columns)
         return []
     
     def get_base_columns(self) -> List[str]:
@@ -97,6 +769,14 @@ class FileManager:
         """Obtener vista previa del archivo fuente"""
         if self.source_df is not None:
             rows = max_rows or self.settings.max_preview_rows
+            if self.source_projection is not None and not self.source_streaming:
+                # La vista previa muestra todas las columnas leyendo solo las primeras filas
+                if self._source_preview is None or len(self._source_preview) < rows:
+                    self._source_preview, _ = read_excel_file(
+                        self.source_file, self.settings.reader_engine,
+                        sheet_name=self.source_active_sheets[0], nrows=rows
+                    )
+                return self._source_preview.head(rows)
             return self.source_df.head(rows)
         return None
     
@@ -110,21 +790,31 @@ class FileManager:
     def get_source_info(self) -> Dict[str, Any]:
         """Obtener información del archivo fuente"""
         if self.source_df is not None:
-            file_size = self.source_file.stat().st_size
+            files = list(dict.fromkeys(path for path, _ in self.source_parts)) or [self.source_file]
+            file_size = sum(path.stat().st_size for path in files)
             file_size_mb = file_size / (1024 * 1024)
             
             return {
                 'file_path': str(self.source_file),
-                'file_name': self.source_file.name,
+                'file_name': self.source_file.name if len(files) == 1 else f"{len(files)} archivos",
+                'source_files': [str(path) for path in files],
                 'file_size': f"{file_size_mb:.2f} MB",
-                'sheets': ['Hoja1'],  # Por defecto, pandas lee la primera hoja
-                'active_sheet': 'Hoja1',
-                'rows': len(self.source_df),
-                'columns_count': len(self.source_df.columns),
-                'columns': list(self.source_df.columns),
-                'column_names': list(self.source_df.columns),
+                'sheets': self.source_sheets,
+                'active_sheet': ', '.join(self.source_active_sheets),
+                'rows': self._source_total_rows if self.source_streaming else len(self.source_df),
+                'columns_count': len(self.source_all_columns),
+                'columns': list(self.source_all_columns),
+                'column_names': list(self.source_all_columns),
+                'loaded_columns': list(self.source_df.columns),
+                'projected': self.source_projection is not None,
+                'streaming': self.source_streaming,
                 'data_types': self.source_df.dtypes.to_dict(),
-                'memory_usage': f"{self.source_df.memory_usage(deep=True).sum() / (1024 * 1024):.2f} MB"
+                'memory_usage': f"{self.source_df.memory_usage(deep=True).sum() / (1024 * 1024):.2f} MB",
+                'reader_engine': self.source_load_info.get('reader_engine'),
+                'load_time': self.source_load_info.get('load_time'),
+                'cache_hit': self.source_load_info.get('cache_hit', False),
+                'dtype_report': self.source_load_info.get('dtype_report', {}),
+                'schema_report': self.source_load_info.get('schema_report', {})
             }
         return {}
     
@@ -138,14 +828,18 @@ class FileManager:
                 'file_path': str(self.base_file),
                 'file_name': self.base_file.name,
                 'file_size': f"{file_size_mb:.2f} MB",
-                'sheets': ['Hoja1'],  # Por defecto, pandas lee la primera hoja
-                'active_sheet': 'Hoja1',
+                'sheets': self.base_sheets,
+                'active_sheet': self.base_active_sheet,
                 'rows': len(self.base_df),
                 'columns_count': len(self.base_df.columns),
                 'columns': list(self.base_df.columns),
                 'column_names': list(self.base_df.columns),
                 'data_types': self.base_df.dtypes.to_dict(),
-                'memory_usage': f"{self.base_df.memory_usage(deep=True).sum() / (1024 * 1024):.2f} MB"
+                'memory_usage': f"{self.base_df.memory_usage(deep=True).sum() / (1024 * 1024):.2f} MB",
+                'reader_engine': self.base_load_info.get('reader_engine'),
+                'load_time': self.base_load_info.get('load_time'),
+                'cache_hit': self.base_load_info.get('cache_hit', False),
+                'dtype_report': self.base_load_info.get('dtype_report', {})
             }
         return {}
     
@@ -155,17 +849,62 @@ class FileManager:
         
         if self.source_df is None:
             errors.append("No se ha cargado un archivo fuente")
-        elif self.source_df.empty:
+        elif len(self.source_df) == 0:
             errors.append("El archivo fuente está vacío")
             
         return errors
     
+    def snapshot_source(self) -> Dict[str, Any]:
+        """
+        Escribir source_df en un archivo Arrow IPC para que los procesos trabajadores lo
+        abran con memory mapping y lean solo su rango de filas, en lugar de recibir el
+        DataFrame serializado. Mientras source_df no cambie se reutiliza el mismo archivo.
+        Devuelve {'path', 'rows', 'format'}.
+        """
+        if self.source_df is None:
+            raise ValueError("No se ha cargado un archivo fuente")
+        if self.source_streaming:
+            raise ValueError("El archivo fuente se procesa por lotes: no hay datos en memoria que copiar")
+        
+        if (self.source_snapshot and self._snapshot_frame is not None and
+                self._snapshot_frame() is self.source_df and Path(self.source_snapshot['path']).exists()):
+            return self.source_snapshot
+        
+        self.release_source_snapshot()
+        path = Path(self.settings.snapshot_dir) / f"{self.source_file.stem}_{uuid.uuid4().hex[:8]}.arrow"
+        self.source_snapshot = write_snapshot(self.source_df, path)
+        self._snapshot_frame = weakref.ref(self.source_df)
+        return self.source_snapshot
+    
+    def release_source_snapshot(self):
+        """Borrar el snapshot del archivo fuente, si existe"""
+        if self.source_snapshot:
+            try:
+                Path(self.source_snapshot['path']).unlink(missing_ok=True)
+            except OSError as e:
+                self.logger.warning(f"No se pudo borrar el snapshot {self.source_snapshot['path']}: {e}")
+        self.source_snapshot = None
+        self._snapshot_frame = None
+    
     def clear_files(self):
         """Limpiar archivos cargados"""
+        self.release_source_snapshot()
         self.source_file = None
         self.base_file = None
         self.source_df = None
         self.base_df = None
+        self.source_load_info = {}
+        self.base_load_info = {}
+        self.source_sheets = []
+        self.source_active_sheets = []
+        self.source_all_columns = []
+        self.source_projection = None
+        self._source_total_rows = 0
+        self._source_preview = None
+        self.source_streaming = False
+        self.source_parts = []
+        self.base_sheets = []
+        self.base_active_sheet = None
         self.logger.info("Archivos limpiados")
     
     def get_source_data(self) -> Optional[pd.DataFrame]:
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+"""
+Índice compacto de mapeo respaldado por arreglos NumPy
+"""
+
+import sys
+import unicodedata
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from config.constants import KEY_POLICIES
+
+def _as_object_array(values: Iterable[Any]) -> np.ndarray:
+    """Convertir un iterable a arreglo NumPy de objetos"""
+    if isinstance(values, (np.ndarray, pd.Series, pd.Index)):
+        return np.asarray(values, dtype=object)
+    return np.asarray(list(values), dtype=object)
+
+def _hash_keys(keys: np.ndarray) -> np.ndarray:
+    """Calcular hashes uint64 estables de un arreglo de claves de texto"""
+    if len(keys) == 0:
+        return np.empty(0, dtype=np.uint64)
+    return pd.util.hash_array(keys, categorize=True)
+
+def _smallest_code_dtype(max_code: int) -> np.dtype:
+    """Tipo entero más pequeño capaz de representar los códigos de valor"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if max_code < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+def normalize_text_keys(values: Iterable[Any]) -> np.ndarray:
+    """Convertir valores a claves de texto igual que str(valor).strip()"""
+    series = values if isinstance(values, pd.Series) else pd.Series(_as_object_array(values))
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Se normalizan solo las categorías; los valores faltantes quedan como 'nan', igual que en object
+        categories = normalize_text_keys(pd.Series(series.cat.categories, dtype=object))
+        keys = np.append(categories, 'nan').astype(object)
+        return keys[series.cat.codes.to_numpy()]
+    if isinstance(series.dtype, pd.StringDtype):
+        # Texto de pandas o de Arrow: mismas claves que el texto en object
+        series = series.astype(object).where(series.notna(), np.nan)
+    return series.map(str).str.strip().to_numpy(dtype=object)
+
+def parse_key_policy(policy: Optional[str]) -> Tuple[str, Optional[int]]:
+    """Separar nombre y parámetro de una política de clave ('zero_padded:6' -> ('zero_padded', 6))"""
+    if not policy:
+        return 'text', None
+    name, _, parameter = str(policy).partition(':')
+    if name not in KEY_POLICIES:
+        raise ValueError(f"Política de clave no soportada: {policy}")
+    return name, int(parameter) if parameter else None
+
+def _integer_keys(text: pd.Series) -> pd.Series:
+    """Claves enteras canónicas ('001', '1.0', 1 -> '1'); NaN si el valor no es un entero"""
+    # Los dígitos se normalizan como texto para no perder precisión en códigos largos
+    digits = text.str.extract(r'^([+-]?)0*(\d+?)(?:\.0*)?$')
+    result = (digits[0].str.replace('+', '', regex=False) + digits[1]).where(digits[1].notna())
+
+    # Notación científica u otros formatos numéricos que representan enteros (1e+16)
+    pending = result.isna()
+    if pending.any():
+        numbers = pd.to_numeric(text[pending], errors='coerce')
+        integral = numbers.notna() & np.isfinite(numbers) & (numbers % 1 == 0) & (numbers.abs() < 2 ** 63)
+        result[numbers[integral].index] = numbers[integral].astype(np.int64).astype(str)
+    return result
+
+def _parse_dates(text: pd.Series, dayfirst: bool) -> pd.Series:
+    """Convertir texto a fechas admitiendo formatos mezclados"""
+    try:
+        return pd.to_datetime(text, errors='coerce', dayfirst=dayfirst, format='mixed')
+    except (TypeError, ValueError):
+        # Versiones de pandas sin format='mixed'
+        return pd.to_datetime(text, errors='coerce', dayfirst=dayfirst)
+
+def _date_keys(text: pd.Series) -> pd.Series:
+    """Claves de fecha en formato ISO (AAAA-MM-DD); NaN si el valor no es una fecha"""
+    result = pd.Series(np.nan, index=text.index, dtype=object)
+    # Los números sueltos no se interpretan como fechas
+    candidates = ~text.str.fullmatch(r'[+-]?\d+(\.\d*)?').fillna(False).astype(bool)
+    iso = candidates & text.str.match(r'^\d{4}-\d{2}-\d{2}').fillna(False).astype(bool)
+    local = candidates & ~iso
+
+    for mask, dayfirst in ((iso, False), (local, True)):
+        if mask.any():
+            dates = _parse_dates(text[mask], dayfirst)
+            dates = dates[dates.notna()]
+            result[dates.index] = dates.dt.strftime('%Y-%m-%d').to_numpy(dtype=object)
+    return result
+
+def normalize_keys(values: Iterable[Any], policy: Optional[str] = 'text') -> np.ndarray:
+    """
+    Normalizar claves de mapeo según una política de tipo.
+
+    text: str(valor).strip(). integer: enteros canónicos ('001', '1.0' -> '1').
+    numeric: números canónicos ('1.50' -> '1.5'). zero_padded[:N]: códigos numéricos
+    rellenados con ceros a N dígitos. date: fechas en ISO. Los valores que no encajan
+    en la política se comparan como texto.
+    """
+    name, width = parse_key_policy(policy)
+    text_keys = normalize_text_keys(values)
+    if name == 'text' or len(text_keys) == 0:
+        return text_keys
+
+    text = pd.Series(text_keys, dtype=object)
+    if name == 'date':
+        normalized = _date_keys(text)
+    else:
+        normalized = _integer_keys(text)
+        if name == 'numeric':
+            pending = normalized.isna()
+            numbers = pd.to_numeric(text[pending], errors='coerce')
+            numbers = numbers[numbers.notna()]
+            normalized[numbers.index] = numbers.astype(np.float64).map(str)
+        elif name == 'zero_padded' and width:
+            codes = normalized.notna() & ~normalized.str.startswith('-').fillna(False).astype(bool)
+            normalized[codes] = normalized[codes].str.zfill(width)
+
+    return normalized.fillna(text).to_numpy(dtype=object)
+
+# Contadores de las estadísticas de búsqueda: aciertos exactos, por trigramas, sin
+# distinguir mayúsculas y fallos
+LOOKUP_COUNTERS = ('hits', 'fuzzy_hits', 'casefold_hits', 'misses')
+
+def summarize_lookup(keys: np.ndarray, hits: np.ndarray, second_hits: np.ndarray,
+                     second_counter: str = 'fuzzy_hits') -> Dict[str, Any]:
+    """
+    Resumir una búsqueda masiva: aciertos, aciertos de la segunda búsqueda (por trigramas,
+    'fuzzy_hits', o sin distinguir mayúsculas, 'casefold_hits'), fallos y claves faltantes
+    """
+    misses = ~(hits | second_hits)
+    missed_keys = pd.Series(keys[misses], dtype=object).value_counts()
+    return {
+        'hits': int(hits.sum()),
+        second_counter: int(second_hits.sum()),
+        'misses': int(misses.sum()),
+        'missed_keys': {key: int(count) for key, count in missed_keys.items()}
+    }
+
+def merge_lookup_stats(total: Dict[str, Any], partial: Dict[str, Any]) -> Dict[str, Any]:
+    """Acumular estadísticas de búsqueda de varios lotes"""
+    for counter in LOOKUP_COUNTERS:
+        if counter not in total and counter not in partial:
+            continue
+        total[counter] = total.get(counter, 0) + partial.get(counter, 0)
+    missed_keys = total.setdefault('missed_keys', {})
+    for key, count in partial.get('missed_keys', {}).items():
+        missed_keys[key] = missed_keys.get(key, 0) + count
+    return total
+
+class MappingIndex:
+    """
+    Índice clave -> valor de bajo consumo de memoria.
+
+    Las claves se guardan como hashes de 64 bits ordenados y los valores como
+    códigos enteros sobre un arreglo de valores únicos. Las búsquedas masivas
+    se resuelven con searchsorted. Las colisiones entre claves del índice se
+    detectan al construirlo; la probabilidad de que una clave ausente coincida
+    con el hash de otra es despreciable (2^-64 por consulta).
+    """
+
+    def __init__(self, key_hashes: np.ndarray, value_codes: np.ndarray, value_categories: np.ndarray):
+        self._hashes = key_hashes
+        self._codes = value_codes
+        # El último elemento es NaN para que el código -1 represente valores nulos
+        self._categories = value_categories
+
+    @classmethod
+    def from_arrays(cls, keys: Iterable[Any], values: Iterable[Any]) -> 'MappingIndex':
+        """Construir el índice desde arreglos de claves de texto y valores"""
+        keys = _as_object_array(keys)
+        values = _as_object_array(values)
+
+        if len(keys) != len(values):
+            raise ValueError("Las claves y los valores deben tener la misma longitud")
+
+        # Igual que un diccionario: la última aparición de cada clave gana
+        keep = ~pd.Index(keys).duplicated(keep='last')
+        keys, values = keys[keep], values[keep]
+
+        hashes = _hash_keys(keys)
+        order = np.argsort(hashes, kind='stable')
+        sorted_hashes = hashes[order]
+
+        if len(sorted_hashes) > 1 and (np.diff(sorted_hashes) == 0).any():
+            raise ValueError("Colisión de hash entre claves del índice de mapeo")
+
+        codes, uniques = pd.factorize(values[order])
+        categories = np.append(np.asarray(uniques, dtype=object), np.nan)
+        codes = codes.astype(_smallest_code_dtype(len(categories)))
+
+        return cls(sorted_hashes, codes, categories)
+
+    @classmethod
+    def from_dict(cls, mapping: Dict[str, Any]) -> 'MappingIndex':
+        """Construir el índice desde un diccionario de mapeo"""
+        return cls.from_arrays(list(mapping.keys()), list(mapping.values()))
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def __contains__(self, key: Any) -> bool:
+        return bool(self.positions([key])[0] >= 0)
+
+    def __getitem__(self, key: Any) -> Any:
+        position = self.positions([key])[0]
+        if position < 0:
+            raise KeyError(key)
+        return self._categories[self._codes[position]]
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria aproximada ocupada por los arreglos del índice"""
+        categories_bytes = sum(sys.getsizeof(v) for v in self._categories)
+        return self._hashes.nbytes + self._codes.nbytes + self._categories.nbytes + categories_bytes
+
+    @property
+    def null_count(self) -> int:
+        """Número de claves cuyo valor es nulo"""
+        return int((self._codes == -1).sum())
+
+    @property
+    def unique_values(self) -> np.ndarray:
+        """Valores distintos (no nulos) del índice"""
+        return self._categories[:-1]
+
+    def positions(self, keys: Iterable[Any]) -> np.ndarray:
+        """Resolver posiciones de un lote de claves de texto (-1 si no existen)"""
+        hashes = _hash_keys(_as_object_array(keys))
+        if len(self._hashes) == 0:
+            return np.full(len(hashes), -1, dtype=np.int64)
+
+        positions = np.searchsorted(self._hashes, hashes)
+        positions = np.minimum(positions, len(self._hashes) - 1)
+        found = self._hashes[positions] == hashes
+        return np.where(found, positions, -1)
+
+    def take(self, positions: np.ndarray, default: Any = None) -> np.ndarray:
+        """Obtener los valores de un lote de posiciones, usando default para las ausentes"""
+        found = positions >= 0
+        result = np.empty(len(positions), dtype=object)
+        result[found] = self._categories[self._codes[positions[found]]]
+        result[~found] = default
+        return result
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Obtener el valor de una clave"""
+        position = self.positions([key])[0]
+        if position < 0:
+            return default
+        return self._categories[self._codes[position]]
+
+    def apply(self, values: pd.Series, default: Any = None) -> pd.Series:
+        """Aplicar el mapeo a una serie completa (las claves se comparan como str(valor).strip())"""
+        positions = self.positions(normalize_text_keys(values))
+        return pd.Series(self.take(positions, default), index=values.index, dtype=object)
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Trigramas de caracteres de un texto en minúsculas y sin tildes"""
+    normalized = unicodedata.normalize('NFKD', str(text).strip().lower())
+    normalized = ''.join(char for char in normalized if not unicodedata.combining(char))
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TrigramIndex:
+    """
+    Índice invertido de trigramas para búsqueda aproximada de claves.
+
+    La similitud entre dos textos es la de Jaccard sobre sus conjuntos de
+    trigramas; los candidatos se obtienen solo de las listas de los trigramas
+    que comparten con el texto buscado.
+    """
+
+    def __init__(self, keys: Iterable[Any]):
+        self.keys = _as_object_array(keys)
+        self._sizes = np.empty(len(self.keys), dtype=np.int32)
+
+        postings: Dict[str, List[int]] = {}
+        for position, key in enumerate(self.keys):
+            grams = _trigrams(key)
+            self._sizes[position] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(position)
+
+        self._postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def best_match(self, text: Any, threshold: float = 0.6) -> Tuple[Optional[Any], float]:
+        """Obtener la clave más parecida y su similitud (None si no supera el umbral)"""
+        grams = _trigrams(text)
+        candidate_lists = [self._postings[gram] for gram in grams if gram in self._postings]
+        if not candidate_lists:
+            return None, 0.0
+
+        candidates, shared = np.unique(np.concatenate(candidate_lists), return_counts=True)
+        similarity = shared / (len(grams) + self._sizes[candidates] - shared)
+        best = int(similarity.argmax())
+
+        if similarity[best] < threshold:
+            return None, float(similarity[best])
+        return self.keys[candidates[best]], float(similarity[best])
+
+    def match_many(self, texts: Iterable[Any], threshold: float = 0.6) -> Dict[Any, Any]:
+        """Resolver un lote de textos distintos: {texto: clave encontrada}"""
+        matches = {}
+        for text in texts:
+            key, _ = self.best_match(text, threshold)
+            if key is not None:
+                matches[text] = key
+        return matches
@@ -3,24 +3,266 @@
 Gestor de mapeo dinámico desde archivo base
 """
 
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Any, Tuple
 import logging
+from core.disk_cache import DiskCache, file_fingerprint
+from core.mapping_index import MappingIndex, TrigramIndex, normalize_keys, normalize_text_keys, summarize_lookup
+from core.readers import read_excel_columns, read_excel_header
+from utils.exceptions import MappingError
 
 class MappingManager:
     """Gestor para mapeo de datos desde archivo base"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[DiskCache] = None):
         self.mappings: Dict[str, Dict] = {}
         self.logger = logging.getLogger(__name__)
         self.base_df = None  # Agregar referencia al archivo base
+        self.base_file: Optional[str] = None
+        self.cache = cache  # Cache en disco de índices de mapeo (opcional)
+        self.apply_stats: Dict[str, Dict[str, Any]] = {}  # Aciertos/fallos de la última aplicación
+        self.base_delta: Optional[Dict[str, Any]] = None  # Filas cambiadas en la última recarga del archivo base
     
-    def set_base_dataframe(self, base_df: pd.DataFrame):
+    def set_base_dataframe(self, base_df: pd.DataFrame, base_file: str = None, incremental: bool = True):
         """Establecer el DataFrame base para crear mapeos"""
+        previous_df = self.base_df
         self.base_df = base_df
+        self.base_file = base_file
+        self.base_delta = None
         self.logger.info(f"DataFrame base establecido con {len(base_df)} filas")
+        
+        # Al recargar el mismo catálogo solo se aplican las filas cambiadas a los mapeos existentes
+        if incremental and previous_df is not None and previous_df is not base_df:
+            self.base_delta = self.compute_base_delta(previous_df, base_df)
+            if self.base_delta is not None:
+                self._update_mappings_from_delta()
+    
+    @staticmethod
+    def _canonical_values(series: pd.Series) -> pd.Series:
+        """
+        Valores de una columna con un tipo que no depende de la optimización de tipos:
+        números como float64 y el resto (category, texto Arrow) como object
+        """
+        if pd.api.types.is_bool_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        if pd.api.types.is_numeric_dtype(series):
+            return series.astype('float64')
+        return series.astype(object)
+    
+    def _row_hashes(self, df: pd.DataFrame) -> pd.MultiIndex:
+        """
+        Hash de cada fila junto con su número de aparición (para distinguir filas idénticas).
+        
+        El hash de pandas depende del tipo de cada columna, y la optimización de tipos puede
+        cargar la misma columna como float32 en una versión y float64 en otra (o como
+        category y texto), por lo que se calcula sobre los valores normalizados.
+        """
+        canonical = pd.DataFrame({position: self._canonical_values(df.iloc[:, position])
+                                  for position in range(df.shape[1])}, index=df.index)
+        hashes = pd.util.hash_pandas_object(canonical, index=False)
+        occurrence = hashes.groupby(hashes.to_numpy()).cumcount()
+        return pd.MultiIndex.from_arrays([hashes.to_numpy(), occurrence.to_numpy()])
+    
+    def compute_base_delta(self, previous_df: pd.DataFrame, new_df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """
+        Comparar dos versiones del archivo base por hash de fila.
+        
+        Devuelve las filas eliminadas (de la versión anterior) y la máscara de filas
+        insertadas o modificadas de la nueva versión, o None si las columnas cambiaron
+        y no es posible una actualización incremental. Un cambio de orden sin cambios
+        de contenido no se considera diferencia.
+        """
+        try:
+            if list(previous_df.columns) != list(new_df.columns):
+                return None
+            
+            previous_rows = self._row_hashes(previous_df)
+            new_rows = self._row_hashes(new_df)
+            removed = ~previous_rows.isin(new_rows)
+            added = ~new_rows.isin(previous_rows)
+            
+            delta = {
+                'previous_base_id': id(previous_df),
+                'removed_rows': previous_df[removed],
+                'added_mask': added,
+                'inserted_rows': int(added.sum()),
+                'deleted_rows': int(removed.sum()),
+                'unchanged_rows': int(len(new_df) - added.sum()),
+                'mappings': {}
+            }
+            self.logger.info(f"Cambios en archivo base: {delta['inserted_rows']} filas nuevas o modificadas, "
+                             f"{delta['deleted_rows']} eliminadas")
+            return delta
+            
+        except Exception as e:
+            self.logger.error(f"Error comparando versiones del archivo base: {e}")
+            return None
     
-    def add_simple_mapping(self, source_column: str, base_key_column: str, base_value_column: str) -> bool:
+    def apply_base_delta(self, mapping_dict: Dict[str, Any], key_column: str, value_column: str,
+                         key_policy: str = 'text') -> Dict[str, int]:
+        """Aplicar los cambios del archivo base a un diccionario de mapeo (en el propio diccionario)"""
+        delta = self.base_delta
+        counts = {'inserted': 0, 'updated': 0, 'deleted': 0}
+        if delta is None:
+            return counts
+        
+        # Claves tocadas por filas eliminadas o insertadas/modificadas
+        touched_keys = np.concatenate([
+            normalize_keys(delta['removed_rows'][key_column], key_policy),
+            normalize_keys(self.base_df.loc[delta['added_mask'], key_column], key_policy)
+        ])
+        touched_keys = pd.unique(touched_keys[touched_keys != ""])
+        if len(touched_keys) == 0:
+            return counts
+        
+        # Valor actual de cada clave tocada en la nueva versión: la última aparición gana
+        base_keys = normalize_keys(self.base_df[key_column], key_policy)
+        rows = np.isin(base_keys, touched_keys)
+        current = pd.Series(self.base_df[value_column].to_numpy(dtype=object)[rows], index=base_keys[rows])
+        current = current[~current.index.duplicated(keep='last')]
+        
+        for key in touched_keys:
+            if key not in current.index:
+                if key in mapping_dict:
+                    del mapping_dict[key]
+                    counts['deleted'] += 1
+                continue
+            
+            value = current[key]
+            if key not in mapping_dict:
+                counts['inserted'] += 1
+            else:
+                previous = mapping_dict[key]
+                if previous is value or (pd.isna(previous) and pd.isna(value)) or previous == value:
+                    continue
+                counts['updated'] += 1
+            mapping_dict[key] = value
+        
+        return counts
+    
+    def _update_mappings_from_delta(self):
+        """Actualizar los mapeos construidos sobre el archivo base anterior"""
+        for mapping_name, mapping_info in self.mappings.items():
+            key_column = mapping_info.get('key_column') or mapping_info.get('base_key_column')
+            value_column = mapping_info.get('value_column') or mapping_info.get('base_value_column')
+            if mapping_info.get('type') in ('join', 'range') or not key_column or not value_column:
+                continue
+            if mapping_info.get('source_file'):
+                continue  # Construido desde otro archivo, no desde el base cargado
+            if key_column not in self.base_df.columns or value_column not in self.base_df.columns:
+                continue
+            
+            if 'index' in mapping_info:
+                # El índice compacto no admite cambios puntuales: se reconstruye de forma vectorizada
+                index = MappingIndex.from_arrays(*self.build_mapping_arrays(
+                    self.base_df, key_column, value_column, mapping_info.get('key_policy', 'text')))
+                mapping_info.update({'index': index, 'total_entries': len(index), 'memory_bytes': index.nbytes})
+                counts = {'rebuilt': len(index)}
+                keys_changed = True
+            elif 'mapping' in mapping_info:
+                counts = self.apply_base_delta(mapping_info['mapping'], key_column, value_column,
+                                               mapping_info.get('key_policy', 'text'))
+                mapping_info['total_entries'] = len(mapping_info['mapping'])
+                keys_changed = counts['inserted'] or counts['deleted']
+            else:
+                continue
+            
+            if keys_changed and 'fuzzy_index' in mapping_info:
+                self.enable_fuzzy_matching(mapping_name, mapping_info['fuzzy_threshold'])
+            
+            self.base_delta['mappings'][mapping_name] = counts
+            self.logger.info(f"Mapeo '{mapping_name}' actualizado de forma incremental: {counts}")
+    
+    def get_base_delta(self) -> Dict[str, Any]:
+        """Obtener el resumen de cambios de la última recarga del archivo base"""
+        if self.base_delta is None:
+            return {}
+        return {key: value for key, value in self.base_delta.items()
+                if key in ('inserted_rows', 'deleted_rows', 'unchanged_rows', 'mappings')}
+    
+    def build_mapping_arrays(self, base_df: pd.DataFrame, key_column: str,
+                             value_column: str, key_policy: str = 'text') -> Tuple[np.ndarray, np.ndarray]:
+        """Construir arreglos de claves y valores de un mapeo de forma vectorizada"""
+        keys = normalize_keys(base_df[key_column], key_policy)
+        valid = keys != ""
+        
+        frame = pd.DataFrame({
+            'key': keys[valid],
+            'value': base_df[value_column].to_numpy(dtype=object)[valid]
+        })
+        
+        # Mismas reglas que el diccionario: orden de primera aparición, valor de la última
+        last_values = frame.drop_duplicates('key', keep='last').set_index('key')['value']
+        ordered_keys = frame['key'].drop_duplicates(keep='first')
+        values = last_values.reindex(ordered_keys)
+        
+        return ordered_keys.to_numpy(dtype=object), values.to_numpy(dtype=object)
+    
+    def _mapping_cache_key(self, base_file: str, key_column: str, value_column: str,
+                           normalization: str, sheet_name: Optional[str] = None) -> Optional[str]:
+        """Calcular la clave de cache de un índice de mapeo"""
+        if self.cache is None or not base_file:
+            return None
+        try:
+            fingerprint = file_fingerprint(base_file)
+        except OSError as e:
+            self.logger.warning(f"No se pudo obtener la huella del archivo base: {e}")
+            return None
+        parts = ['mapping', fingerprint['path'], fingerprint['size'], fingerprint['mtime'],
+                 fingerprint['content_hash'], key_column, value_column, normalization]
+        if sheet_name is not None:
+            parts.append(sheet_name)
+        return self.cache.make_key(*parts)
+    
+    def get_mapping_arrays(self, key_column: str, value_column: str,
+                           base_df: pd.DataFrame = None,
+                           base_file: str = None,
+                           sheet_name: Optional[str] = None,
+                           key_policy: str = 'text') -> Tuple[np.ndarray, np.ndarray]:
+        """Obtener arreglos clave/valor desde el cache en disco o construirlos"""
+        # El DataFrame base cargado solo se usa si corresponde al archivo pedido
+        if base_df is None and (base_file is None or base_file == self.base_file) and sheet_name is None:
+            base_df = self.base_df
+        base_file = base_file or self.base_file
+        normalization = key_policy or 'text'
+        
+        cache_key = self._mapping_cache_key(base_file, key_column, value_column, normalization, sheet_name)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.logger.info(f"Índice de mapeo '{key_column}' -> '{value_column}' leído desde cache")
+                return cached['keys'], cached['values']
+        
+        if base_df is None:
+            if not base_file:
+                raise ValueError("No se ha cargado un archivo base para crear el mapeo")
+            # Leer solo las columnas clave y valor del archivo, sin cargar el catálogo completo
+            base_df = read_excel_columns(base_file, list(dict.fromkeys([key_column, value_column])), sheet_name)
+        
+        keys, values = self.build_mapping_arrays(base_df, key_column, value_column, normalization)
+        
+        if cache_key:
+            self.cache.set(cache_key, {
+                'keys': keys,
+                'values': values,
+                'normalization': normalization,
+                'key_column': key_column,
+                'value_column': value_column
+            })
+        
+        return keys, values
+    
+    def get_mapping_dict(self, key_column: str, value_column: str,
+                         base_df: pd.DataFrame = None, base_file: str = None,
+                         key_policy: str = 'text') -> Dict[str, Any]:
+        """Obtener diccionario de mapeo clave -> valor, reutilizando el cache si existe"""
+        keys, values = self.get_mapping_arrays(key_column, value_column, base_df, base_file,
+                                               key_policy=key_policy)
+        return dict(zip(keys, values))
+    
+    def add_simple_mapping(self, source_column: str, base_key_column: str, base_value_column: str,
+                           key_policy: str = 'text') -> bool:
         """Agregar mapeo simple usando el archivo base"""
         try:
             if self.base_df is None:
@@ -36,13 +278,7 @@ class MappingManager:
             mapping_name = f"simple_{source_column}_{base_key_column}_{base_value_column}"
             
             # Crear diccionario de mapeo real
-            mapping_dict = {}
-            for _, row in self.base_df.iterrows():
-                key = str(row[base_key_column]).strip()
-                value = row[base_value_column]
-                
-                if pd.notna(key) and key != "":
-                    mapping_dict[key] = value
+            mapping_dict = self.get_mapping_dict(base_key_column, base_value_column, key_policy=key_policy)
             
             # Guardar mapeo completo
             self.mappings[mapping_name] = {
@@ -51,6 +287,7 @@ class MappingManager:
                 'base_key_column': base_key_column,
                 'base_value_column': base_value_column,
                 'mapping': mapping_dict,  # Este es el diccionario que necesita ExportManager
+                'key_policy': key_policy,
                 'total_entries': len(mapping_dict)
             }
             
@@ -65,7 +302,8 @@ class MappingManager:
                       base_df: pd.DataFrame,
                       key_column: str,
                       value_column: str,
-                      mapping_name: str) -> bool:
+                      mapping_name: str,
+                      key_policy: str = 'text') -> bool:
         """Crear mapeo desde archivo base"""
         try:
             # Validar columnas
@@ -76,19 +314,15 @@ class MappingManager:
                 raise ValueError(f"Columna valor no encontrada: {value_column}")
             
             # Crear diccionario de mapeo
-            mapping_dict = {}
-            for _, row in base_df.iterrows():
-                key = str(row[key_column]).strip()
-                value = row[value_column]
-                
-                if pd.notna(key) and key != "":
-                    mapping_dict[key] = value
+            keys, values = self.build_mapping_arrays(base_df, key_column, value_column, key_policy)
+            mapping_dict = dict(zip(keys, values))
             
             # Guardar mapeo
             self.mappings[mapping_name] = {
                 'mapping': mapping_dict,
                 'key_column': key_column,
                 'value_column': value_column,
+                'key_policy': key_policy,
                 'total_entries': len(mapping_dict)
             }
             
@@ -99,6 +333,99 @@ class MappingManager:
             self.logger.error(f"Error creando mapeo: {e}")
             return False
     
+    def create_compact_mapping(self,
+                               key_column: str,
+                               value_column: str,
+                               mapping_name: str,
+                               base_df: pd.DataFrame = None,
+                               base_file: str = None,
+                               key_policy: str = 'text') -> bool:
+        """Crear mapeo compacto (arreglos NumPy) para catálogos muy grandes"""
+        try:
+            base_df = base_df if base_df is not None else self.base_df
+            if base_df is not None:
+                if key_column not in base_df.columns:
+                    raise ValueError(f"Columna clave no encontrada: {key_column}")
+                
+                if value_column not in base_df.columns:
+                    raise ValueError(f"Columna valor no encontrada: {value_column}")
+            
+            keys, values = self.get_mapping_arrays(key_column, value_column, base_df, base_file,
+                                                   key_policy=key_policy)
+            index = MappingIndex.from_arrays(keys, values)
+            
+            # Guardar mapeo
+            self.mappings[mapping_name] = {
+                'type': 'compact',
+                'index': index,
+                'key_column': key_column,
+                'value_column': value_column,
+                'key_policy': key_policy,
+                'total_entries': len(index),
+                'memory_bytes': index.nbytes
+            }
+            
+            self.logger.info(f"Mapeo compacto '{mapping_name}' creado con {len(index)} entradas "
+                             f"({index.nbytes / (1024 * 1024):.2f} MB)")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error creando mapeo compacto: {e}")
+            return False
+    
+    def create_mapping_from_file(self,
+                                 file_path: str,
+                                 key_column: str,
+                                 value_column: str,
+                                 mapping_name: str,
+                                 sheet_name: Optional[str] = None,
+                                 compact: bool = True,
+                                 key_policy: str = 'text') -> bool:
+        """Crear mapeo leyendo por streaming solo las columnas clave y valor del archivo base"""
+        try:
+            header = read_excel_header(file_path, sheet_name) if str(file_path).lower().endswith('.xlsx') else None
+            if header is not None:
+                if key_column not in header:
+                    raise ValueError(f"Columna clave no encontrada: {key_column}")
+                
+                if value_column not in header:
+                    raise ValueError(f"Columna valor no encontrada: {value_column}")
+            
+            keys, values = self.get_mapping_arrays(key_column, value_column, base_file=file_path,
+                                                   sheet_name=sheet_name, key_policy=key_policy)
+            
+            if compact:
+                index = MappingIndex.from_arrays(keys, values)
+                mapping_info = {
+                    'type': 'compact',
+                    'index': index,
+                    'total_entries': len(index),
+                    'memory_bytes': index.nbytes
+                }
+            else:
+                mapping_dict = dict(zip(keys, values))
+                mapping_info = {
+                    'mapping': mapping_dict,
+                    'total_entries': len(mapping_dict)
+                }
+            
+            # Guardar mapeo
+            self.mappings[mapping_name] = {
+                **mapping_info,
+                'key_column': key_column,
+                'value_column': value_column,
+                'key_policy': key_policy,
+                'source_file': str(file_path),
+                'sheet_name': sheet_name
+            }
+            
+            self.logger.info(f"Mapeo '{mapping_name}' creado desde {file_path} con {mapping_info['total_entries']} entradas")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error creando mapeo desde archivo: {e}")
+            return False
+    
     def apply_mapping(self,
                      source_df: pd.DataFrame,
                      source_column: str,
@@ -112,20 +439,101 @@ class MappingManager:
             if source_column not in source_df.columns:
                 raise ValueError(f"Columna fuente no encontrada: {source_column}")
             
-            mapping_dict = self.mappings[mapping_name]['mapping']
-            mapped_values = []
+            mapping_info = self.mappings[mapping_name]
+            if mapping_info.get('type') == 'range':
+                return self.apply_range_mapping(source_df, source_column, mapping_name, default_value)
             
-            for _, row in source_df.iterrows():
-                source_value = str(row[source_column]).strip()
-                mapped_value = mapping_dict.get(source_value, default_value)
-                mapped_values.append(mapped_value)
+            source_values = normalize_keys(source_df[source_column], mapping_info.get('key_policy', 'text'))
+            mapped_values, hits, fuzzy_hits = self._resolve_keys(mapping_info, source_values, default_value)
             
-            return mapped_values
+            self.apply_stats[mapping_name] = {
+                'source_column': source_column,
+                **summarize_lookup(source_values, hits, fuzzy_hits)
+            }
+            
+            return mapped_values.tolist()
             
         except Exception as e:
             self.logger.error(f"Error aplicando mapeo: {e}")
             return []
     
+    def _exact_lookup(self, mapping_info: Dict[str, Any], keys: np.ndarray,
+                      default_value: Any = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Buscar claves normalizadas de forma exacta: devuelve valores y máscara de aciertos"""
+        if 'index' in mapping_info:
+            index = mapping_info['index']
+            positions = index.positions(keys)
+            return index.take(positions, default_value), positions >= 0
+        
+        mapping_dict = mapping_info['mapping']
+        values = np.empty(len(keys), dtype=object)
+        hits = np.zeros(len(keys), dtype=bool)
+        for position, key in enumerate(keys):
+            if key in mapping_dict:
+                values[position] = mapping_dict[key]
+                hits[position] = True
+            else:
+                values[position] = default_value
+        return values, hits
+    
+    def _resolve_keys(self, mapping_info: Dict[str, Any], keys: np.ndarray,
+                      default_value: Any = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Resolver claves normalizadas: devuelve valores, aciertos exactos y aciertos aproximados"""
+        values, hits = self._exact_lookup(mapping_info, keys, default_value)
+        
+        fuzzy_hits = np.zeros(len(keys), dtype=bool)
+        fuzzy_index = mapping_info.get('fuzzy_index')
+        
+        if fuzzy_index is not None and not hits.all():
+            # Solo se consultan las claves fallidas distintas, no cada fila
+            missed_keys = pd.unique(keys[~hits])
+            matches = fuzzy_index.match_many(missed_keys, mapping_info['fuzzy_threshold'])
+            
+            if matches:
+                matched_keys = pd.Series(keys).map(matches).to_numpy(dtype=object)
+                fuzzy_hits = ~hits & pd.notna(matched_keys)
+                values[fuzzy_hits], _ = self._exact_lookup(mapping_info, matched_keys[fuzzy_hits], default_value)
+        
+        return values, hits, fuzzy_hits
+    
+    def enable_fuzzy_matching(self, mapping_name: str, threshold: float = 0.6) -> bool:
+        """Activar búsqueda aproximada (índice de trigramas) para las claves sin coincidencia exacta"""
+        try:
+            if mapping_name not in self.mappings:
+                raise ValueError(f"Mapeo no encontrado: {mapping_name}")
+            
+            if not 0 < threshold <= 1:
+                raise ValueError("El umbral de similitud debe estar entre 0 y 1")
+            
+            mapping_info = self.mappings[mapping_name]
+            
+            if 'index' in mapping_info:
+                # El índice compacto no conserva las claves: se recuperan del cache o del archivo base
+                keys, _ = self.get_mapping_arrays(mapping_info['key_column'], mapping_info['value_column'],
+                                                  base_file=mapping_info.get('source_file'),
+                                                  sheet_name=mapping_info.get('sheet_name'),
+                                                  key_policy=mapping_info.get('key_policy', 'text'))
+            elif 'mapping' in mapping_info and mapping_info.get('type') != 'join':
+                keys = list(mapping_info['mapping'].keys())
+            else:
+                raise ValueError(f"El mapeo '{mapping_name}' no admite búsqueda aproximada")
+            
+            mapping_info['fuzzy_index'] = TrigramIndex(keys)
+            mapping_info['fuzzy_threshold'] = threshold
+            
+            self.logger.info(f"Búsqueda aproximada activada en '{mapping_name}' (umbral {threshold})")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error activando búsqueda aproximada: {e}")
+            return False
+    
+    def disable_fuzzy_matching(self, mapping_name: str):
+        """Desactivar la búsqueda aproximada de un mapeo"""
+        if mapping_name in self.mappings:
+            self.mappings[mapping_name].pop('fuzzy_index', None)
+            self.mappings[mapping_name].pop('fuzzy_threshold', None)
+    
     def create_multi_column_mapping(self,
                                   base_df: pd.DataFrame,
                                   key_columns: List[str],
@@ -217,6 +625,234 @@ class MappingManager:
         except Exception as e:
             self.logger.error(f"Error aplicando mapeo multi-columna: {e}")
             return []
+
+    def _prepare_join_key(self, series: pd.Series) -> pd.Series:
+        """Preparar una columna clave para join conservando su tipo"""
+        # Solo las columnas de texto se limpian; las numéricas y fechas se mantienen tipadas
+        if pd.api.types.infer_dtype(series, skipna=True) == 'string':
+            stripped = series.str.strip()
+            return stripped.where(stripped != "")
+        return series
+
+    def create_join_mapping(self,
+                            base_df: pd.DataFrame,
+                            key_columns: List[str],
+                            value_columns: List[str],
+                            mapping_name: str) -> bool:
+        """Crear mapeo multi-columna por join sobre claves tipadas (sin claves compuestas de texto)"""
+        try:
+            # Validar columnas
+            missing_keys = [col for col in key_columns if col not in base_df.columns]
+            missing_values = [col for col in value_columns if col not in base_df.columns]
+
+            if missing_keys:
+                raise ValueError(f"Columnas clave no encontradas: {missing_keys}")
+
+            if missing_values:
+                raise ValueError(f"Columnas valor no encontradas: {missing_values}")
+
+            value_only = [col for col in value_columns if col not in key_columns]
+            lookup = base_df[key_columns + value_only].copy()
+
+            for col in key_columns:
+                lookup[col] = self._prepare_join_key(lookup[col])
+
+            # Descartar claves vacías y conservar la última aparición, igual que el mapeo por diccionario
+            lookup = lookup.dropna(subset=key_columns)
+            lookup = lookup.drop_duplicates(subset=key_columns, keep='last').reset_index(drop=True)
+
+            # Guardar mapeo
+            self.mappings[mapping_name] = {
+                'type': 'join',
+                'lookup': lookup,
+                'key_columns': key_columns,
+                'value_columns': value_columns,
+                'total_entries': len(lookup)
+            }
+
+            self.logger.info(f"Mapeo por join '{mapping_name}' creado con {len(lookup)} entradas")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error creando mapeo por join: {e}")
+            return False
+
+    def apply_join_mapping(self,
+                           source_df: pd.DataFrame,
+                           source_columns: List[str],
+                           mapping_name: str,
+                           value_columns: List[str] = None,
+                           default_value: Any = None) -> pd.DataFrame:
+        """Aplicar mapeo por join y devolver todas las columnas valor en una sola pasada"""
+        try:
+            if mapping_name not in self.mappings:
+                raise ValueError(f"Mapeo no encontrado: {mapping_name}")
+
+            mapping_info = self.mappings[mapping_name]
+            if mapping_info.get('type') != 'join':
+                raise ValueError(f"El mapeo '{mapping_name}' no es de tipo join")
+
+            lookup = mapping_info['lookup']
+            key_columns = mapping_info['key_columns']
+            value_columns = value_columns or mapping_info['value_columns']
+
+            # Validar columnas fuente
+            missing_columns = [col for col in source_columns if col not in source_df.columns]
+            if missing_columns:
+                raise ValueError(f"Columnas fuente no encontradas: {missing_columns}")
+
+            if len(source_columns) != len(key_columns):
+                raise ValueError(f"Se esperaban {len(key_columns)} columnas fuente, se recibieron {len(source_columns)}")
+
+            left = pd.DataFrame({
+                key_col: self._prepare_join_key(source_df[source_col]).to_numpy()
+                for source_col, key_col in zip(source_columns, key_columns)
+            })
+            right = lookup[key_columns + [col for col in value_columns if col not in key_columns]]
+
+            # Si los tipos no son compatibles se comparan como texto; contra una columna
+            # numérica los números se normalizan antes (1.0 = '1', 1.5 = '1.50')
+            for key_col in key_columns:
+                left_key, right_key = left[key_col], right[key_col]
+                left_numeric = pd.api.types.is_numeric_dtype(left_key)
+                right_numeric = pd.api.types.is_numeric_dtype(right_key)
+                if left_key.dtype != right_key.dtype and not (left_numeric and right_numeric):
+                    policy = 'numeric' if left_numeric or right_numeric else 'text'
+                    left[key_col] = pd.Series(normalize_keys(left_key, policy)).where(left_key.notna())
+                    right = right.assign(**{key_col: normalize_keys(right_key, policy)})
+
+            try:
+                merged = left.merge(right, on=key_columns, how='left',
+                                    validate='many_to_one', indicator=True, sort=False)
+            except pd.errors.MergeError as e:
+                # Claves distintas en la base que coinciden al compararse como texto
+                raise MappingError(f"El mapeo '{mapping_name}' tiene claves duplicadas al comparar "
+                                   f"con la fuente: {e}") from e
+
+            result = merged[value_columns].copy()
+            if default_value is not None:
+                matched = merged['_merge'] == 'both'
+                for col in value_columns:
+                    result[col] = result[col].where(matched, default_value)
+            result.index = source_df.index
+
+            return result
+
+        except MappingError as e:
+            self.logger.error(f"Error aplicando mapeo por join: {e}")
+            raise
+        except Exception as e:
+            self.logger.error(f"Error aplicando mapeo por join: {e}")
+            return pd.DataFrame()
+
+    def _prepare_range_bounds(self, series: pd.Series, as_dates: bool) -> np.ndarray:
+        """Convertir límites o valores a buscar en un arreglo ordenable (números o fechas)"""
+        if as_dates:
+            return pd.to_datetime(series, errors='coerce').to_numpy(dtype='datetime64[ns]')
+        return pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64)
+
+    def create_range_mapping(self,
+                             base_df: pd.DataFrame,
+                             lower_column: str,
+                             value_column: str,
+                             mapping_name: str,
+                             upper_column: str = None) -> bool:
+        """
+        Crear mapeo por rangos (semántica de BUSCARV aproximado).
+
+        Cada valor se asigna al tramo con el mayor límite inferior menor o igual
+        que él. Si se indica columna de límite superior, el valor debe ser además
+        menor que ese límite; en otro caso el último tramo queda abierto.
+        """
+        try:
+            # Validar columnas
+            for col in [lower_column, value_column] + ([upper_column] if upper_column else []):
+                if col not in base_df.columns:
+                    raise ValueError(f"Columna no encontrada: {col}")
+
+            as_dates = pd.api.types.is_datetime64_any_dtype(base_df[lower_column])
+            lower = self._prepare_range_bounds(base_df[lower_column], as_dates)
+            upper = self._prepare_range_bounds(base_df[upper_column], as_dates) if upper_column else None
+
+            # Descartar tramos sin límite y conservar el último para límites repetidos
+            valid = ~pd.isna(lower)
+            tramos = pd.DataFrame({'lower': lower[valid], 'value': base_df[value_column].to_numpy(dtype=object)[valid]})
+            if upper is not None:
+                tramos['upper'] = upper[valid]
+            tramos = tramos.drop_duplicates(subset='lower', keep='last')
+
+            # Ordenar una sola vez; las búsquedas se resuelven con searchsorted
+            tramos = tramos.sort_values('lower', kind='stable').reset_index(drop=True)
+
+            # Guardar mapeo
+            self.mappings[mapping_name] = {
+                'type': 'range',
+                'lower_bounds': tramos['lower'].to_numpy(),
+                'upper_bounds': tramos['upper'].to_numpy() if upper is not None else None,
+                'values': tramos['value'].to_numpy(dtype=object),
+                'bounds_are_dates': as_dates,
+                'key_column': lower_column,
+                'upper_column': upper_column,
+                'value_column': value_column,
+                'total_entries': len(tramos)
+            }
+
+            self.logger.info(f"Mapeo por rangos '{mapping_name}' creado con {len(tramos)} tramos")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error creando mapeo por rangos: {e}")
+            return False
+
+    def apply_range_mapping(self,
+                            source_df: pd.DataFrame,
+                            source_column: str,
+                            mapping_name: str,
+                            default_value: Any = None) -> List[Any]:
+        """Aplicar mapeo por rangos a una columna completa con búsqueda binaria"""
+        try:
+            if mapping_name not in self.mappings:
+                raise ValueError(f"Mapeo no encontrado: {mapping_name}")
+
+            mapping_info = self.mappings[mapping_name]
+            if mapping_info.get('type') != 'range':
+                raise ValueError(f"El mapeo '{mapping_name}' no es de tipo rango")
+
+            if source_column not in source_df.columns:
+                raise ValueError(f"Columna fuente no encontrada: {source_column}")
+
+            lower = mapping_info['lower_bounds']
+            upper = mapping_info['upper_bounds']
+            search_values = self._prepare_range_bounds(source_df[source_column], mapping_info['bounds_are_dates'])
+
+            # Posición del mayor límite inferior <= valor
+            positions = np.searchsorted(lower, search_values, side='right') - 1
+            hits = (positions >= 0) & ~pd.isna(search_values)
+            if upper is not None:
+                in_range = np.zeros(len(positions), dtype=bool)
+                # Un límite superior vacío deja el tramo abierto
+                upper_bounds = upper[positions[hits]]
+                in_range[hits] = pd.isna(upper_bounds) | (search_values[hits] < upper_bounds)
+                hits &= in_range
+
+            result = np.empty(len(positions), dtype=object)
+            result[hits] = mapping_info['values'][positions[hits]]
+            result[~hits] = default_value
+
+            self.apply_stats[mapping_name] = {
+                'source_column': source_column,
+                **summarize_lookup(normalize_text_keys(source_df[source_column]), hits, np.zeros(len(hits), dtype=bool))
+            }
+
+            return result.tolist()
+
+        except Exception as e:
+            self.logger.error(f"Error aplicando mapeo por rangos: {e}")
+            return []
+
+    def get_apply_statistics(self, mapping_name: str) -> Dict[str, Any]:
+        """Obtener aciertos, fallos y claves faltantes de la última aplicación de un mapeo"""
+        return self.apply_stats.get(mapping_name, {}).copy()
     
     def get_mapping_info(self, mapping_name: str) -> Dict[str, Any]:
         """Obtener información de un mapeo"""
@@ -237,6 +873,28 @@ class MappingManager:
             return errors
         
         mapping_info = self.mappings[mapping_name]
+        
+        if mapping_info.get('type') == 'join':
+            if mapping_info['lookup'].empty:
+                errors.append(f"Mapeo '{mapping_name}' está vacío")
+            return errors
+        
+        if mapping_info.get('type') == 'range':
+            if mapping_info['total_entries'] == 0:
+                errors.append(f"Mapeo '{mapping_name}' está vacío")
+            upper = mapping_info['upper_bounds']
+            if upper is not None and (upper <= mapping_info['lower_bounds']).any():
+                errors.append(f"Mapeo '{mapping_name}' tiene tramos con límite superior menor o igual al inferior")
+            return errors
+        
+        if 'index' in mapping_info:
+            index = mapping_info['index']
+            if len(index) == 0:
+                errors.append(f"Mapeo '{mapping_name}' está vacío")
+            if index.null_count:
+                errors.append(f"Mapeo '{mapping_name}' tiene {index.null_count} valores nulos")
+            return errors
+        
         mapping_dict = mapping_info.get('mapping', {})
         
         if not mapping_dict:
@@ -254,7 +912,41 @@ class MappingManager:
         if mapping_name not in self.mappings:
             return {}
         
-        mapping_dict = self.mappings[mapping_name]['mapping']
+        mapping_info = self.mappings[mapping_name]
+        if mapping_info.get('type') == 'join':
+            lookup = mapping_info['lookup']
+            values = lookup[mapping_info['value_columns']]
+            return {
+                'total_entries': len(lookup),
+                'null_values': int(values.isna().any(axis=1).sum()),
+                'value_types': {col: str(dtype) for col, dtype in values.dtypes.items()},
+                'unique_values': len(values.drop_duplicates())
+            }
+        
+        if mapping_info.get('type') == 'range':
+            values = pd.Series(mapping_info['values'], dtype=object)
+            return {
+                'total_entries': mapping_info['total_entries'],
+                'null_values': int(values.isna().sum()),
+                'value_types': values.dropna().map(lambda v: type(v).__name__).value_counts().to_dict(),
+                'unique_values': int(values.nunique())
+            }
+        
+        if 'index' in mapping_info:
+            index = mapping_info['index']
+            value_types = {}
+            for value in index.unique_values:
+                value_type = type(value).__name__
+                value_types[value_type] = value_types.get(value_type, 0) + 1
+            return {
+                'total_entries': len(index),
+                'null_values': index.null_count,
+                'value_types': value_types,
+                'unique_values': len(index.unique_values),
+                'memory_bytes': index.nbytes
+            }
+        
+        mapping_dict = mapping_info['mapping']
         
         # Contar tipos de valores
         value_types = {}
@@ -278,6 +970,7 @@ class MappingManager:
         """Eliminar un mapeo específico"""
         if mapping_name in self.mappings:
             del self.mappings[mapping_name]
+            self.apply_stats.pop(mapping_name, None)
             self.logger.info(f"Mapeo '{mapping_name}' eliminado")
             return True
         return False
@@ -285,6 +978,7 @@ class MappingManager:
     def clear_all_mappings(self):
         """Eliminar todos los mapeos"""
         self.mappings.clear()
+        self.apply_stats.clear()
         self.logger.info("Todos los mapeos eliminados")
     
     def export_mappings(self) -> Dict[str, Any]:
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Registro compartido de índices de mapeo
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import pandas as pd
+
+from core.mapping_manager import MappingManager
+from models.column_config import ColumnConfig
+
+def mapping_config_key(key_column: str, value_column: str, key_policy: Optional[str] = 'text') -> Tuple:
+    """Clave de un mapeo dentro de la configuración de mapeo: (columna clave, columna valor[, política])"""
+    if key_policy and key_policy != 'text':
+        return (key_column, value_column, key_policy)
+    return (key_column, value_column)
+
+class MappingRegistry:
+    """
+    Registro de índices de mapeo por (archivo base, columna clave, columna valor, normalización).
+
+    Cada índice se construye una sola vez y se comparte entre la vista previa y la
+    exportación. Al cambiar el archivo base solo se descartan las entradas construidas
+    sobre el archivo anterior; al cambiar la configuración de columnas solo se
+    construyen los mapeos nuevos.
+    """
+
+    def __init__(self, mapping_manager: MappingManager):
+        self.mapping_manager = mapping_manager
+        self.logger = logging.getLogger(__name__)
+        self.base_df: Optional[pd.DataFrame] = None
+        self.base_file: Optional[str] = None
+        self._base_token: Optional[Tuple] = None
+        self._entries: Dict[Tuple, Dict[str, Any]] = {}
+        self.builds = 0
+        self.reuses = 0
+
+    def _make_base_token(self, base_df: pd.DataFrame, base_file: Optional[str]) -> Tuple:
+        """Identificador del archivo base: ruta, tamaño y fecha de modificación"""
+        if base_file and Path(base_file).exists():
+            stat = Path(base_file).stat()
+            return (str(Path(base_file).resolve()), stat.st_size, stat.st_mtime_ns)
+        return ('memoria', id(base_df))
+
+    def set_base(self, base_df: Optional[pd.DataFrame], base_file: str = None):
+        """Establecer el archivo base, actualizando o descartando los índices construidos sobre el anterior"""
+        previous_df = self.base_df
+        self.base_df = base_df
+        self.base_file = base_file
+        new_token = self._make_base_token(base_df, base_file) if base_df is not None else None
+
+        if new_token != self._base_token:
+            # Si el gestor ya comparó ambas versiones, los índices se actualizan con las filas cambiadas
+            delta = self.mapping_manager.base_delta
+            incremental = (delta is not None and previous_df is not None and
+                           self.mapping_manager.base_df is base_df and
+                           delta['previous_base_id'] == id(previous_df))
+
+            updated = 0
+            stale = []
+            for key in list(self._entries):
+                if key[0] == new_token:
+                    continue
+                entry = self._entries.pop(key)
+                if incremental and key[0] == self._base_token:
+                    entry['last_delta'] = self.mapping_manager.apply_base_delta(
+                        entry['mapping'], entry['key_column'], entry['value_column'], entry['normalization']
+                    )
+                    entry['total_entries'] = len(entry['mapping'])
+                    self._entries[(new_token,) + key[1:]] = entry
+                    updated += 1
+                else:
+                    stale.append(key)
+
+            if updated:
+                self.logger.info(f"Registro de mapeos: {updated} índices actualizados de forma incremental")
+            if stale:
+                self.logger.info(f"Registro de mapeos: {len(stale)} índices invalidados por cambio de archivo base")
+            self._base_token = new_token
+
+    def get(self, key_column: str, value_column: str, normalization: str = 'text') -> Dict[str, Any]:
+        """Obtener (o construir una única vez) el diccionario de mapeo de un par clave/valor"""
+        if self.base_df is None:
+            raise ValueError("No se ha cargado un archivo base para crear el mapeo")
+
+        entry_key = (self._base_token, key_column, value_column, normalization)
+        entry = self._entries.get(entry_key)
+
+        if entry is None:
+            mapping_dict = self.mapping_manager.get_mapping_dict(
+                key_column, value_column, base_df=self.base_df, base_file=self.base_file,
+                key_policy=normalization
+            )
+            entry = {
+                'mapping': mapping_dict,
+                'key_column': key_column,
+                'value_column': value_column,
+                'normalization': normalization,
+                'total_entries': len(mapping_dict)
+            }
+            self._entries[entry_key] = entry
+            self.builds += 1
+            self.logger.info(f"Mapeo '{key_column}' -> '{value_column}' registrado con {len(mapping_dict)} entradas")
+        else:
+            self.reuses += 1
+
+        return entry['mapping']
+
+    def sync(self, column_configs: List[ColumnConfig]) -> Dict[Tuple, Dict[str, Any]]:
+        """Construir la configuración de mapeo de las columnas y liberar los índices que ya no se usan"""
+        mapping_config = {}
+        if self.base_df is None:
+            return mapping_config
+
+        used_keys = set()
+        for col_config in column_configs:
+            if not (getattr(col_config, 'mapping_source', None) and
+                    getattr(col_config, 'mapping_key_column', None) and
+                    getattr(col_config, 'mapping_value_column', None)):
+                continue
+
+            # Verificar que las columnas existen en el archivo base
+            if (col_config.mapping_key_column not in self.base_df.columns or
+                    col_config.mapping_value_column not in self.base_df.columns):
+                continue
+
+            normalization = getattr(col_config, 'mapping_key_policy', None) or 'text'
+            config_key = mapping_config_key(col_config.mapping_key_column, col_config.mapping_value_column,
+                                            normalization)
+            mapping_config[config_key] = self.get(col_config.mapping_key_column,
+                                                  col_config.mapping_value_column, normalization)
+            used_keys.add((self._base_token, col_config.mapping_key_column,
+                           col_config.mapping_value_column, normalization))
+
+        for entry_key in [key for key in self._entries if key not in used_keys]:
+            del self._entries[entry_key]
+
+        return mapping_config
+
+    def invalidate(self, key_column: str = None, value_column: str = None):
+        """Invalidar índices concretos (o todos si no se indica columna)"""
+        for entry_key in list(self._entries):
+            _, entry_key_column, entry_value_column, _ = entry_key
+            if key_column is not None and entry_key_column != key_column:
+                continue
+            if value_column is not None and entry_value_column != value_column:
+                continue
+            del self._entries[entry_key]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Obtener estadísticas del registro"""
+        return {
+            'entries': len(self._entries),
+            'total_keys': sum(entry['total_entries'] for entry in self._entries.values()),
+            'builds': self.builds,
+            'reuses': self.reuses
+        }
@@ -0,0 +1,572 @@
+# -*- coding: utf-8 -*-
+"""
+Lectura de archivos Excel: motores intercambiables y lectura por streaming de columnas.
+CSV, Parquet y JSON Lines se leen con las mismas funciones (core.tabular_reader) como
+libros de una sola hoja con el nombre del archivo. En una base de datos SQLite
+(core.sqlite_reader) cada tabla o vista es una hoja, y una consulta SELECT también
+se admite como nombre de hoja.
+"""
+
+import importlib.util
+import logging
+import os
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+from core.sqlite_reader import (is_sqlite, iter_sqlite_frames, list_tables, probe_sqlite, read_sqlite,
+                                resolve_source)
+from core.tabular_reader import is_tabular, iter_tabular_frames, probe_tabular, read_tabular
+
+logger = logging.getLogger(__name__)
+
+# Motor de pandas por defecto según la extensión
+DEFAULT_ENGINES = {
+    '.xlsx': 'openpyxl',
+    '.xls': 'xlrd'
+}
+
+# Motores disponibles: nombre -> (módulo requerido, extensiones admitidas)
+READER_ENGINES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    'calamine': ('python_calamine', ('.xlsx', '.xls')),
+    'xml': ('xml.parsers.expat', ('.xlsx',)),
+    'openpyxl': ('openpyxl', ('.xlsx',)),
+    'xlrd': ('xlrd', ('.xls',))
+}
+
+def is_engine_available(engine: str) -> bool:
+    """Indicar si el módulo que necesita un motor de lectura está instalado"""
+    if engine not in READER_ENGINES:
+        return False
+    return importlib.util.find_spec(READER_ENGINES[engine][0]) is not None
+
+def engine_candidates(file_path: Union[str, Path], preferred: str = 'auto') -> List[str]:
+    """Motores a probar, en orden, para un archivo: el preferido y después el de pandas por defecto"""
+    suffix = Path(file_path).suffix.lower()
+    candidates = []
+    if preferred == 'auto':
+        candidates.extend(['calamine', 'xml'])
+    elif preferred:
+        candidates.append(preferred)
+    if suffix in DEFAULT_ENGINES:
+        candidates.append(DEFAULT_ENGINES[suffix])
+
+    supported = []
+    for engine in dict.fromkeys(candidates):
+        if engine in READER_ENGINES and suffix not in READER_ENGINES[engine][1]:
+            continue
+        if engine in READER_ENGINES and not is_engine_available(engine):
+            continue
+        supported.append(engine)
+    return supported
+
+# Espacios de nombres de SpreadsheetML dentro de un .xlsx
+_MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_PACKAGE_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+def _workbook_sheets(archive: zipfile.ZipFile) -> List[Tuple[str, Optional[str]]]:
+    """Hojas del libro en orden como (nombre, ruta del XML dentro del archivo comprimido)"""
+    root = ET.fromstring(archive.read('xl/workbook.xml'))
+    targets = {}
+    try:
+        rels = ET.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+        for rel in rels.iter(f'{_PACKAGE_REL_NS}Relationship'):
+            target = rel.get('Target', '')
+            # Las rutas son relativas a xl/ salvo que empiecen por '/'
+            targets[rel.get('Id')] = target.lstrip('/') if target.startswith('/') else f"xl/{target}"
+    except KeyError:
+        pass
+    return [(sheet.get('name'), targets.get(sheet.get(f'{_REL_NS}id')))
+            for sheet in root.iter(f'{_MAIN_NS}sheet')]
+
+def list_sheet_names(file_path: Union[str, Path]) -> List[str]:
+    """Obtener los nombres de las hojas sin leer sus datos"""
+    path = Path(file_path)
+    if is_tabular(path):
+        return [path.stem]
+    if is_sqlite(path):
+        return list_tables(path)
+    if path.suffix.lower() == '.xlsx':
+        try:
+            # Solo se lee xl/workbook.xml dentro del archivo comprimido
+            with zipfile.ZipFile(path) as archive:
+                return [name for name, _ in _workbook_sheets(archive)]
+        except (KeyError, zipfile.BadZipFile, ET.ParseError) as e:
+            logger.warning(f"No se pudo leer workbook.xml de {path.name}: {e}")
+    with pd.ExcelFile(path) as workbook:
+        return [str(name) for name in workbook.sheet_names]
+
+def _split_reference(reference: str) -> Tuple[int, int]:
+    """Convertir una referencia de celda ('AB12') en (fila, columna) empezando en 1"""
+    column = 0
+    position = 0
+    for position, char in enumerate(reference):
+        if not char.isalpha():
+            break
+        column = column * 26 + (ord(char.upper()) - 64)
+    else:
+        position = len(reference)
+    digits = reference[position:].replace('$', '')
+    return (int(digits) if digits else 0), column
+
+def _shared_strings(archive: zipfile.ZipFile, indexes: Sequence[int]) -> Dict[int, str]:
+    """Leer de sharedStrings.xml solo hasta la última cadena pedida"""
+    wanted = set(indexes)
+    if not wanted or 'xl/sharedStrings.xml' not in archive.namelist():
+        return {}
+
+    last = max(wanted)
+    strings = {}
+    with archive.open('xl/sharedStrings.xml') as stream:
+        position = 0
+        for _, element in ET.iterparse(stream):
+            if element.tag != f'{_MAIN_NS}si':
+                continue
+            if position in wanted:
+                strings[position] = ''.join(node.text or '' for node in element.iter(f'{_MAIN_NS}t'))
+            element.clear()
+            if position >= last:
+                break
+            position += 1
+    return strings
+
+def _cell_value(cell: ET.Element) -> Tuple[str, Any]:
+    """Tipo y valor sin convertir de una celda de la hoja"""
+    cell_type = cell.get('t', 'n')
+    if cell_type == 'inlineStr':
+        return 'str', ''.join(node.text or '' for node in cell.iter(f'{_MAIN_NS}t'))
+    value = cell.find(f'{_MAIN_NS}v')
+    if value is None or value.text is None:
+        return 'none', None
+    if cell_type == 's':
+        return 'shared', int(value.text)
+    if cell_type == 'b':
+        return 'bool', value.text == '1'
+    if cell_type in ('str', 'e'):
+        return 'str', value.text
+    number = float(value.text)
+    return 'number', int(number) if number.is_integer() else number
+
+def _scan_sheet(archive: zipfile.ZipFile, sheet_path: str) -> Dict[str, Any]:
+    """
+    Leer de una hoja la etiqueta <dimension> y la primera fila con datos.
+
+    El análisis se detiene en cuanto se obtiene el encabezado; solo si la hoja no
+    declara sus dimensiones se recorren todas las filas para contarlas.
+    """
+    dimension = None
+    header_row = None
+    header_cells: List[Tuple[int, str, Any]] = []
+    last_row = 0
+    previous_row = 0
+    counting = False
+
+    with archive.open(sheet_path) as stream:
+        for event, element in ET.iterparse(stream, events=('start', 'end')):
+            tag = element.tag
+            if event == 'start':
+                if tag == f'{_MAIN_NS}dimension':
+                    reference = element.get('ref', '')
+                    # 'A1' sin rango lo escriben algunos programas aunque la hoja tenga datos
+                    dimension = reference if ':' in reference else None
+                elif tag == f'{_MAIN_NS}sheetData' and dimension is None:
+                    counting = True
+                continue
+
+            if tag != f'{_MAIN_NS}row':
+                continue
+
+            row_number = int(element.get('r', previous_row + 1))
+            previous_row = row_number
+            cells = []
+            for cell in element.iter(f'{_MAIN_NS}c'):
+                kind, value = _cell_value(cell)
+                if kind != 'none':
+                    cells.append((_split_reference(cell.get('r', 'A'))[1], kind, value))
+            element.clear()
+
+            if not cells:
+                continue
+            if header_row is None:
+                header_row = row_number
+                header_cells = cells
+                if not counting:
+                    break
+            last_row = row_number
+
+    return {
+        'dimension': dimension,
+        'header_row': header_row,
+        'header_cells': header_cells,
+        'last_row': last_row if counting else None
+    }
+
+def _probe_xlsx(path: Path, sheet_names: Optional[Sequence[Union[str, int]]]) -> Dict[str, Dict[str, Any]]:
+    """Metadatos de las hojas de un .xlsx leyendo solo el XML imprescindible"""
+    with zipfile.ZipFile(path) as archive:
+        sheets = _workbook_sheets(archive)
+        selected = _select_sheets([name for name, _ in sheets], sheet_names)
+        scans = {name: _scan_sheet(archive, sheet_path)
+                 for name, sheet_path in sheets if name in selected and sheet_path}
+        strings = _shared_strings(archive, [value for scan in scans.values()
+                                            for _, kind, value in scan['header_cells'] if kind == 'shared'])
+
+    result = {}
+    for name in selected:
+        scan = scans.get(name)
+        if scan is None:
+            result[name] = {'error': 'Hoja sin contenido en el archivo'}
+            continue
+
+        width = max((column for column, _, _ in scan['header_cells']), default=0)
+        header: List[Any] = [None] * width
+        for column, kind, value in scan['header_cells']:
+            header[column - 1] = strings.get(value) if kind == 'shared' else value
+
+        if scan['header_row'] is None:
+            rows, columns, source = 0, 0, 'dimension' if scan['dimension'] else 'stream'
+        elif scan['dimension']:
+            last_row, last_column = _split_reference(scan['dimension'].split(':')[1])
+            rows = max(last_row - scan['header_row'], 0)
+            columns = max(width, last_column)
+            source = 'dimension'
+        else:
+            rows = scan['last_row'] - scan['header_row']
+            columns = width
+            source = 'stream'
+
+        result[name] = {
+            'rows': rows,
+            'columns': columns,
+            'column_names': _header_names(header + [None] * (columns - width)),
+            'dimension': scan['dimension'],
+            'row_source': source
+        }
+    return result
+
+def _probe_legacy(path: Path, sheet_names: Optional[Sequence[Union[str, int]]]) -> Dict[str, Dict[str, Any]]:
+    """Metadatos de las hojas de formatos sin XML (.xls) mediante pandas"""
+    result = {}
+    with pd.ExcelFile(path) as workbook:
+        selected = _select_sheets([str(name) for name in workbook.sheet_names], sheet_names)
+        for name in selected:
+            header = workbook.parse(name, nrows=0)
+            sheet = getattr(workbook.book, 'sheet_by_name', None)
+            if sheet is not None:
+                # xlrd ya conoce el tamaño de cada hoja al abrir el libro
+                rows = max(sheet(name).nrows - 1, 0)
+            else:
+                rows = len(workbook.parse(name))
+            result[name] = {
+                'rows': rows,
+                'columns': len(header.columns),
+                'column_names': header.columns.tolist(),
+                'dimension': None,
+                'row_source': 'workbook'
+            }
+    return result
+
+def _select_sheets(all_names: List[str], sheet_names: Optional[Sequence[Union[str, int]]]) -> List[str]:
+    """Resolver nombres o posiciones de hoja contra las hojas del libro"""
+    if sheet_names is None:
+        return all_names
+    selected = []
+    for sheet in sheet_names:
+        name = all_names[sheet] if isinstance(sheet, int) else sheet
+        if name not in all_names:
+            raise ValueError(f"Hoja no encontrada: {sheet}")
+        selected.append(name)
+    return selected
+
+def probe_workbook(file_path: Union[str, Path],
+                   sheet_names: Optional[Sequence[Union[str, int]]] = None) -> Dict[str, Any]:
+    """
+    Obtener hojas, dimensiones y encabezados de un libro sin cargar sus datos.
+
+    En .xlsx se leen workbook.xml y, de cada hoja, la etiqueta <dimension> y la
+    primera fila; las filas solo se cuentan recorriendo la hoja si falta la
+    dimensión. 'rows' excluye el encabezado, como len() del DataFrame de pandas
+    (la dimensión puede incluir filas vacías con formato al final).
+    """
+    path = Path(file_path)
+    start_time = time.perf_counter()
+
+    sheets = None
+    if is_tabular(path):
+        sheets = {path.stem: probe_tabular(path)}
+    elif is_sqlite(path):
+        sources = [resolve_source(path, source) for source in sheet_names] if sheet_names else list_tables(path)
+        sheets = {source: probe_sqlite(path, source) for source in sources}
+    elif path.suffix.lower() == '.xlsx':
+        try:
+            sheets = _probe_xlsx(path, sheet_names)
+        except (KeyError, zipfile.BadZipFile, ET.ParseError) as e:
+            logger.warning(f"No se pudo inspeccionar el XML de {path.name}: {e}")
+    if sheets is None:
+        sheets = _probe_legacy(path, sheet_names)
+
+    probe_time = round(time.perf_counter() - start_time, 4)
+    logger.info(f"{path.name} inspeccionado en {probe_time * 1000:.0f} ms ({len(sheets)} hojas)")
+    return {
+        'sheet_names': list(sheets),
+        'sheets': sheets,
+        'probe_time': probe_time
+    }
+
+def read_excel_file(file_path: Union[str, Path], engine: str = 'auto', **kwargs) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Leer un archivo Excel con el motor configurado, usando el de pandas por defecto si falla.
+
+    Devuelve el DataFrame y la información de carga: motor usado y tiempo en segundos.
+    """
+    if is_tabular(file_path):
+        start_time = time.perf_counter()
+        df, reader = read_tabular(file_path, **kwargs)
+        load_info = {'reader_engine': reader, 'load_time': round(time.perf_counter() - start_time, 3)}
+        logger.info(f"{Path(file_path).name} leído con '{reader}' en {load_info['load_time']:.2f} s")
+        return df, load_info
+    if is_sqlite(file_path):
+        start_time = time.perf_counter()
+        df = read_sqlite(file_path, **kwargs)
+        load_info = {'reader_engine': 'sqlite', 'load_time': round(time.perf_counter() - start_time, 3)}
+        logger.info(f"{Path(file_path).name} leído con 'sqlite' en {load_info['load_time']:.2f} s")
+        return df, load_info
+
+    candidates = engine_candidates(file_path, engine) or [None]
+    last_error = None
+
+    for candidate in candidates:
+        start_time = time.perf_counter()
+        try:
+            if candidate == 'xml':
+                # Lector propio por eventos: no es un motor de pandas
+                from core.xlsx_reader import read_xlsx
+                df = read_xlsx(file_path, **kwargs)
+            else:
+                df = pd.read_excel(file_path, engine=candidate, **kwargs)
+        except (ImportError, ValueError) as e:
+            # Motor no soportado por esta versión de pandas o incapaz de leer el archivo
+            logger.warning(f"Motor de lectura '{candidate}' no disponible para {Path(file_path).name}: {e}")
+            last_error = e
+            continue
+
+        load_info = {
+            'reader_engine': candidate or 'pandas',
+            'load_time': round(time.perf_counter() - start_time, 3)
+        }
+        logger.info(f"{Path(file_path).name} leído con '{load_info['reader_engine']}' "
+                    f"en {load_info['load_time']:.2f} s")
+        return df, load_info
+
+    raise last_error
+
+def _header_names(header: Sequence[Any]) -> List[Any]:
+    """Nombres de columna igual que pandas: celdas vacías como 'Unnamed: i' y duplicados con sufijo '.n'"""
+    names = []
+    counts: Dict[Any, int] = {}
+    for position, value in enumerate(header):
+        name = f"Unnamed: {position}" if value is None else value
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[name] = count + 1
+            name = f"{name}.{count}"
+            count = counts.get(name, 0)
+        counts[name] = count + 1
+        names.append(name)
+    return names
+
+def _first_filled_row(rows: Iterator[Sequence[Any]]) -> Sequence[Any]:
+    """Primera fila con algún valor (el encabezado, como en pandas y probe_workbook); consume las anteriores"""
+    for row in rows:
+        if any(value is not None for value in row):
+            return row
+    return ()
+
+def _open_sheet(file_path: Union[str, Path], sheet_name: Optional[Union[str, int]] = None):
+    """Abrir un libro en modo solo lectura y devolver (libro, hoja)"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    if sheet_name is None or sheet_name == 0:
+        worksheet = workbook.worksheets[0]
+    elif isinstance(sheet_name, int):
+        worksheet = workbook.worksheets[sheet_name]
+    else:
+        worksheet = workbook[sheet_name]
+    return workbook, worksheet
+
+def read_excel_header(file_path: Union[str, Path], sheet_name: Optional[Union[str, int]] = None) -> List[Any]:
+    """Leer solo la fila de encabezados de una hoja"""
+    workbook, worksheet = _open_sheet(file_path, sheet_name)
+    try:
+        return _header_names(_first_filled_row(worksheet.iter_rows(values_only=True)))
+    finally:
+        workbook.close()
+
+def _iter_column_chunks(file_path: Union[str, Path],
+                        columns: Optional[Sequence[Any]],
+                        sheet_name: Optional[Union[str, int]],
+                        chunk_size: int) -> Iterator[Tuple[int, Dict[Any, List[Any]]]]:
+    """Recorrer una hoja .xlsx fila a fila devolviendo (filas del lote, columnas pedidas del lote)"""
+    workbook, worksheet = _open_sheet(file_path, sheet_name)
+    try:
+        rows = worksheet.iter_rows(values_only=True)
+        names = _header_names(_first_filled_row(rows))
+        if columns is None:
+            columns = names
+
+        missing = [col for col in columns if col not in names]
+        if missing:
+            raise ValueError(f"Columnas no encontradas en {Path(file_path).name}: {missing}")
+        positions = [names.index(col) for col in columns]
+
+        chunk: Dict[Any, List[Any]] = {col: [] for col in columns}
+        pending_blank = 0  # Filas vacías aún no confirmadas (pueden ser las finales)
+        size = 0
+
+        for row in rows:
+            if all(value is None for value in row):
+                pending_blank += 1
+                continue
+
+            for _ in range(pending_blank):
+                for col in columns:
+                    chunk[col].append(None)
+            size += pending_blank
+            pending_blank = 0
+
+            width = len(row)
+            for col, position in zip(columns, positions):
+                chunk[col].append(row[position] if position < width else None)
+            size += 1
+
+            if size >= chunk_size:
+                yield size, chunk
+                chunk = {col: [] for col in columns}
+                size = 0
+
+        if size:
+            yield size, chunk
+    finally:
+        workbook.close()
+
+def iter_excel_columns(file_path: Union[str, Path],
+                       columns: Sequence[Any],
+                       sheet_name: Optional[Union[str, int]] = None,
+                       chunk_size: int = 50000) -> Iterator[Dict[Any, List[Any]]]:
+    """
+    Recorrer una hoja .xlsx fila a fila devolviendo solo las columnas pedidas, en lotes.
+
+    Igual que pd.read_excel, la primera fila es el encabezado, las filas vacías
+    intermedias se conservan y las filas vacías finales se descartan.
+    """
+    for _, chunk in _iter_column_chunks(file_path, columns, sheet_name, chunk_size):
+        yield chunk
+
+def _column_series(values: List[Any]) -> pd.Series:
+    """Serie con la misma inferencia de tipos que pd.read_excel (celdas vacías como NaN)"""
+    return pd.Series([np.nan if value is None else value for value in values])
+
+def read_excel_columns(file_path: Union[str, Path],
+                       columns: Sequence[Any],
+                       sheet_name: Optional[Union[str, int]] = None) -> pd.DataFrame:
+    """Leer únicamente las columnas indicadas de un archivo Excel sin cargar la hoja completa"""
+    path = Path(file_path)
+    if is_tabular(path):
+        return read_tabular(path, usecols=list(columns))[0]
+    if is_sqlite(path):
+        return read_sqlite(path, sheet_name=sheet_name, usecols=list(columns))
+    if path.suffix.lower() != '.xlsx':
+        # Los formatos antiguos no admiten lectura por streaming
+        return pd.read_excel(path, sheet_name=sheet_name or 0, usecols=list(columns))
+
+    collected: Dict[Any, List[Any]] = {col: [] for col in columns}
+    for chunk in iter_excel_columns(path, columns, sheet_name):
+        for col in columns:
+            collected[col].extend(chunk[col])
+
+    logger.info(f"Leídas {len(columns)} columnas de {path.name} por streaming "
+                f"({len(next(iter(collected.values()), []))} filas)")
+    return pd.DataFrame({col: _column_series(values) for col, values in collected.items()})
+
+def iter_excel_frames(file_path: Union[str, Path],
+                      columns: Optional[Sequence[Any]] = None,
+                      sheet_name: Optional[Union[str, int]] = None,
+                      chunk_size: int = 50000) -> Iterator[pd.DataFrame]:
+    """
+    Recorrer una hoja en lotes de DataFrame sin cargarla completa.
+
+    Todos los lotes tienen las mismas columnas (todas o las indicadas), los tipos se
+    infieren como en pd.read_excel y el índice continúa la numeración de filas.
+    """
+    path = Path(file_path)
+    if is_tabular(path):
+        yield from iter_tabular_frames(path, columns, chunk_size)
+        return
+    if is_sqlite(path):
+        yield from iter_sqlite_frames(path, columns, sheet_name, chunk_size)
+        return
+    if path.suffix.lower() != '.xlsx':
+        # Los formatos antiguos no admiten lectura por streaming: se leen y se trocean
+        df = pd.read_excel(path, sheet_name=sheet_name or 0,
+                           usecols=list(columns) if columns is not None else None)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+        return
+
+    start = 0
+    for size, chunk in _iter_column_chunks(path, columns, sheet_name, chunk_size):
+        if chunk:
+            # El mismo analizador que usa pd.read_excel: textos numéricos, fechas y vacíos igual que en la carga completa
+            rows = [list(row) for row in zip(*chunk.values())]
+            frame = TextParser([list(chunk)] + rows, header=0).read()
+            frame.index = pd.RangeIndex(start, start + size)
+        else:
+            frame = pd.DataFrame(index=pd.RangeIndex(start, start + size))
+        start += size
+        yield frame
+
+def _read_sheet_task(file_path: str, sheet_name: str, engine: str) -> Tuple[str, pd.DataFrame, Dict[str, Any]]:
+    """Leer una hoja en un proceso del pool"""
+    df, load_info = read_excel_file(file_path, engine, sheet_name=sheet_name)
+    return sheet_name, df, load_info
+
+def read_excel_sheets(file_path: Union[str, Path],
+                      sheet_names: Sequence[str],
+                      engine: str = 'auto',
+                      max_workers: int = 0) -> Dict[str, Tuple[pd.DataFrame, Dict[str, Any]]]:
+    """
+    Leer varias hojas de un libro en paralelo (un proceso por hoja, hasta max_workers).
+
+    Si el pool de procesos no está disponible las hojas se leen una tras otra.
+    Devuelve {hoja: (DataFrame, información de carga)} en el orden pedido.
+    """
+    sheet_names = list(sheet_names)
+    workers = min(max_workers or os.cpu_count() or 1, len(sheet_names))
+    results: Dict[str, Tuple[pd.DataFrame, Dict[str, Any]]] = {}
+
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_read_sheet_task, str(file_path), name, engine) for name in sheet_names]
+                for future in futures:
+                    name, df, load_info = future.result()
+                    results[name] = (df, load_info)
+            logger.info(f"{len(sheet_names)} hojas leídas en paralelo con {workers} procesos")
+        except (OSError, RuntimeError) as e:
+            # Entornos sin multiprocesamiento (p. ej. ejecutables congelados sin freeze_support)
+            logger.warning(f"Lectura paralela no disponible, se leerán las hojas en secuencia: {e}")
+            results = {}
+
+    for name in sheet_names:
+        if name not in results:
+            results[name] = read_excel_file(file_path, engine, sheet_name=name)
+
+    return {name: results[name] for name in sheet_names}
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Validación vectorizada de los tipos de dato declarados en la configuración de columnas
+"""
+
+import datetime
+import logging
+import time
+from typing import Any, Callable, Dict, Tuple
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Filas no conformes que se guardan por columna en el informe (el total se cuenta siempre)
+MAX_REPORTED_ROWS = 100
+
+# Mismos formatos, en el mismo orden, que usa la exportación para interpretar fechas en texto
+_DATE_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%d/%m/%Y", "%d/%m/%y", "%m/%d/%Y", "%m/%d/%y")
+_TIME_PATTERN = r'\d{1,2}:\d{2}(:\d{2})?'
+_BOOLEAN_TOKENS = {'true', 'false', '1', '0', 'si', 'sí', 'no', 'yes', 'verdadero', 'falso'}
+_DATE_TYPES = (datetime.datetime, datetime.date, pd.Timestamp)
+_TIME_TYPES = (datetime.time, datetime.datetime, datetime.timedelta, pd.Timestamp, pd.Timedelta)
+
+def _types_in(kinds: pd.Series, types: Tuple[type, ...]) -> pd.Series:
+    """Máscara de las celdas cuyo tipo de Python es (o hereda de) alguno de los indicados"""
+    matching = [kind for kind in kinds.unique() if issubclass(kind, types)]
+    return kinds.isin(matching)
+
+def _parse_date_text(text: str) -> Any:
+    """Interpretar una fecha en texto con los formatos de la exportación (NaT si no coincide)"""
+    text = text.strip()
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, date_format)
+        except ValueError:
+            continue
+    return pd.NaT
+
+def _no_invalid(values: pd.Series) -> pd.Series:
+    """Máscara sin celdas no conformes"""
+    return pd.Series(False, index=values.index)
+
+def _invalid_text(values: pd.Series) -> pd.Series:
+    """Todo valor es texto válido"""
+    return _no_invalid(values)
+
+def _invalid_number(values: pd.Series) -> pd.Series:
+    """Números (también en texto); el resto no es conforme"""
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return _no_invalid(values)
+    return pd.to_numeric(values, errors='coerce').isna()
+
+def _invalid_date(values: pd.Series) -> pd.Series:
+    """Celdas de fecha o fechas en texto con los formatos de la exportación"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return _no_invalid(values)
+
+    kinds = values.map(type)
+    valid = _types_in(kinds, _DATE_TYPES)
+    is_text = kinds == str
+    if is_text.any():
+        texts = values[is_text]
+        parsed = {text: _parse_date_text(text) for text in texts.unique()}
+        valid[is_text] = texts.map(parsed).notna()
+    return ~valid
+
+def _invalid_time(values: pd.Series) -> pd.Series:
+    """Horas, fechas con hora, duraciones o texto 'hh:mm[:ss]'"""
+    if pd.api.types.is_datetime64_any_dtype(values) or pd.api.types.is_timedelta64_dtype(values):
+        return _no_invalid(values)
+
+    kinds = values.map(type)
+    valid = _types_in(kinds, _TIME_TYPES)
+    is_text = kinds == str
+    if is_text.any():
+        valid[is_text] = values[is_text].str.strip().str.fullmatch(_TIME_PATTERN)
+    return ~valid
+
+def _invalid_boolean(values: pd.Series) -> pd.Series:
+    """Booleanos, 0/1 o palabras sí/no, verdadero/falso"""
+    if pd.api.types.is_bool_dtype(values):
+        return _no_invalid(values)
+    tokens = values.map(str).str.strip().str.lower()
+    return ~tokens.isin(_BOOLEAN_TOKENS)
+
+# Validación de cada tipo de dato: recibe los valores no vacíos, con los tipos que infirió
+# pandas, y devuelve la máscara de celdas no conformes. Las columnas cuyo tipo inferido ya
+# cumple el tipo declarado se validan sin recorrer sus valores.
+SCHEMA_VALIDATORS: Dict[str, Callable[[pd.Series], pd.Series]] = {
+    'text': _invalid_text,
+    'number': _invalid_number,
+    'currency': _invalid_number,
+    'percentage': _invalid_number,
+    'date': _invalid_date,
+    'datetime': _invalid_date,
+    'time': _invalid_time,
+    'boolean': _invalid_boolean
+}
+
+def invalid_cells(values: pd.Series, data_type: str) -> pd.Series:
+    """Máscara de las celdas no vacías que no cumplen el tipo declarado"""
+    present = values.notna()
+    if not present.any():
+        return present
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Columnas optimizadas a categoría: se validan sus valores originales
+        values = values.astype(object)
+    subset = values if present.all() else values[present]
+    invalid = SCHEMA_VALIDATORS[data_type](subset)
+    if not present.all():
+        invalid = invalid.reindex(values.index, fill_value=False)
+    return invalid.astype(bool)
+
+def validate_schema(df: pd.DataFrame, schema: Dict[Any, str]) -> Dict[str, Any]:
+    """
+    Validar el esquema {columna: tipo} sobre un DataFrame leído con los tipos inferidos por pandas.
+
+    Los valores no se modifican. Devuelve un informe con las columnas validadas, las del
+    esquema que no están en la hoja, el número de filas no conformes por columna y las
+    primeras filas no conformes (numeradas como en Excel, con el encabezado en la fila 1).
+    """
+    start_time = time.perf_counter()
+    report = {'columns': {}, 'missing_columns': [], 'invalid_counts': {}, 'invalid_rows': {}}
+
+    for col, data_type in schema.items():
+        if data_type not in SCHEMA_VALIDATORS:
+            continue
+        if col not in df.columns:
+            report['missing_columns'].append(col)
+            continue
+
+        invalid = invalid_cells(df[col], data_type)
+        report['columns'][col] = data_type
+        if invalid.any():
+            positions = np.flatnonzero(invalid.to_numpy())
+            report['invalid_counts'][col] = len(positions)
+            report['invalid_rows'][col] = [int(position) + 2 for position in positions[:MAX_REPORTED_ROWS]]
+
+    report['invalid_total'] = sum(report['invalid_counts'].values())
+    report['validation_time'] = round(time.perf_counter() - start_time, 3)
+    if report['invalid_total']:
+        logger.warning(f"Filas que no cumplen el tipo declarado: "
+                       f"{', '.join(f'{col} ({count})' for col, count in report['invalid_counts'].items())}")
+    if report['missing_columns']:
+        logger.warning(f"Columnas del esquema que no están en la hoja: {report['missing_columns']}")
+    return report
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Copias en disco (Arrow IPC) de DataFrames cargados para compartirlas entre procesos
+"""
+
+import importlib.util
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_ARROW_MAGIC = b'ARROW1'
+
+def write_snapshot(df: pd.DataFrame, path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Escribir un DataFrame en un archivo Arrow IPC sin comprimir.
+
+    Sin compresión el archivo se puede abrir con memory mapping: cada proceso lee
+    solo las filas que necesita sin copiar el resto. Sin pyarrow, o si el DataFrame
+    tiene columnas que Arrow no admite (tipos mezclados), se usa pickle y la división
+    se hace en un solo proceso. Devuelve {'path', 'rows', 'format'}.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    frame = df.reset_index(drop=True)
+
+    file_format = 'pickle'
+    if importlib.util.find_spec('pyarrow') is not None:
+        try:
+            frame.to_feather(path, compression='uncompressed')
+            file_format = 'arrow'
+        except Exception as e:
+            logger.debug(f"DataFrame no admitido por Arrow, se usa pickle: {e}")
+    if file_format == 'pickle':
+        frame.to_pickle(path)
+
+    logger.info(f"Snapshot de {len(frame)} filas escrito en {path.name} ({file_format})")
+    return {'path': str(path), 'rows': len(frame), 'format': file_format}
+
+def read_snapshot(path: Union[str, Path], start: int = 0, stop: Optional[int] = None,
+                  columns: Optional[Sequence[Any]] = None) -> pd.DataFrame:
+    """
+    Leer las filas [start, stop) de un snapshot (y solo las columnas indicadas).
+
+    El índice conserva la posición de las filas en el DataFrame original.
+    """
+    with open(path, 'rb') as f:
+        magic = f.read(6)
+
+    if magic == _ARROW_MAGIC:
+        import pyarrow as pa
+        import pyarrow.ipc
+
+        with pa.memory_map(str(path), 'r') as source:
+            # read_all sobre el mapa de memoria no copia datos; solo el rango pedido pasa a pandas
+            table = pa.ipc.open_file(source).read_all()
+            if columns is not None:
+                table = table.select(list(columns))
+            stop = table.num_rows if stop is None else min(stop, table.num_rows)
+            frame = table.slice(start, max(stop - start, 0)).to_pandas()
+    else:
+        frame = pd.read_pickle(path).iloc[start:stop]
+        if columns is not None:
+            frame = frame[list(columns)]
+
+    frame.index = pd.RangeIndex(start, start + len(frame))
+    return frame
+
+def part_ranges(total_rows: int, rows_per_part: int) -> List[Tuple[int, int]]:
+    """Rangos de filas [inicio, fin) de cada parte"""
+    return [(start, min(start + rows_per_part, total_rows)) for start in range(0, total_rows, rows_per_part)]
+
+def _write_part_task(snapshot_path: str, start: int, stop: int, output_path: str) -> Tuple[str, int]:
+    """Escribir un rango de filas del snapshot en un archivo Excel (en un proceso del pool)"""
+    part = read_snapshot(snapshot_path, start, stop)
+    part.to_excel(output_path, index=False)
+    return output_path, len(part)
+
+def split_snapshot(snapshot: Dict[str, Any], rows_per_file: int, export_dir: Union[str, Path],
+                   prefix: str, max_workers: int = 0,
+                   progress_callback: Optional[Callable[[int, int], None]] = None) -> List[str]:
+    """
+    Dividir un snapshot en archivos Excel de rows_per_file filas, en paralelo.
+
+    Cada proceso recibe solo la ruta del snapshot y su rango de filas. Si el snapshot
+    no está en Arrow (sin pyarrow o con tipos que Arrow no admite) o el pool de procesos
+    no está disponible, las partes se escriben una tras otra leyendo el snapshot una vez.
+    progress_callback recibe (partes terminadas, total de partes).
+    Devuelve los nombres de los archivos creados en orden.
+    """
+    ranges = part_ranges(snapshot['rows'], rows_per_file)
+    export_dir = Path(export_dir)
+    export_dir.mkdir(parents=True, exist_ok=True)
+    if len(ranges) == 1:
+        names = [f"{prefix}.xlsx"]
+    else:
+        names = [f"{prefix}_parte_{i:03d}_de_{len(ranges):03d}.xlsx" for i in range(1, len(ranges) + 1)]
+    tasks = [(snapshot['path'], start, stop, str(export_dir / name)) for (start, stop), name in zip(ranges, names)]
+
+    done = set()
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    if snapshot.get('format') != 'arrow':
+        # Sin memory mapping cada proceso cargaría el snapshot completo: se escribe en secuencia
+        workers = 1
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_write_part_task, *task) for task in tasks]
+                for future in as_completed(futures):
+                    output_path, _ = future.result()
+                    done.add(output_path)
+                    if progress_callback:
+                        progress_callback(len(done), len(tasks))
+            logger.info(f"{len(tasks)} partes escritas en paralelo con {workers} procesos")
+        except (OSError, RuntimeError) as e:
+            # Entornos sin multiprocesamiento (p. ej. ejecutables congelados sin freeze_support)
+            logger.warning(f"División paralela no disponible, se escribirán las partes en secuencia: {e}")
+
+    frame = None
+    for task in tasks:
+        if task[3] not in done:
+            if snapshot.get('format') == 'arrow':
+                _write_part_task(*task)
+            else:
+                # El snapshot en pickle se lee una sola vez para todas las partes
+                if frame is None:
+                    frame = read_snapshot(snapshot['path'])
+                _, start, stop, output_path = task
+                frame.iloc[start:stop].to_excel(output_path, index=False)
+            done.add(task[3])
+            if progress_callback:
+                progress_callback(len(done), len(tasks))
+
+    return names
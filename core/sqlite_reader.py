@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Lectura de bases de datos SQLite como fuentes de datos (tablas o consultas)
+"""
+
+import datetime
+import logging
+import math
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SQLITE_FORMATS = ('.sqlite', '.sqlite3', '.db')
+
+# Opciones de lectura que admite una fuente SQLite
+SUPPORTED_OPTIONS = ('usecols', 'nrows', 'dtype', 'sheet_name')
+
+# Operadores de filtro que se trasladan a la cláusula WHERE
+FILTER_OPERATORS = ('=', '!=', '<>', '<', '<=', '>', '>=', 'like', 'in', 'not in', 'is null', 'is not null')
+
+# Filtro simple: (columna, operador, valor); el valor se ignora en 'is null' e 'is not null'
+Filter = Tuple[Any, str, Any]
+
+def is_sqlite(file_path: Union[str, Path]) -> bool:
+    """Indicar si un archivo es una base de datos SQLite"""
+    return Path(file_path).suffix.lower() in SQLITE_FORMATS
+
+def _connect(file_path: Union[str, Path]) -> sqlite3.Connection:
+    """Abrir la base de datos en modo solo lectura"""
+    return sqlite3.connect(f"{Path(file_path).resolve().as_uri()}?mode=ro", uri=True)
+
+def quote_identifier(name: Any) -> str:
+    """Nombre de tabla o columna entre comillas dobles"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+def quote_literal(value: Any) -> str:
+    """Valor como literal SQL (los textos con comillas simples escapadas)"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (int, float)):
+        if isinstance(value, float) and not math.isfinite(value):
+            raise ValueError(f"Valor numérico no válido para un filtro: {value}")
+        return repr(value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        value = value.isoformat(sep=' ') if isinstance(value, datetime.datetime) else value.isoformat()
+    return "'" + str(value).replace("'", "''") + "'"
+
+def _is_query(source: str) -> bool:
+    """Indicar si el origen es una consulta (SELECT o WITH) en lugar de un nombre de tabla"""
+    return source.lstrip().lower().startswith(('select', 'with'))
+
+def _relation(source: str) -> str:
+    """Expresión FROM para una tabla o una consulta"""
+    if _is_query(source):
+        return f"({source.strip().rstrip(';')}) AS fuente"
+    return quote_identifier(source)
+
+def _where_clause(filters: Optional[Sequence[Filter]]) -> str:
+    """Cláusula WHERE para una lista de filtros simples (todos deben cumplirse)"""
+    conditions = []
+    for column, operator, value in filters or []:
+        operator = operator.lower().strip()
+        if operator not in FILTER_OPERATORS:
+            raise ValueError(f"Operador de filtro no soportado: {operator}")
+        if operator in ('is null', 'is not null'):
+            conditions.append(f"{quote_identifier(column)} {operator.upper()}")
+        elif operator in ('in', 'not in'):
+            values = ', '.join(quote_literal(item) for item in value)
+            conditions.append(f"{quote_identifier(column)} {operator.upper()} ({values})")
+        else:
+            conditions.append(f"{quote_identifier(column)} {operator.upper()} {quote_literal(value)}")
+    return f" WHERE {' AND '.join(conditions)}" if conditions else ''
+
+def build_source_query(source: str, filters: Optional[Sequence[Filter]] = None) -> str:
+    """
+    Consulta para una tabla (o consulta) con filtros simples.
+
+    El resultado se usa como nombre de hoja: al leer columnas concretas SQLite aplana
+    la subconsulta, así que la proyección y los filtros se resuelven en la base de datos.
+    """
+    if not filters:
+        return source if _is_query(source) else f"SELECT * FROM {quote_identifier(source)}"
+    return f"SELECT * FROM {_relation(source)}{_where_clause(filters)}"
+
+def list_tables(file_path: Union[str, Path]) -> List[str]:
+    """Tablas y vistas de la base de datos, en orden alfabético"""
+    with closing(_connect(file_path)) as connection:
+        rows = connection.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'view') "
+            "AND name NOT LIKE 'sqlite_%' ORDER BY name").fetchall()
+    return [name for name, in rows]
+
+def resolve_source(file_path: Union[str, Path], sheet_name: Optional[Union[str, int]]) -> str:
+    """Tabla o consulta a partir del nombre de hoja (None o un índice eligen una tabla)"""
+    if sheet_name is None or isinstance(sheet_name, int):
+        tables = list_tables(file_path)
+        if not tables:
+            raise ValueError(f"La base de datos {Path(file_path).name} no tiene tablas")
+        return tables[sheet_name or 0]
+    return sheet_name
+
+def read_sqlite_header(file_path: Union[str, Path], sheet_name: Optional[Union[str, int]] = None) -> List[str]:
+    """Columnas de una tabla o consulta sin leer filas"""
+    source = resolve_source(file_path, sheet_name)
+    with closing(_connect(file_path)) as connection:
+        cursor = connection.execute(f"SELECT * FROM {_relation(source)} LIMIT 0")
+        return [description[0] for description in cursor.description]
+
+def _select(file_path: Union[str, Path], source: str, usecols: Optional[Sequence[Any]]) -> str:
+    """SELECT de las columnas pedidas (posiciones o nombres), en el orden de la tabla"""
+    if usecols is None:
+        return f"SELECT * FROM {_relation(source)}"
+    header = read_sqlite_header(file_path, source)
+    if all(isinstance(col, int) for col in usecols):
+        names = [header[position] for position in sorted(usecols)]
+    else:
+        requested = set(usecols)
+        names = [col for col in header if col in requested]
+    return f"SELECT {', '.join(quote_identifier(name) for name in names)} FROM {_relation(source)}"
+
+def read_sqlite(file_path: Union[str, Path], **kwargs) -> pd.DataFrame:
+    """
+    Leer una tabla o consulta de SQLite con las opciones de pd.read_excel que usa la
+    aplicación: sheet_name (tabla o consulta), usecols (se leen solo esas columnas),
+    nrows (LIMIT) y dtype.
+    """
+    unsupported = [option for option in kwargs if option not in SUPPORTED_OPTIONS]
+    if unsupported:
+        raise ValueError(f"Opciones no soportadas para SQLite: {unsupported}")
+
+    source = resolve_source(file_path, kwargs.get('sheet_name'))
+    sql = _select(file_path, source, kwargs.get('usecols'))
+    if kwargs.get('nrows') is not None:
+        sql += f" LIMIT {int(kwargs['nrows'])}"
+
+    with closing(_connect(file_path)) as connection:
+        df = pd.read_sql_query(sql, connection)
+
+    dtype = kwargs.get('dtype')
+    if dtype:
+        df = df.astype({col: col_type for col, col_type in dtype.items() if col in df.columns})
+    return df
+
+def iter_sqlite_frames(file_path: Union[str, Path],
+                       columns: Optional[Sequence[Any]] = None,
+                       sheet_name: Optional[Union[str, int]] = None,
+                       chunk_size: int = 50000) -> Iterator[pd.DataFrame]:
+    """Recorrer una tabla o consulta en lotes (fetchmany por debajo) con índice continuo"""
+    source = resolve_source(file_path, sheet_name)
+    sql = _select(file_path, source, columns)
+
+    start = 0
+    with closing(_connect(file_path)) as connection:
+        for frame in pd.read_sql_query(sql, connection, chunksize=chunk_size):
+            frame.index = pd.RangeIndex(start, start + len(frame))
+            start += len(frame)
+            yield frame
+
+def probe_sqlite(file_path: Union[str, Path], sheet_name: Optional[Union[str, int]] = None) -> Dict[str, Any]:
+    """
+    Columnas y número de filas de una tabla o consulta, con la misma forma que la
+    información de una hoja de probe_workbook (las filas se cuentan con COUNT(*)).
+    """
+    source = resolve_source(file_path, sheet_name)
+    column_names = read_sqlite_header(file_path, source)
+    with closing(_connect(file_path)) as connection:
+        rows = connection.execute(f"SELECT COUNT(*) FROM {_relation(source)}").fetchone()[0]
+    return {
+        'rows': rows,
+        'columns': len(column_names),
+        'column_names': column_names,
+        'dimension': None,
+        'row_source': 'count'
+    }
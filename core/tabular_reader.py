@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Lectura de archivos tabulares (CSV, Parquet y JSON Lines) como fuentes de datos
+"""
+
+import csv
+import importlib.util
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TABULAR_FORMATS = ('.csv', '.parquet', '.jsonl')
+
+# Opciones de lectura que admiten estos formatos (las de Excel como sheet_name se ignoran)
+SUPPORTED_OPTIONS = ('usecols', 'nrows', 'dtype', 'sheet_name')
+
+_SAMPLE_BYTES = 64 * 1024
+_COUNT_BLOCK = 1 << 24
+
+def is_tabular(file_path: Union[str, Path]) -> bool:
+    """Indicar si un archivo es CSV, Parquet o JSON Lines"""
+    return Path(file_path).suffix.lower() in TABULAR_FORMATS
+
+def _has_pyarrow() -> bool:
+    """Indicar si pyarrow está instalado"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+def _csv_options(path: Path) -> Dict[str, str]:
+    """Separador y codificación de un CSV a partir de su primer bloque"""
+    with open(path, 'rb') as f:
+        sample = f.read(_SAMPLE_BYTES)
+    try:
+        text = sample.decode('utf-8-sig')
+        encoding = 'utf-8-sig' if sample.startswith(b'\xef\xbb\xbf') else 'utf-8'
+    except UnicodeDecodeError as e:
+        # Un carácter cortado al final de la muestra no indica otra codificación
+        if e.start >= len(sample) - 3:
+            text, encoding = sample[:e.start].decode('utf-8-sig'), 'utf-8'
+        else:
+            text, encoding = sample.decode('latin-1'), 'latin-1'
+    try:
+        separator = csv.Sniffer().sniff(text.split('\n', 1)[0], delimiters=',;\t|').delimiter
+    except csv.Error:
+        separator = ','
+    return {'sep': separator, 'encoding': encoding}
+
+def read_tabular_header(file_path: Union[str, Path]) -> List[Any]:
+    """Nombres de las columnas sin leer los datos"""
+    path = Path(file_path)
+    suffix = path.suffix.lower()
+    if suffix == '.csv':
+        return list(pd.read_csv(path, nrows=0, **_csv_options(path)).columns)
+    if suffix == '.parquet':
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(path).names)
+    return list(pd.read_json(path, lines=True, nrows=1).columns)
+
+def _column_names(path: Path, usecols: Optional[Sequence[Any]]) -> Optional[List[Any]]:
+    """Convertir usecols (posiciones o nombres) en nombres de columna"""
+    if usecols is None:
+        return None
+    if all(isinstance(col, int) for col in usecols):
+        header = read_tabular_header(path)
+        return [header[position] for position in usecols]
+    return list(usecols)
+
+def read_tabular(file_path: Union[str, Path], **kwargs) -> Tuple[pd.DataFrame, str]:
+    """
+    Leer un archivo CSV, Parquet o JSON Lines con las opciones de pd.read_excel que
+    usa la aplicación (usecols, nrows, dtype). Devuelve el DataFrame y el lector usado.
+
+    El CSV completo se lee con el lector multihilo de pyarrow si está instalado; el
+    Parquet lee solo las columnas pedidas y, con nrows, solo los primeros lotes.
+    """
+    unsupported = [option for option in kwargs if option not in SUPPORTED_OPTIONS]
+    if unsupported:
+        raise ValueError(f"Opciones no soportadas para {Path(file_path).suffix}: {unsupported}")
+
+    path = Path(file_path)
+    suffix = path.suffix.lower()
+    columns = _column_names(path, kwargs.get('usecols'))
+    nrows = kwargs.get('nrows')
+    dtype = kwargs.get('dtype')
+
+    if suffix == '.csv':
+        options = _csv_options(path)
+        if nrows is None and _has_pyarrow():
+            return pd.read_csv(path, engine='pyarrow', usecols=columns, dtype=dtype, **options), 'pyarrow-csv'
+        return pd.read_csv(path, usecols=columns, nrows=nrows, dtype=dtype, **options), 'csv'
+
+    if suffix == '.parquet':
+        if nrows is None:
+            df = pd.read_parquet(path, columns=columns)
+        else:
+            df = next(iter_tabular_frames(path, columns, nrows), None)
+            if df is None:
+                df = pd.DataFrame(columns=columns if columns is not None else read_tabular_header(path))
+            df = df.iloc[:nrows]
+        if dtype:
+            df = df.astype({col: col_type for col, col_type in dtype.items() if col in df.columns})
+        return df, 'parquet'
+
+    df = pd.read_json(path, lines=True, nrows=nrows, dtype=dtype if dtype else True)
+    return (df[columns] if columns is not None else df), 'jsonl'
+
+def iter_tabular_frames(file_path: Union[str, Path],
+                        columns: Optional[Sequence[Any]] = None,
+                        chunk_size: int = 50000) -> Iterator[pd.DataFrame]:
+    """
+    Recorrer un archivo CSV, Parquet o JSON Lines en lotes de DataFrame.
+
+    Parquet se recorre por lotes de sus grupos de filas leyendo solo las columnas
+    pedidas. El índice es continuo entre lotes, como en la carga completa.
+    """
+    path = Path(file_path)
+    suffix = path.suffix.lower()
+    columns = list(columns) if columns is not None else None
+
+    if suffix == '.csv':
+        frames = pd.read_csv(path, usecols=columns, chunksize=chunk_size, **_csv_options(path))
+    elif suffix == '.parquet':
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        frames = (batch.to_pandas() for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns))
+    else:
+        frames = pd.read_json(path, lines=True, chunksize=chunk_size)
+
+    start = 0
+    for frame in frames:
+        if columns is not None and suffix == '.jsonl':
+            frame = frame[columns]
+        frame.index = pd.RangeIndex(start, start + len(frame))
+        start += len(frame)
+        yield frame
+
+def _count_lines(path: Path) -> int:
+    """Contar líneas leyendo el archivo por bloques binarios (sin interpretar su contenido)"""
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(_COUNT_BLOCK)
+            if not block:
+                break
+            lines += block.count(b'\n')
+            last = block[-1:]
+    return lines + (0 if last == b'\n' else 1)
+
+def probe_tabular(file_path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Encabezados y número de filas de un archivo tabular, con la misma forma que la
+    información de una hoja de probe_workbook.
+
+    Parquet toma las filas de sus metadatos; CSV y JSON Lines cuentan líneas, por lo
+    que un CSV con saltos de línea dentro de campos entre comillas da una estimación.
+    """
+    path = Path(file_path)
+    column_names = read_tabular_header(path)
+    if path.suffix.lower() == '.parquet':
+        import pyarrow.parquet as pq
+        rows, row_source = pq.ParquetFile(path).metadata.num_rows, 'metadata'
+    else:
+        lines = _count_lines(path)
+        rows = max(lines - 1, 0) if path.suffix.lower() == '.csv' else lines
+        row_source = 'stream'
+    return {
+        'rows': rows,
+        'columns': len(column_names),
+        'column_names': column_names,
+        'dimension': None,
+        'row_source': row_source
+    }
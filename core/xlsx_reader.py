@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""
+Lector de hojas .xlsx por eventos (expat), sin el modelo de objetos de openpyxl
+"""
+
+import datetime
+import re
+import zipfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import xml.etree.ElementTree as ET
+from xml.parsers import expat
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+from core.readers import _MAIN_NS, _workbook_sheets
+
+# Opciones de pd.read_excel que este lector admite (el resto hace que se use otro motor)
+SUPPORTED_OPTIONS = ('usecols', 'nrows', 'dtype', 'converters')
+
+# Formatos numéricos integrados de Excel que representan fechas u horas
+_BUILTIN_DATE_FORMATS = {
+    14: 'mm-dd-yy', 15: 'd-mmm-yy', 16: 'd-mmm', 17: 'mmm-yy', 18: 'h:mm AM/PM',
+    19: 'h:mm:ss AM/PM', 20: 'h:mm', 21: 'h:mm:ss', 22: 'm/d/yy h:mm',
+    45: 'mm:ss', 46: '[h]:mm:ss', 47: 'mmss.0'
+}
+
+# Mismas reglas que openpyxl para reconocer formatos de fecha y de duración
+_LITERAL_RE = re.compile(r'".*?"|\[(?!hh?\]|mm?\]|ss?\])[^\]]*\]')
+_DATE_CODE_RE = re.compile(r'(?<![_\\])[dmhysDMHYS]')
+_TIMEDELTA_RE = re.compile(r'\[hh?\](:mm(:ss(\.0*)?)?)?|\[mm?\](:ss(\.0*)?)?|\[ss?\](\.0*)?', re.I)
+
+_WINDOWS_EPOCH = datetime.datetime(1899, 12, 30)
+_MAC_EPOCH = datetime.datetime(1904, 1, 1)
+_BLOCK_SIZE = 1 << 20
+
+class _StopParsing(Exception):
+    """Se alcanzó el número de filas pedido"""
+
+# Primera etiqueta del documento, para conocer el prefijo que usa ('x:worksheet' -> 'x:')
+_ROOT_RE = re.compile(rb'<(?![?!])(?:([\w.-]+):)?[\w.-]+')
+
+def _parse_xml(stream, make_handlers: Callable[[str], Tuple[Callable, Callable, Callable]]):
+    """
+    Recorrer un XML con expat.
+
+    make_handlers recibe el prefijo de las etiquetas ('' o p. ej. 'x:') y devuelve los
+    manejadores de inicio, fin y texto; así se comparan nombres sin procesar espacios
+    de nombres en cada etiqueta.
+    """
+    block = stream.read(_BLOCK_SIZE)
+    match = _ROOT_RE.search(block)
+    prefix = match.group(1).decode() + ':' if match and match.group(1) else ''
+    start, end, data = make_handlers(prefix)
+
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = data
+    while block:
+        parser.Parse(block, False)
+        block = stream.read(_BLOCK_SIZE)
+    parser.Parse(b'', True)
+
+def read_shared_strings(archive: zipfile.ZipFile) -> List[str]:
+    """Decodificar sharedStrings.xml una sola vez en una lista"""
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return []
+
+    strings: List[str] = []
+
+    def make_handlers(prefix: str):
+        item_tag, text_tag, phonetic_tag = f'{prefix}si', f'{prefix}t', f'{prefix}rPh'
+        parts: List[str] = []
+        state = {'text': False, 'phonetic': False}
+
+        def start(name, attrs):
+            if name == item_tag:
+                parts.clear()
+            elif name == text_tag:
+                state['text'] = not state['phonetic']
+            elif name == phonetic_tag:
+                # Las guías fonéticas no forman parte del texto de la celda
+                state['phonetic'] = True
+
+        def end(name):
+            if name == item_tag:
+                strings.append(''.join(parts))
+            elif name == text_tag:
+                state['text'] = False
+            elif name == phonetic_tag:
+                state['phonetic'] = False
+
+        def data(text):
+            if state['text']:
+                parts.append(text)
+
+        return start, end, data
+
+    with archive.open('xl/sharedStrings.xml') as stream:
+        _parse_xml(stream, make_handlers)
+    return strings
+
+def _is_date_format(number_format: str) -> bool:
+    """Indicar si un formato numérico muestra una fecha u hora"""
+    number_format = _LITERAL_RE.sub('', number_format.split(';')[0])
+    return _DATE_CODE_RE.search(number_format) is not None
+
+def read_date_styles(archive: zipfile.ZipFile) -> Dict[int, str]:
+    """Estilos de celda con formato de fecha: {índice de estilo: 'date' o 'timedelta'}"""
+    if 'xl/styles.xml' not in archive.namelist():
+        return {}
+
+    root = ET.fromstring(archive.read('xl/styles.xml'))
+    formats = dict(_BUILTIN_DATE_FORMATS)
+    for number_format in root.iter(f'{_MAIN_NS}numFmt'):
+        formats[int(number_format.get('numFmtId'))] = number_format.get('formatCode', '')
+
+    date_styles = {}
+    cell_xfs = root.find(f'{_MAIN_NS}cellXfs')
+    for position, xf in enumerate(cell_xfs if cell_xfs is not None else []):
+        number_format = formats.get(int(xf.get('numFmtId', 0)))
+        if number_format and _is_date_format(number_format):
+            date_styles[position] = 'timedelta' if _TIMEDELTA_RE.search(number_format.split(';')[0]) else 'date'
+    return date_styles
+
+def _uses_1904_dates(archive: zipfile.ZipFile) -> bool:
+    """Indicar si el libro usa el sistema de fechas de 1904"""
+    root = ET.fromstring(archive.read('xl/workbook.xml'))
+    properties = root.find(f'{_MAIN_NS}workbookPr')
+    return properties is not None and properties.get('date1904') in ('1', 'true')
+
+def _from_excel(value: float, kind: str, epoch: datetime.datetime) -> Any:
+    """Convertir un número de serie de Excel en fecha, hora o duración (igual que openpyxl)"""
+    if kind == 'timedelta':
+        delta = datetime.timedelta(days=value)
+        if delta.microseconds:
+            delta = datetime.timedelta(seconds=delta.total_seconds() // 1,
+                                       microseconds=round(delta.microseconds, -3))
+        return delta
+
+    day, fraction = divmod(value, 1)
+    diff = datetime.timedelta(milliseconds=round(fraction * 86400 * 1000))
+    if 0 <= value < 1 and diff.days == 0:
+        return (datetime.datetime.min + diff).time()
+    if 0 < value < 60 and epoch == _WINDOWS_EPOCH:
+        # Excel considera bisiesto el año 1900
+        day += 1
+    return epoch + datetime.timedelta(days=day) + diff
+
+def _column_index(letters: str) -> int:
+    """Posición (desde 0) de una columna a partir de sus letras ('AB' -> 27)"""
+    index = 0
+    for char in letters:
+        index = index * 26 + (ord(char) - 64)
+    return index - 1
+
+def _parse_sheet_rows(stream, shared: List[str], date_styles: Dict[int, str],
+                      epoch: datetime.datetime, max_rows: Optional[int]) -> List[List[Any]]:
+    """
+    Recorrer el XML de una hoja con expat y devolver sus filas como listas de valores.
+
+    Igual que el lector de pandas con openpyxl: celdas vacías como '', números
+    enteros como int, errores como NaN y sin celdas ni filas vacías al final.
+    """
+    rows: List[List[Any]] = []
+
+    def make_handlers(prefix: str):
+        row_tag, cell_tag, value_tag, text_tag = f'{prefix}row', f'{prefix}c', f'{prefix}v', f'{prefix}t'
+        parts: List[str] = []
+        column_cache: Dict[str, int] = {}
+        row: List[Any] = []
+        cell_type = 'n'
+        style = 0
+        column = 0
+        collecting = False
+        has_value = False
+        next_row = 1
+
+        def start(name, attrs):
+            nonlocal row, cell_type, style, column, collecting, has_value, next_row
+            if name == cell_tag:
+                reference = attrs.get('r')
+                if reference:
+                    letters = reference.rstrip('0123456789')
+                    column = column_cache.get(letters)
+                    if column is None:
+                        column = _column_index(letters)
+                        column_cache[letters] = column
+                else:
+                    column = len(row)
+                cell_type = attrs.get('t', 'n')
+                style = int(attrs.get('s', 0))
+                has_value = False
+                parts.clear()
+            elif name == value_tag or (name == text_tag and cell_type == 'inlineStr'):
+                collecting = True
+                has_value = True
+            elif name == row_tag:
+                number = attrs.get('r')
+                number = int(number) if number else next_row
+                # Las filas que no aparecen en el XML están vacías
+                while len(rows) < number - 1:
+                    rows.append([])
+                row = []
+                next_row = number + 1
+
+        def end(name):
+            nonlocal collecting
+            if name == cell_tag:
+                if not has_value:
+                    return
+                text = ''.join(parts)
+                if cell_type == 's':
+                    value = shared[int(text)]
+                elif cell_type == 'n':
+                    if not text:
+                        return
+                    number = float(text)
+                    kind = date_styles.get(style) if date_styles else None
+                    if kind is not None:
+                        value = _from_excel(number, kind, epoch)
+                    else:
+                        value = int(number) if number.is_integer() else number
+                elif cell_type in ('str', 'inlineStr'):
+                    value = text
+                elif cell_type == 'b':
+                    value = text == '1'
+                elif cell_type == 'e':
+                    value = np.nan
+                else:
+                    value = datetime.datetime.fromisoformat(text)
+
+                if len(row) < column:
+                    row.extend([''] * (column - len(row)))
+                row.append(value)
+            elif name == value_tag or name == text_tag:
+                collecting = False
+            elif name == row_tag:
+                while row and row[-1] == '':
+                    row.pop()
+                rows.append(row)
+                if max_rows is not None and len(rows) >= max_rows:
+                    raise _StopParsing()
+
+        def data(text):
+            if collecting:
+                parts.append(text)
+
+        return start, end, data
+
+    try:
+        _parse_xml(stream, make_handlers)
+    except _StopParsing:
+        pass
+
+    while rows and not rows[-1]:
+        rows.pop()
+    return rows
+
+def read_xlsx(file_path: Union[str, Path], sheet_name: Union[str, int] = 0, **kwargs) -> pd.DataFrame:
+    """
+    Leer una hoja .xlsx con expat, equivalente a pd.read_excel para hojas de solo datos.
+
+    sharedStrings.xml se decodifica una vez, las fechas se obtienen de los formatos
+    de styles.xml y las filas se convierten con el mismo analizador que usa pandas.
+    Admite usecols, nrows, dtype y converters; cualquier otra opción lanza ValueError
+    para que se use otro motor.
+    """
+    unsupported = [option for option in kwargs if option not in SUPPORTED_OPTIONS]
+    if unsupported:
+        raise ValueError(f"Opciones no soportadas por el lector xml: {unsupported}")
+    if sheet_name is None or isinstance(kwargs.get('usecols'), str):
+        raise ValueError("El lector xml lee una sola hoja y columnas por nombre o posición")
+
+    nrows = kwargs.pop('nrows', None)
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            sheets = _workbook_sheets(archive)
+            if isinstance(sheet_name, int):
+                sheet_path = sheets[sheet_name][1]
+            else:
+                sheet_path = dict(sheets).get(sheet_name)
+            if not sheet_path:
+                raise ValueError(f"Hoja no encontrada: {sheet_name}")
+
+            shared = read_shared_strings(archive)
+            date_styles = read_date_styles(archive)
+            epoch = _MAC_EPOCH if _uses_1904_dates(archive) else _WINDOWS_EPOCH
+            with archive.open(sheet_path) as stream:
+                rows = _parse_sheet_rows(stream, shared, date_styles, epoch,
+                                         nrows + 1 if nrows is not None else None)
+    except (KeyError, IndexError, zipfile.BadZipFile, expat.ExpatError, ET.ParseError) as e:
+        # Estructura no prevista: otro motor puede leer el archivo
+        raise ValueError(f"El lector xml no pudo leer {Path(file_path).name}: {e}") from e
+
+    if not rows:
+        return pd.DataFrame()
+
+    width = max(len(row) for row in rows)
+    rows = [row + [''] * (width - len(row)) for row in rows]
+    return TextParser(rows, header=0, nrows=nrows, **kwargs).read()
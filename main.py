@@ -11,6 +11,7 @@ Fecha: 2025
 
 import sys
 import os
+import multiprocessing
 from pathlib import Path
 
 # Agregar el directorio raíz al path para imports
@@ -39,4 +40,6 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    # Necesario para la lectura de hojas en paralelo desde el ejecutable
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -44,6 +44,7 @@ class ColumnConfig:
     mapping_source: Optional[str] = None
     mapping_key_column: Optional[str] = None
     mapping_value_column: Optional[str] = None
+    mapping_key_policy: str = "text"  # text, integer, numeric, zero_padded[:N], date
     
     # Configuración de generación numérica
     is_numeric_generator: bool = False
@@ -76,6 +77,7 @@ class ColumnConfig:
             "mapping_source": self.mapping_source,
             "mapping_key_column": self.mapping_key_column,
             "mapping_value_column": self.mapping_value_column,
+            "mapping_key_policy": self.mapping_key_policy,
             # Agregar campos de generador numérico
             "is_numeric_generator": self.is_numeric_generator,
             "numeric_start": self.numeric_start,
@@ -104,6 +106,7 @@ class ColumnConfig:
             mapping_source=data.get("mapping_source"),
             mapping_key_column=data.get("mapping_key_column"),
             mapping_value_column=data.get("mapping_value_column"),
+            mapping_key_policy=data.get("mapping_key_policy", "text"),
             # Agregar campos de generador numérico
             is_numeric_generator=data.get("is_numeric_generator", False),
             numeric_start=data.get("numeric_start", 1),
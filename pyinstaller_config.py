@@ -29,6 +29,7 @@ HIDDEN_IMPORTS = [
     "pandas",
     "openpyxl",
     "xlrd",
+    "python_calamine",
     "PIL",
     "PIL._tkinter_finder",
     
@@ -55,6 +56,17 @@ HIDDEN_IMPORTS = [
     "core.export_manager",
     "core.mapping_manager",
     "core.numeric_generator",
+    "core.disk_cache",
+    "core.mapping_index",
+    "core.mapping_registry",
+    "core.readers",
+    "core.dtype_optimizer",
+    "core.xlsx_reader",
+    "core.schema",
+    "core.background_loader",
+    "core.snapshot",
+    "core.sqlite_reader",
+    "core.tabular_reader",
     "ui.main_window",
     "ui.frames.file_frame",
     "ui.frames.column_frame",
@@ -0,0 +1,803 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de prueba para la carga de archivos
+Verifica los motores de lectura y la información de carga
+"""
+
+import re
+import sqlite3
+import sys
+import tempfile
+import zipfile
+from datetime import time
+import pandas as pd
+import pytest
+from pathlib import Path
+
+# Agregar el directorio raíz al path para imports
+root_dir = Path(__file__).parent
+sys.path.insert(0, str(root_dir))
+
+from core.background_loader import BackgroundLoader
+from core.file_manager import FileManager
+from core.readers import engine_candidates, is_engine_available, read_excel_file, list_sheet_names, probe_workbook
+from core.column_manager import ColumnManager
+from core.dtype_optimizer import optimize_dtypes
+from core import snapshot as snapshot_module
+from core.snapshot import read_snapshot, split_snapshot
+from core.sqlite_reader import build_source_query
+from core.export_manager import ExportManager
+from core.mapping_manager import MappingManager
+from core.mapping_registry import MappingRegistry
+from config.settings import AppSettings
+from models.column_config import ColumnConfig, DataType
+from utils.exceptions import ValidationError
+from utils.helpers import ExcelHelper
+
+def create_test_data(rows: int = 200):
+    """Crear datos de prueba"""
+    return pd.DataFrame({
+        'Documento': [f'{1000 + i}' for i in range(rows)],
+        'Nombre': [f'Persona {i}' for i in range(rows)],
+        'Valor': [i * 1.5 for i in range(rows)],
+        'Fecha': pd.date_range('2024-01-01', periods=rows, freq='D')
+    })
+
+def test_reader_engines():
+    """Probar la selección de motor de lectura y el respaldo automático"""
+    print("🧪 PRUEBA DE MOTORES DE LECTURA")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = Path(temp_dir) / "datos.xlsx"
+        data = create_test_data()
+        data.to_excel(file_path, index=False)
+
+        candidates = engine_candidates(file_path, 'auto')
+        print(f"Motores candidatos: {candidates}")
+        assert candidates[-1] == 'openpyxl'
+        assert ('calamine' in candidates) == is_engine_available('calamine')
+        assert engine_candidates(file_path, 'xlrd') == ['openpyxl']
+
+        # Un motor desconocido cae al motor por defecto
+        df, load_info = read_excel_file(file_path, 'motor_inexistente')
+        assert load_info['reader_engine'] == 'openpyxl'
+        assert len(df) == len(data)
+
+        manager = FileManager(AppSettings(default_export_dir=temp_dir, reader_engine='openpyxl',
+                                          load_cache_enabled=False))
+        info = manager.load_source_file(str(file_path))
+        print(f"Motor: {info['reader_engine']} - Tiempo de carga: {info['load_time']:.3f} s")
+        assert info['reader_engine'] == 'openpyxl'
+        assert info['load_time'] >= 0
+        assert info['rows'] == len(data)
+
+    print("✅ ÉXITO: El motor configurado se usa con respaldo automático y se informa el tiempo de carga")
+
+def test_xml_reader_engine():
+    """Probar que el lector xml da el mismo resultado que openpyxl"""
+    print("🧪 PRUEBA DE LECTOR XML")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = Path(temp_dir) / "datos.xlsx"
+        data = create_test_data(300)
+        data['Ciudad'] = [['CALI', None, 'BOGOTA'][i % 3] for i in range(300)]
+        data['Activo'] = [i % 2 == 0 for i in range(300)]
+        data['Hora'] = [time(8, i % 60) for i in range(300)]
+        data.to_excel(file_path, index=False)
+
+        assert 'xml' in engine_candidates(file_path, 'auto')
+        expected, _ = read_excel_file(file_path, 'openpyxl')
+        df, load_info = read_excel_file(file_path, 'xml')
+        print(f"Motor: {load_info['reader_engine']} - Tiempo: {load_info['load_time']:.3f} s")
+        assert load_info['reader_engine'] == 'xml'
+        pd.testing.assert_frame_equal(df, expected)
+
+        # Mismas opciones que usa la carga proyectada y la vista previa
+        df, _ = read_excel_file(file_path, 'xml', usecols=[0, 3], nrows=10)
+        pd.testing.assert_frame_equal(df, expected[['Documento', 'Fecha']].head(10))
+
+        # Una opción no soportada pasa al motor por defecto
+        df, load_info = read_excel_file(file_path, 'xml', skiprows=[1])
+        assert load_info['reader_engine'] == 'openpyxl' and len(df) == 299
+
+        manager = FileManager(AppSettings(default_export_dir=temp_dir, reader_engine='xml',
+                                          load_cache_enabled=False))
+        assert manager.load_source_file(str(file_path))['reader_engine'] == 'xml'
+
+    print("✅ ÉXITO: El lector xml lee los mismos datos sin el modelo de objetos de openpyxl")
+
+def test_load_cache():
+    """Probar que una segunda apertura del mismo archivo se lee desde el cache de cargas"""
+    print("🧪 PRUEBA DE CACHE DE CARGAS")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = Path(temp_dir) / "datos.xlsx"
+        data = create_test_data()
+        data.to_excel(file_path, index=False)
+
+        settings = AppSettings(default_export_dir=temp_dir, load_cache_dir=str(Path(temp_dir) / "cache"))
+        first = FileManager(settings)
+        first_info = first.load_source_file(str(file_path))
+        assert not first_info['cache_hit']
+
+        # Reapertura en otra sesión: mismo contenido, sin volver a leer el Excel
+        second = FileManager(settings)
+        second_info = second.load_source_file(str(file_path))
+        print(f"Sin cache: {first_info['load_time']:.3f} s - Con cache: {second_info['load_time']:.3f} s "
+              f"({second.load_cache.file_format})")
+        assert second_info['cache_hit'] and second_info['reader_engine'] == 'cache'
+        pd.testing.assert_frame_equal(second.source_df, first.source_df)
+
+        stats = second.get_load_cache_statistics()
+        assert stats['hits'] == 1 and stats['entries'] == 1
+
+        # Un archivo modificado no reutiliza la entrada anterior
+        data.head(10).to_excel(file_path, index=False)
+        assert second.load_source_file(str(file_path))['rows'] == 10
+
+    print("✅ ÉXITO: Los archivos ya leídos se reutilizan desde el cache de cargas")
+
+def test_multi_sheet_loading():
+    """Probar la enumeración de hojas, la carga de una hoja concreta y la carga paralela de varias"""
+    print("🧪 PRUEBA DE CARGA DE VARIAS HOJAS")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = Path(temp_dir) / "trimestre.xlsx"
+        months = ['Enero', 'Febrero', 'Marzo']
+        with pd.ExcelWriter(file_path) as writer:
+            for i, month in enumerate(months):
+                create_test_data(50 + i).to_excel(writer, sheet_name=month, index=False)
+
+        assert list_sheet_names(file_path) == months
+
+        settings = AppSettings(default_export_dir=temp_dir, load_cache_dir=str(Path(temp_dir) / "cache"),
+                               max_load_workers=2)
+        manager = FileManager(settings)
+
+        info = manager.load_source_file(str(file_path), 'Marzo')
+        assert info['sheets'] == months and info['active_sheet'] == 'Marzo'
+        assert info['rows'] == 52
+
+        info = manager.load_source_sheets(str(file_path))
+        print(f"Hojas: {info['active_sheet']} - Filas: {info['rows']} - Tiempo: {info['load_time']:.3f} s")
+        assert info['rows'] == 50 + 51 + 52
+        assert manager.source_df.columns[0] == 'Hoja'
+        assert manager.source_df['Hoja'].value_counts().to_dict() == {'Enero': 50, 'Febrero': 51, 'Marzo': 52}
+
+        # 'Marzo' ya estaba en cache; las demás quedan guardadas para la próxima vez
+        assert manager.get_load_cache_statistics()['entries'] == 3
+
+    print("✅ ÉXITO: Las hojas se enumeran sin leer datos y se cargan en paralelo")
+
+def test_workbook_probe():
+    """Probar la inspección de hojas, dimensiones y encabezados sin leer los datos"""
+    print("🧪 PRUEBA DE INSPECCIÓN DE LIBROS")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = Path(temp_dir) / "inspeccion.xlsx"
+        data = create_test_data(120)
+        with pd.ExcelWriter(file_path) as writer:
+            data.to_excel(writer, sheet_name='Datos', index=False)
+            data.head(5).to_excel(writer, sheet_name='Resumen', index=False)
+
+        probe = probe_workbook(file_path)
+        print(f"Hojas: {probe['sheet_names']} - Tiempo: {probe['probe_time'] * 1000:.1f} ms")
+        assert probe['sheet_names'] == ['Datos', 'Resumen']
+        assert probe['sheets']['Datos']['rows'] == 120
+        assert probe['sheets']['Datos']['row_source'] == 'dimension'
+        assert probe['sheets']['Datos']['column_names'] == data.columns.tolist()
+        assert probe['sheets']['Resumen']['rows'] == 5
+
+        info = ExcelHelper.get_file_info(str(file_path))
+        assert info['sheet_count'] == 2
+        assert info['sheets_info']['Datos'] == {'rows': 120, 'columns': len(data.columns),
+                                               'column_names': data.columns.tolist()}
+
+        # Sin etiqueta <dimension> las filas se cuentan recorriendo la hoja
+        stripped_path = Path(temp_dir) / "sin_dimension.xlsx"
+        with zipfile.ZipFile(file_path) as source, zipfile.ZipFile(stripped_path, 'w') as target:
+            for item in source.infolist():
+                content = source.read(item.filename)
+                if item.filename.startswith('xl/worksheets/'):
+                    content = re.sub(rb'<dimension [^>]*/>', b'', content)
+                target.writestr(item, content)
+
+        probe = probe_workbook(stripped_path, sheet_names=[0])
+        assert probe['sheet_names'] == ['Datos']
+        assert probe['sheets']['Datos']['rows'] == 120
+        assert probe['sheets']['Datos']['row_source'] == 'stream'
+        assert len(pd.read_excel(stripped_path)) == 120
+
+    print("✅ ÉXITO: Las dimensiones se obtienen sin cargar las hojas")
+
+def test_projected_loading():
+    """Probar que la carga proyectada lee solo las columnas usadas y relee al pedir una nueva"""
+    print("🧪 PRUEBA DE CARGA PROYECTADA")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = Path(temp_dir) / "ancho.xlsx"
+        data = create_test_data(80)
+        for i in range(20):
+            data[f'Extra {i}'] = [f'valor {i}-{row}' for row in range(80)]
+        data.to_excel(file_path, index=False)
+
+        column_manager = ColumnManager()
+        column_manager.add_column(ColumnConfig(name="Documento", display_name="Documento",
+                                               data_type=DataType.TEXT, source_column="Documento"))
+        column_manager.add_column(ColumnConfig(name="Consecutivo", display_name="Consecutivo",
+                                               data_type=DataType.NUMBER, is_generated=True, is_numeric_generator=True,
+                                               numeric_grouping_columns=["Nombre"]))
+        assert column_manager.get_referenced_source_columns() == ["Documento", "Nombre"]
+
+        settings = AppSettings(default_export_dir=temp_dir, load_cache_dir=str(Path(temp_dir) / "cache"),
+                               projected_load_enabled=True)
+        manager = FileManager(settings)
+        manager.set_source_projection(column_manager.get_referenced_source_columns())
+        info = manager.load_source_file(str(file_path))
+
+        print(f"Columnas: {info['columns_count']} - Cargadas: {len(info['loaded_columns'])} - "
+              f"Memoria: {info['memory_usage']}")
+        assert info['projected'] and info['rows'] == 80
+        assert info['columns'] == data.columns.tolist()
+        assert list(manager.source_df.columns) == ["Documento", "Nombre"]
+        assert len(manager.get_source_preview(10).columns) == len(data.columns)
+
+        # Sin columnas nuevas no se vuelve a leer
+        assert not manager.set_source_projection(["Nombre"])
+
+        # Una columna nueva en la configuración provoca una relectura con las necesarias
+        assert manager.set_source_projection(["Documento", "Extra 3", "Inexistente"])
+        assert list(manager.source_df.columns) == ["Documento", "Extra 3"]
+        assert manager.source_df["Extra 3"].tolist() == data["Extra 3"].tolist()
+
+        # La interfaz relee en segundo plano: primero se piden las columnas y después se relee
+        assert manager.request_source_projection(["Documento"]) is None
+        needed = manager.request_source_projection(["Documento", "Extra 5"])
+        assert needed == ["Documento", "Extra 5"]
+        assert list(manager.source_df.columns) == ["Documento", "Extra 3"]
+
+        cancel_loader = BackgroundLoader()
+
+        def cancelled_reload(loader):
+            loader.cancel()
+            return manager.reload_source_columns(needed, progress_callback=loader.report_progress,
+                                                 cancel_event=loader.cancel_event)
+
+        cancel_loader.start(cancelled_reload)
+        assert cancel_loader.wait(30)
+        assert [kind for kind, _ in cancel_loader.poll()] == ['cancelled']
+        assert list(manager.source_df.columns) == ["Documento", "Extra 3"]
+        assert manager.source_projection == ["Documento", "Extra 3"]
+
+        loader = BackgroundLoader()
+        loader.start(lambda loader: manager.reload_source_columns(needed, progress_callback=loader.report_progress,
+                                                                  cancel_event=loader.cancel_event))
+        assert loader.wait(30)
+        events = loader.poll()
+        assert events[-1][0] == 'done' and events[-1][1]['loaded_columns'] == needed
+        assert [payload[0] for kind, payload in events if kind == 'progress'][-1] == 100
+        assert list(manager.source_df.columns) == needed
+        assert manager.request_source_projection(["Extra 5"]) is None
+
+        # La agrupación se resuelve como en la exportación: 'fecha' corresponde a 'Fecha'
+        grouped = ColumnManager()
+        grouped.add_column(ColumnConfig(name="Consecutivo", display_name="Consecutivo",
+                                        data_type=DataType.NUMBER, is_generated=True, is_numeric_generator=True,
+                                        numeric_grouping_columns=["fecha"]))
+        assert grouped.get_referenced_source_columns(manager.source_all_columns) == ["Fecha"]
+
+        projected = FileManager(settings)
+        projected.load_source_file(str(file_path))
+        assert projected.set_source_projection(grouped.get_referenced_source_columns(projected.source_all_columns))
+        assert list(projected.source_df.columns) == ["Fecha"]
+
+        full = FileManager(AppSettings(load_cache_enabled=False))
+        full.load_source_file(str(file_path))
+        expected = ExportManager(settings).create_preview_data(full.source_df, grouped.get_all_columns())
+        result = ExportManager(settings).create_preview_data(projected.source_df, grouped.get_all_columns())
+        assert result["Consecutivo"].nunique() == 80
+        assert result["Consecutivo"].tolist() == expected["Consecutivo"].tolist()
+
+    print("✅ ÉXITO: Solo se cargan las columnas que usa la configuración")
+
+def test_dtype_optimization():
+    """Probar la optimización de tipos tras la carga y que la exportación da el mismo resultado"""
+    print("🧪 PRUEBA DE OPTIMIZACIÓN DE TIPOS")
+    print("=" * 60)
+
+    data = create_test_data(300)
+    data['Ciudad'] = [['CALI', 'BOGOTA', None][i % 3] for i in range(300)]
+    data['Edad'] = [18 + i % 50 for i in range(300)]
+
+    optimized, report = optimize_dtypes(data)
+    print(f"Memoria: {report['memory_before_mb']} MB -> {report['memory_after_mb']} MB ({report['conversions']})")
+    assert isinstance(optimized['Ciudad'].dtype, pd.CategoricalDtype)
+    assert optimized['Edad'].dtype == 'int8' and optimized['Valor'].dtype == 'float32'
+    assert 'Documento' not in report['conversions'] and 'Fecha' not in report['conversions']
+    assert report['memory_after_mb'] < report['memory_before_mb']
+    assert optimized['Ciudad'].isna().sum() == 100
+
+    # Mapeo, formato y columnas fuente dan lo mismo con los tipos originales y los optimizados
+    base = pd.DataFrame({'Ciudad': ['CALI', 'BOGOTA'], 'Region': ['Pacifico', 'Centro']})
+    registry = MappingRegistry(MappingManager())
+    registry.set_base(base)
+    columns = [
+        ColumnConfig(name="Documento", display_name="Documento", data_type=DataType.TEXT, source_column="Documento"),
+        ColumnConfig(name="Edad", display_name="Edad", data_type=DataType.NUMBER, source_column="Edad"),
+        ColumnConfig(name="Valor", display_name="Valor", data_type=DataType.NUMBER, source_column="Valor"),
+        ColumnConfig(name="Region", display_name="Region", data_type=DataType.TEXT, is_generated=True,
+                     mapping_source="Ciudad", mapping_key_column="Ciudad", mapping_value_column="Region")
+    ]
+    mapping_config = registry.sync(columns)
+
+    expected = ExportManager(AppSettings()).create_preview_data(data, columns, mapping_config=mapping_config)
+    result = ExportManager(AppSettings()).create_preview_data(optimized, columns, mapping_config=mapping_config)
+    assert result.astype(str).equals(expected.astype(str))
+    assert result['Region'].tolist()[:3] == ['Pacifico', 'Centro', 'nan']
+
+    print("✅ ÉXITO: Los tipos optimizados reducen memoria sin cambiar la exportación")
+
+def test_schema_loading():
+    """Probar la validación de los tipos declarados en la configuración al cargar"""
+    print("🧪 PRUEBA DE VALIDACIÓN POR ESQUEMA")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = Path(temp_dir) / "esquema.xlsx"
+        data = create_test_data(50).astype({'Valor': object})
+        data.loc[7, 'Valor'] = 'pendiente'
+        data['Activo'] = ['si' if i % 2 else 'no' for i in range(50)]
+        data.loc[12, 'Activo'] = 'quizas'
+        data['Codigo'] = [float(i) if i % 5 else None for i in range(50)]
+        data.to_excel(file_path, index=False)
+
+        columns = [
+            ColumnConfig(name="Documento", display_name="Documento", data_type=DataType.TEXT, source_column="Documento"),
+            ColumnConfig(name="Valor", display_name="Valor", data_type=DataType.NUMBER, source_column="Valor"),
+            ColumnConfig(name="Fecha", display_name="Fecha", data_type=DataType.DATE, source_column="Fecha"),
+            ColumnConfig(name="Activo", display_name="Activo", data_type=DataType.BOOLEAN, source_column="Activo"),
+            ColumnConfig(name="Copia", display_name="Copia", data_type=DataType.NUMBER, source_column="Documento")
+        ]
+        column_manager = ColumnManager()
+        for column in columns[:4]:
+            column_manager.add_column(column)
+        schema = column_manager.get_source_schema()
+        assert schema == {'Documento': 'text', 'Valor': 'number', 'Fecha': 'date', 'Activo': 'boolean'}
+
+        # Una columna fuente usada con dos tipos distintos queda fuera del esquema
+        column_manager.add_column(columns[4])
+        assert 'Documento' not in column_manager.get_source_schema()
+
+        settings = AppSettings(default_export_dir=temp_dir, load_cache_dir=str(Path(temp_dir) / "cache"))
+        manager = FileManager(settings)
+        manager.set_source_schema(schema)
+        info = manager.load_source_file(str(file_path))
+        report = info['schema_report']
+        print(f"Columnas validadas: {report['columns']} - No conformes: {report['invalid_counts']}")
+        assert report['invalid_counts'] == {'Valor': 1, 'Activo': 1}
+        assert report['invalid_rows'] == {'Valor': [9], 'Activo': [14]}
+
+        # La validación no cambia los valores: el resultado es el de la carga sin esquema
+        columns.append(ColumnConfig(name="Codigo", display_name="Codigo", data_type=DataType.TEXT,
+                                    source_column="Codigo"))
+        inferred = FileManager(AppSettings(load_cache_enabled=False))
+        inferred.load_source_file(str(file_path))
+        pd.testing.assert_frame_equal(manager.source_df, inferred.source_df)
+        exported = [columns[i] for i in (0, 1, 2, 3, 5)]
+        expected = ExportManager(settings).create_preview_data(inferred.source_df, exported)
+        result = ExportManager(settings).create_preview_data(manager.source_df, exported)
+        pd.testing.assert_frame_equal(result, expected)
+
+        # Los tipos declarados después de cargar se validan sin releer la hoja
+        late = FileManager(AppSettings(load_cache_enabled=False))
+        late.load_source_file(str(file_path))
+        loaded = late.source_df
+        assert 'schema_report' not in late.source_load_info
+        late.set_source_schema(schema)
+        assert late.source_df is loaded
+        assert late.get_source_info()['schema_report']['invalid_counts'] == {'Valor': 1, 'Activo': 1}
+
+        # Desde el cache de cargas también se validan las filas
+        info = manager.load_source_file(str(file_path))
+        assert info['cache_hit'] and info['schema_report']['invalid_total'] == 2
+
+        detected = ExcelHelper.detect_data_types(inferred.source_df)
+        assert detected['Valor'] == 'text' and detected['Fecha'] == 'datetime'
+        assert detected['Nombre'] == 'text'
+
+    print("✅ ÉXITO: La carga valida los tipos declarados y señala las filas que no cumplen")
+
+def test_background_loading():
+    """Probar la carga en segundo plano: vista previa, avance y cancelación"""
+    print("🧪 PRUEBA DE CARGA EN SEGUNDO PLANO")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = Path(temp_dir) / "fondo.xlsx"
+        data = create_test_data(300)
+        data.to_excel(file_path, index=False)
+
+        settings = AppSettings(default_export_dir=temp_dir, load_cache_enabled=False, max_preview_rows=25)
+        manager = FileManager(settings)
+
+        def task(loader):
+            loader.publish('preview', manager.read_source_preview(str(file_path)))
+            return manager.load_source_file(str(file_path), progress_callback=loader.report_progress,
+                                            cancel_event=loader.cancel_event)
+
+        loader = BackgroundLoader()
+        loader.start(task)
+        assert loader.wait(30)
+        events = loader.poll()
+        kinds = [kind for kind, _ in events]
+        print(f"Eventos: {kinds}")
+        assert kinds[0] == 'preview' and kinds[-1] == 'done'
+        preview = events[0][1]
+        assert preview['preview_rows'] == 25 and preview['columns'] == data.columns.tolist()
+        progress = [payload[0] for kind, payload in events if kind == 'progress']
+        assert progress == sorted(progress) and progress[-1] == 100
+        assert events[-1][1]['rows'] == 300
+
+        # Una carga cancelada conserva el archivo fuente anterior
+        other_path = Path(temp_dir) / "otro.xlsx"
+        data.head(10).to_excel(other_path, index=False)
+        cancel_loader = BackgroundLoader()
+
+        def cancelled_task(loader):
+            loader.cancel()
+            return manager.load_source_file(str(other_path), progress_callback=loader.report_progress,
+                                            cancel_event=loader.cancel_event)
+
+        cancel_loader.start(cancelled_task)
+        assert cancel_loader.wait(30)
+        assert [kind for kind, _ in cancel_loader.poll()] == ['cancelled']
+        assert manager.source_file == file_path and len(manager.source_df) == 300
+
+    print("✅ ÉXITO: La carga no bloquea, muestra la vista previa y se puede cancelar")
+
+def test_source_snapshot():
+    """Probar el snapshot en disco del archivo fuente y la división en paralelo a partir de él"""
+    print("🧪 PRUEBA DE SNAPSHOT PARA PROCESOS")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = Path(temp_dir) / "snapshot.xlsx"
+        data = create_test_data(250)
+        data.to_excel(file_path, index=False)
+
+        settings = AppSettings(default_export_dir=temp_dir, load_cache_enabled=False,
+                               snapshot_dir=str(Path(temp_dir) / "snapshots"))
+        manager = FileManager(settings)
+        manager.load_source_file(str(file_path))
+        snapshot = manager.snapshot_source()
+        print(f"Snapshot: {Path(snapshot['path']).name} ({snapshot['format']}, {snapshot['rows']} filas)")
+        assert snapshot['rows'] == 250 and Path(snapshot['path']).exists()
+        assert manager.snapshot_source() is snapshot
+
+        part = read_snapshot(snapshot['path'], 100, 150, columns=['Documento', 'Valor'])
+        pd.testing.assert_frame_equal(part, manager.source_df.iloc[100:150][['Documento', 'Valor']])
+
+        # Sin Arrow no se usan procesos: cada uno cargaría el snapshot completo
+        pool = snapshot_module.ProcessPoolExecutor
+        if snapshot['format'] != 'arrow':
+            snapshot_module.ProcessPoolExecutor = None
+        try:
+            names = split_snapshot(snapshot, 100, Path(temp_dir) / "partes", "division", max_workers=2)
+        finally:
+            snapshot_module.ProcessPoolExecutor = pool
+        assert names == ['division_parte_001_de_003.xlsx', 'division_parte_002_de_003.xlsx',
+                         'division_parte_003_de_003.xlsx']
+        parts = [pd.read_excel(Path(temp_dir) / "partes" / name) for name in names]
+        assert [len(df) for df in parts] == [100, 100, 50]
+        assert parts[2]['Documento'].iloc[-1] == int(data['Documento'].iloc[-1])
+
+        # Al cargar otro archivo el snapshot se vuelve a escribir; al limpiar se borra
+        manager.load_source_file(str(file_path))
+        new_snapshot = manager.snapshot_source()
+        assert new_snapshot['path'] != snapshot['path'] and not Path(snapshot['path']).exists()
+        manager.clear_files()
+        assert not Path(new_snapshot['path']).exists()
+
+    print("✅ ÉXITO: Los procesos leen rangos de filas de una sola copia en disco")
+
+def test_arrow_snapshot():
+    """Probar que con pyarrow el snapshot se escribe en Arrow IPC y se lee por rangos"""
+    pytest.importorskip('pyarrow')
+    print("🧪 PRUEBA DE SNAPSHOT EN ARROW")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = Path(temp_dir) / "snapshot.xlsx"
+        create_test_data(250).to_excel(file_path, index=False)
+
+        settings = AppSettings(default_export_dir=temp_dir, load_cache_enabled=False,
+                               snapshot_dir=str(Path(temp_dir) / "snapshots"))
+        manager = FileManager(settings)
+        manager.load_source_file(str(file_path))
+        snapshot = manager.snapshot_source()
+        assert snapshot['format'] == 'arrow'
+
+        part = read_snapshot(snapshot['path'], 100, 150, columns=['Documento', 'Valor'])
+        pd.testing.assert_frame_equal(part, manager.source_df.iloc[100:150][['Documento', 'Valor']])
+
+    print("✅ ÉXITO: El snapshot en Arrow se lee por rangos de filas")
+
+def test_tabular_sources():
+    """Probar CSV y JSON Lines como archivos fuente, completos y por lotes"""
+    print("🧪 PRUEBA DE FUENTES CSV Y JSON LINES")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data = create_test_data(1200)
+        data['Ciudad'] = ['Bogotá' if i % 2 else 'Medellín' for i in range(1200)]
+        sources = {
+            'datos.csv': lambda path: data.to_csv(path, index=False, sep=';', encoding='latin-1'),
+            'datos.jsonl': lambda path: data.to_json(path, orient='records', lines=True, date_format='iso')
+        }
+
+        for name, write in sources.items():
+            file_path = Path(temp_dir) / name
+            write(file_path)
+
+            settings = AppSettings(default_export_dir=temp_dir, load_cache_enabled=False)
+            manager = FileManager(settings)
+            info = manager.load_source_file(str(file_path))
+            print(f"{name}: {info['rows']} filas con '{info['reader_engine']}'")
+            assert info['sheets'] == ['datos'] and info['rows'] == 1200
+            assert info['columns'] == data.columns.tolist()
+            assert manager.source_df['Ciudad'].iloc[1] == 'Bogotá'
+            assert manager.source_df['Valor'].tolist() == data['Valor'].tolist()
+
+            probe = probe_workbook(file_path)['sheets']['datos']
+            assert probe['rows'] == 1200 and probe['column_names'] == data.columns.tolist()
+
+            # Carga proyectada: solo las columnas pedidas
+            projected = FileManager(AppSettings(load_cache_enabled=False, projected_load_enabled=True))
+            projected.set_source_projection(['Valor', 'Documento'])
+            projected.load_source_file(str(file_path))
+            assert list(projected.source_df.columns) == ['Documento', 'Valor']
+
+            # Por encima del umbral el archivo se recorre por lotes con el mismo resultado
+            streaming = FileManager(AppSettings(load_cache_enabled=False, max_file_size_mb=0))
+            info = streaming.load_source_file(str(file_path))
+            assert info['streaming'] and info['rows'] == 1200
+            chunks = list(streaming.iter_source_chunks(500))
+            assert [len(chunk) for chunk in chunks] == [500, 500, 200]
+            pd.testing.assert_frame_equal(pd.concat(chunks), manager.source_df, check_dtype=False,
+                                          check_categorical=False)
+
+    print("✅ ÉXITO: CSV y JSON Lines usan la misma API y el mismo flujo por lotes")
+
+def test_parquet_source():
+    """Probar Parquet como archivo fuente, completo, proyectado y por lotes (requiere pyarrow)"""
+    pytest.importorskip('pyarrow')
+    print("🧪 PRUEBA DE FUENTE PARQUET")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data = create_test_data(1200)
+        file_path = Path(temp_dir) / "datos.parquet"
+        data.to_parquet(file_path, index=False)
+
+        manager = FileManager(AppSettings(default_export_dir=temp_dir, load_cache_enabled=False))
+        info = manager.load_source_file(str(file_path))
+        print(f"{file_path.name}: {info['rows']} filas con '{info['reader_engine']}'")
+        assert info['sheets'] == ['datos'] and info['rows'] == 1200
+        assert info['columns'] == data.columns.tolist()
+        assert manager.source_df['Valor'].tolist() == data['Valor'].tolist()
+        assert probe_workbook(file_path)['sheets']['datos']['rows'] == 1200
+
+        projected = FileManager(AppSettings(load_cache_enabled=False, projected_load_enabled=True))
+        projected.set_source_projection(['Valor', 'Documento'])
+        projected.load_source_file(str(file_path))
+        assert list(projected.source_df.columns) == ['Documento', 'Valor']
+
+        streaming = FileManager(AppSettings(load_cache_enabled=False, max_file_size_mb=0))
+        assert streaming.load_source_file(str(file_path))['streaming']
+        chunks = list(streaming.iter_source_chunks(500))
+        assert [len(chunk) for chunk in chunks] == [500, 500, 200]
+        pd.testing.assert_frame_equal(pd.concat(chunks), manager.source_df, check_dtype=False,
+                                      check_categorical=False)
+
+    print("✅ ÉXITO: Parquet usa la misma API y el mismo flujo por lotes")
+
+def test_streaming_source():
+    """Probar que un archivo por encima del umbral se recorre y exporta por lotes"""
+    print("🧪 PRUEBA DE ARCHIVO FUENTE POR STREAMING")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = Path(temp_dir) / "grande.xlsx"
+        data = create_test_data(12500)
+        data.to_excel(file_path, index=False)
+
+        # Umbral de 0 MB: cualquier .xlsx se procesa por lotes en lugar de rechazarse
+        settings = AppSettings(default_export_dir=temp_dir, load_cache_enabled=False, max_file_size_mb=0)
+        manager = FileManager(settings)
+        info = manager.load_source_file(str(file_path))
+        assert info['streaming'] and info['rows'] == 12500
+        assert len(manager.source_df) == settings.max_preview_rows
+
+        chunks = list(manager.iter_source_chunks(5000))
+        assert [len(chunk) for chunk in chunks] == [5000, 5000, 2500]
+        assert all(chunk.columns.tolist() == data.columns.tolist() for chunk in chunks)
+        assert chunks[2].index[0] == 10000
+        assert chunks[1]['Fecha'].dtype.kind == 'M'
+        pd.testing.assert_frame_equal(pd.concat(chunks), pd.read_excel(file_path))
+
+        # Un error al cargar otra hoja conserva el archivo abierto por lotes
+        try:
+            manager.load_source_file(str(file_path), 'NoExiste')
+            assert False, "Se esperaba un error por la hoja inexistente"
+        except ValueError:
+            pass
+        info = manager.get_source_info()
+        assert info['streaming'] and info['rows'] == 12500
+        assert sum(len(chunk) for chunk in manager.iter_source_chunks(5000)) == 12500
+
+        columns = [
+            ColumnConfig(name="Documento", display_name="Documento", data_type=DataType.TEXT, source_column="Documento"),
+            ColumnConfig(name="Valor", display_name="Valor", data_type=DataType.NUMBER, source_column="Valor")
+        ]
+        result = ExportManager(settings).export_excel_stream(manager.iter_source_chunks(3000), columns,
+                                                            export_config={'output_file': 'streaming.xlsx'},
+                                                            total_rows=info['rows'])
+        print(f"Archivos: {result['all_files']} - Filas: {result['rows_processed']:,}")
+        assert result['rows_processed'] == 12500 and result['files_created'] == 2
+        assert result['all_files'] == ['streaming_parte_001_de_002.xlsx', 'streaming_parte_002_de_002.xlsx']
+
+        exported = [pd.read_excel(Path(temp_dir) / name, dtype=str) for name in result['all_files']]
+        assert [len(part) for part in exported] == [10000, 2500]
+        assert exported[1]['Documento'].iloc[-1] == data['Documento'].iloc[-1]
+
+        # Con filas vacías antes del encabezado los lotes usan los mismos nombres que la vista previa
+        offset_path = Path(temp_dir) / "desplazado.xlsx"
+        data.head(300).to_excel(offset_path, index=False, startrow=2)
+        offset = FileManager(settings)
+        info = offset.load_source_file(str(offset_path))
+        assert info['streaming'] and info['columns'] == data.columns.tolist()
+        assert list(offset.get_source_preview(5).columns) == data.columns.tolist()
+        chunks = list(offset.iter_source_chunks(100))
+        assert [len(chunk) for chunk in chunks] == [100, 100, 100]
+        pd.testing.assert_frame_equal(pd.concat(chunks), pd.read_excel(offset_path, skiprows=2))
+
+    print("✅ ÉXITO: Los archivos grandes se exportan por lotes sin cargarse completos")
+
+def test_sqlite_source():
+    """Probar tablas y consultas de SQLite como fuente, con filtros y proyección en SQL"""
+    print("🧪 PRUEBA DE FUENTE SQLITE")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = Path(temp_dir) / "origen.db"
+        data = create_test_data(1200)
+        data.loc[7, 'Nombre'] = "O'Brien"
+        with sqlite3.connect(db_path) as connection:
+            data.to_sql('ventas', connection, index=False)
+            data.head(10).to_sql('clientes', connection, index=False)
+        connection.close()
+
+        assert list_sheet_names(db_path) == ['clientes', 'ventas']
+        settings = AppSettings(default_export_dir=temp_dir, load_cache_enabled=False)
+        manager = FileManager(settings)
+        info = manager.load_source_file(str(db_path), 'ventas')
+        print(f"Tabla completa: {info['rows']} filas con '{info['reader_engine']}'")
+        assert info['rows'] == 1200 and info['columns'] == data.columns.tolist()
+        assert manager.source_df['Valor'].tolist() == data['Valor'].tolist()
+
+        # Filtros simples como WHERE, con literales escapados
+        filters = [('Valor', '>=', 300), ('Nombre', 'like', 'Persona 3%')]
+        query = build_source_query('ventas', filters)
+        assert query == 'SELECT * FROM "ventas" WHERE "Valor" >= 300 AND "Nombre" LIKE \'Persona 3%\''
+        expected = data[(data['Valor'] >= 300) & data['Nombre'].str.startswith('Persona 3')]
+        info = manager.load_source_query(str(db_path), 'ventas', filters)
+        assert info['rows'] == len(expected) and info['active_sheet'] == query
+        assert manager.source_df['Documento'].tolist() == expected['Documento'].tolist()
+        info = manager.load_source_query(str(db_path), 'ventas', [('Nombre', '=', "O'Brien")])
+        assert info['rows'] == 1 and manager.source_df['Documento'].iloc[0] == '1007'
+
+        # Proyección: solo las columnas pedidas se leen de la consulta
+        projected = FileManager(AppSettings(load_cache_enabled=False, projected_load_enabled=True))
+        projected.set_source_projection(['Valor', 'Documento'])
+        info = projected.load_source_query(str(db_path), 'SELECT * FROM ventas WHERE Valor < 150;')
+        assert list(projected.source_df.columns) == ['Documento', 'Valor'] and info['rows'] == 100
+        assert info['columns'] == data.columns.tolist()
+
+        # Por encima del umbral la consulta se recorre por lotes con fetchmany
+        streaming = FileManager(AppSettings(load_cache_enabled=False, max_file_size_mb=0))
+        info = streaming.load_source_file(str(db_path), 'ventas')
+        assert info['streaming'] and info['rows'] == 1200
+        chunks = list(streaming.iter_source_chunks(500))
+        assert [len(chunk) for chunk in chunks] == [500, 500, 200]
+        assert chunks[2].index[0] == 1000
+        manager.load_source_file(str(db_path), 'ventas')
+        pd.testing.assert_frame_equal(pd.concat(chunks), manager.source_df, check_dtype=False,
+                                      check_categorical=False)
+
+    print("✅ ÉXITO: Las fuentes SQLite se leen por lotes con filtros y columnas resueltos en SQL")
+
+def test_multi_file_source():
+    """Probar varios archivos y hojas con los mismos encabezados como una sola fuente por lotes"""
+    print("🧪 PRUEBA DE FUENTE DE VARIOS ARCHIVOS")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        regions = {}
+        for i, region in enumerate(['norte', 'sur', 'centro']):
+            data = create_test_data(700 + i * 100)
+            data['Documento'] = [f'{region}-{j}' for j in range(len(data))]
+            regions[f'region_{region}.xlsx'] = data
+            with pd.ExcelWriter(Path(temp_dir) / f'region_{region}.xlsx') as writer:
+                data.to_excel(writer, sheet_name='Datos', index=False)
+                data.head(5).to_excel(writer, sheet_name='Resumen', index=False)
+
+        settings = AppSettings(default_export_dir=temp_dir, load_cache_enabled=False)
+        manager = FileManager(settings)
+        info = manager.load_source_files(str(Path(temp_dir) / 'region_*.xlsx'))
+        print(f"{info['file_name']}: {info['rows']} filas en {len(manager.source_parts)} partes")
+        names = sorted(regions)
+        assert info['streaming'] and info['rows'] == 2400 and info['file_name'] == '3 archivos'
+        assert info['columns'] == ['Archivo', 'Documento', 'Nombre', 'Valor', 'Fecha']
+        assert len(manager.source_df) == settings.max_preview_rows
+
+        # Los lotes cruzan el límite entre archivos sin concatenar los archivos completos
+        chunks = list(manager.iter_source_chunks(1000))
+        assert [len(chunk) for chunk in chunks] == [1000, 1000, 400]
+        assert chunks[1].index[0] == 1000 and chunks[0]['Archivo'].unique().tolist() == names[:2]
+        expected = pd.concat([regions[name].assign(Archivo=name) for name in names], ignore_index=True)
+        pd.testing.assert_frame_equal(pd.concat(chunks), expected[info['columns']], check_dtype=False)
+
+        # Varias hojas por archivo, con la hoja de cada fila y sin la columna de archivo
+        info = manager.load_source_files([Path(temp_dir) / name for name in names], ['Datos', 'Resumen'],
+                                         file_column=None, sheet_column='Hoja')
+        assert info['rows'] == 2415 and info['columns'][0] == 'Hoja'
+        assert sum(len(chunk) for chunk in manager.iter_source_chunks(500)) == 2415
+
+        # Los encabezados distintos se rechazan y se conserva la fuente anterior
+        pd.DataFrame({'Documento': ['x'], 'Otro': [1]}).to_excel(Path(temp_dir) / 'region_zz.xlsx', index=False)
+        try:
+            manager.load_source_files(str(Path(temp_dir) / 'region_*.xlsx'))
+            assert False, "Se esperaba ValidationError"
+        except ValidationError as e:
+            print(f"Rechazado: {e.errors}")
+            assert e.errors == ["region_zz.xlsx [Sheet1]: faltan ['Nombre', 'Valor', 'Fecha'], sobran ['Otro']"]
+        assert manager.get_source_info()['rows'] == 2415
+
+        # La exportación por lotes recibe la fuente combinada como cualquier archivo grande
+        manager.load_source_files([Path(temp_dir) / name for name in names])
+        columns = [
+            ColumnConfig(name="Archivo", display_name="Archivo", data_type=DataType.TEXT, source_column="Archivo"),
+            ColumnConfig(name="Documento", display_name="Documento", data_type=DataType.TEXT, source_column="Documento")
+        ]
+        result = ExportManager(settings).export_excel_stream(manager.iter_source_chunks(), columns,
+                                                            export_config={'output_file': 'regiones.xlsx'},
+                                                            total_rows=2400)
+        exported = pd.read_excel(Path(temp_dir) / result['all_files'][0], dtype=str)
+        assert len(exported) == 2400 and exported['Archivo'].iloc[-1] == names[-1]
+
+    print("✅ ÉXITO: Los archivos combinados se recorren por lotes como un único conjunto")
+
+if __name__ == "__main__":
+    test_reader_engines()
+    test_xml_reader_engine()
+    test_load_cache()
+    test_multi_sheet_loading()
+    test_workbook_probe()
+    test_projected_loading()
+    test_dtype_optimization()
+    test_schema_loading()
+    test_background_loading()
+    test_source_snapshot()
+    test_tabular_sources()
+    test_sqlite_source()
+    test_multi_file_source()
+    test_streaming_source()
+    test_parquet_source()
+    test_arrow_snapshot()
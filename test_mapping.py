@@ -0,0 +1,553 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de prueba para el gestor de mapeo
+Verifica los distintos modos de mapeo desde el archivo base
+"""
+
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Agregar el directorio raíz al path para imports
+root_dir = Path(__file__).parent
+sys.path.insert(0, str(root_dir))
+
+from core.file_manager import FileManager
+from core.mapping_manager import MappingManager
+from core.disk_cache import DiskCache
+from core.mapping_index import MappingIndex
+from core.export_manager import ExportManager
+from core.mapping_registry import MappingRegistry, mapping_config_key
+from config.settings import AppSettings
+from models.column_config import ColumnConfig, DataType
+from utils.exceptions import MappingError
+
+def create_base_data():
+    """Crear catálogo base de prueba"""
+    return pd.DataFrame({
+        'Ciudad': ['BOGOTA', 'BOGOTA', 'CALI', 'CALI_SUR'],
+        'Sede': [1, 2, 1, 1],
+        'Codigo': ['B1', 'B2', 'C1', 'CS1'],
+        'Region': ['Centro', 'Centro', 'Pacifico', 'Pacifico']
+    })
+
+def create_source_data():
+    """Crear datos fuente de prueba"""
+    return pd.DataFrame({
+        'Ciudad': ['CALI', 'BOGOTA', ' BOGOTA ', 'MEDELLIN', 'CALI'],
+        'Sede': [1, 2, 1, 1, 2]
+    })
+
+def test_join_mapping():
+    """Probar el mapeo por join sobre claves tipadas"""
+    print("🧪 PRUEBA DE MAPEO POR JOIN")
+    print("=" * 60)
+
+    manager = MappingManager()
+    base = create_base_data()
+    source = create_source_data()
+
+    assert manager.create_join_mapping(base, ['Ciudad', 'Sede'], ['Codigo', 'Region'], 'sedes')
+
+    result = manager.apply_join_mapping(source, ['Ciudad', 'Sede'], 'sedes', default_value='N/A')
+    print(result)
+
+    assert list(result.columns) == ['Codigo', 'Region']
+    assert list(result.index) == list(source.index)
+    assert result['Codigo'].tolist() == ['C1', 'B2', 'B1', 'N/A', 'N/A']
+    assert result['Region'].tolist() == ['Pacifico', 'Centro', 'Centro', 'N/A', 'N/A']
+
+    # Las claves que contienen el separador ya no colisionan
+    collision_base = pd.DataFrame({'A': ['x_y', 'x'], 'B': ['z', 'y_z'], 'V': [1, 2]})
+    collision_source = pd.DataFrame({'A': ['x', 'x_y'], 'B': ['y_z', 'z']})
+    assert manager.create_join_mapping(collision_base, ['A', 'B'], ['V'], 'colision')
+    values = manager.apply_join_mapping(collision_source, ['A', 'B'], 'colision')['V'].tolist()
+    assert values == [2, 1]
+
+    # Códigos numéricos en la base contra códigos de texto en la fuente (y al revés)
+    numeric_base = pd.DataFrame({'K': [1.0, 2.0, 2.5], 'V': ['uno', 'dos', 'dos y medio']})
+    assert manager.create_join_mapping(numeric_base, ['K'], ['V'], 'numerico')
+    text_source = pd.DataFrame({'K': ['1', ' 2 ', '2.50', 'X', None]})
+    result = manager.apply_join_mapping(text_source, ['K'], 'numerico', default_value='N/A')
+    assert result['V'].tolist() == ['uno', 'dos', 'dos y medio', 'N/A', 'N/A']
+
+    text_base = pd.DataFrame({'K': ['1', '2'], 'V': ['uno', 'dos']})
+    assert manager.create_join_mapping(text_base, ['K'], ['V'], 'texto')
+    result = manager.apply_join_mapping(pd.DataFrame({'K': [2, 1]}), ['K'], 'texto')
+    assert result['V'].tolist() == ['dos', 'uno']
+
+    # Claves de la base que coinciden tras normalizarse: se informa el error
+    duplicated_base = pd.DataFrame({'K': ['1', '1.0'], 'V': ['a', 'b']})
+    assert manager.create_join_mapping(duplicated_base, ['K'], ['V'], 'duplicado')
+    try:
+        manager.apply_join_mapping(pd.DataFrame({'K': [1.0]}), ['K'], 'duplicado')
+        assert False, "Se esperaba un error por claves duplicadas"
+    except MappingError:
+        pass
+
+    print("✅ ÉXITO: El mapeo por join devuelve todas las columnas valor")
+
+def test_mapping_cache():
+    """Probar que el índice de mapeo se reutiliza desde el cache en disco"""
+    print("🧪 PRUEBA DE CACHE DE MAPEOS")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base_file = Path(temp_dir) / "base.xlsx"
+        base = create_base_data()
+        base.to_excel(base_file, index=False)
+
+        cache = DiskCache(str(Path(temp_dir) / "cache"), max_size_mb=10)
+        manager = MappingManager(cache=cache)
+        manager.set_base_dataframe(base, str(base_file))
+
+        first = manager.get_mapping_dict('Codigo', 'Region')
+        assert cache.misses == 1 and cache.hits == 0
+        assert first == {'B1': 'Centro', 'B2': 'Centro', 'C1': 'Pacifico', 'CS1': 'Pacifico'}
+
+        # Un segundo gestor (reapertura del proyecto) no necesita el DataFrame base
+        reopened = MappingManager(cache=cache)
+        second = reopened.get_mapping_dict('Codigo', 'Region', base_file=str(base_file))
+        assert second == first
+        assert cache.hits == 1
+
+        # Las claves duplicadas conservan el valor de la última aparición
+        last_wins = manager.get_mapping_dict('Ciudad', 'Codigo')
+        assert last_wins['BOGOTA'] == 'B2'
+
+        # Con un límite de tamaño mínimo las entradas se desalojan
+        cache.max_size_bytes = 0
+        cache.evict()
+        assert cache.get_statistics()['entries'] == 0
+
+    print("✅ ÉXITO: El índice de mapeo se reutiliza y se desaloja por tamaño")
+
+def test_compact_mapping():
+    """Probar que el índice compacto conserva la semántica del diccionario"""
+    print("🧪 PRUEBA DE MAPEO COMPACTO")
+    print("=" * 60)
+
+    manager = MappingManager()
+    base = pd.DataFrame({
+        'Codigo': [f'P{i:05d}' for i in range(5000)] + ['P00001'],
+        'Precio': [float(i % 50) for i in range(5000)] + [np.nan]
+    })
+    manager.set_base_dataframe(base)
+
+    assert manager.create_mapping(base, 'Codigo', 'Precio', 'dict')
+    assert manager.create_compact_mapping('Codigo', 'Precio', 'compacto')
+
+    source = pd.DataFrame({'Codigo': ['P00010', ' P04999 ', 'X', 'P00001']})
+    expected = manager.apply_mapping(source, 'Codigo', 'dict', default_value='N/A')
+    result = manager.apply_mapping(source, 'Codigo', 'compacto', default_value='N/A')
+
+    assert result[:3] == expected[:3] == [10.0, 49.0, 'N/A']
+    assert pd.isna(result[3]) and pd.isna(expected[3])
+
+    index = manager.get_mapping_info('compacto')['index']
+    assert len(index) == 5000
+    assert index.get('P00002') == 2.0 and index.get('nada', 'x') == 'x'
+    assert 'P00003' in index and 'P99999' not in index
+    assert manager.get_mapping_statistics('compacto')['null_values'] == 1
+
+    empty = MappingIndex.from_dict({})
+    assert empty.get('a') is None
+
+    print(f"Memoria del índice compacto: {index.nbytes / 1024:.1f} KB")
+    print("✅ ÉXITO: El índice compacto resuelve las mismas claves")
+
+def test_fuzzy_mapping():
+    """Probar la búsqueda aproximada por trigramas para claves sin coincidencia exacta"""
+    print("🧪 PRUEBA DE MAPEO APROXIMADO")
+    print("=" * 60)
+
+    manager = MappingManager()
+    base = pd.DataFrame({
+        'Ciudad': ['BOGOTÁ', 'MEDELLIN', 'CARTAGENA', 'CALI'],
+        'Departamento': ['Cundinamarca', 'Antioquia', 'Bolívar', 'Valle']
+    })
+    manager.set_base_dataframe(base)
+    source = pd.DataFrame({'Ciudad': ['MEDELIN', 'Bogota', 'CALI', 'ZZZ', 'MEDELIN']})
+
+    assert manager.create_mapping(base, 'Ciudad', 'Departamento', 'ciudades')
+    assert manager.apply_mapping(source, 'Ciudad', 'ciudades') == [None, None, 'Valle', None, None]
+
+    assert manager.enable_fuzzy_matching('ciudades', threshold=0.6)
+    result = manager.apply_mapping(source, 'Ciudad', 'ciudades', default_value='?')
+    print(result)
+    assert result == ['Antioquia', 'Cundinamarca', 'Valle', '?', 'Antioquia']
+
+    # También disponible sobre el índice compacto
+    assert manager.create_compact_mapping('Ciudad', 'Departamento', 'compacto')
+    assert manager.enable_fuzzy_matching('compacto')
+    assert manager.apply_mapping(source, 'Ciudad', 'compacto', default_value='?') == result
+
+    print("✅ ÉXITO: Las claves mal escritas se resuelven con el índice de trigramas")
+
+def test_mapping_statistics():
+    """Probar el registro de aciertos/fallos al aplicar mapeos y el reporte exportado"""
+    print("🧪 PRUEBA DE ESTADÍSTICAS DE MAPEO")
+    print("=" * 60)
+
+    manager = MappingManager()
+    base = create_base_data()
+    source = pd.DataFrame({'Codigo': ['B1', 'X9', 'C1', 'X9', 'b2', 'Z']})
+
+    assert manager.create_mapping(base, 'Codigo', 'Region', 'regiones')
+    manager.apply_mapping(source, 'Codigo', 'regiones')
+    stats = manager.get_apply_statistics('regiones')
+    assert (stats['hits'], stats['fuzzy_hits'], stats['misses']) == (2, 0, 4)
+    assert stats['missed_keys'] == {'X9': 2, 'b2': 1, 'Z': 1}
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        export_manager = ExportManager(AppSettings(default_export_dir=temp_dir))
+        columns = [ColumnConfig(
+            name='region', display_name='Región', data_type=DataType.TEXT, is_generated=True,
+            mapping_source='Codigo', mapping_key_column='Codigo', mapping_value_column='Region'
+        )]
+        mapping_config = {'Codigo': manager.get_mapping_dict('Codigo', 'Region', base_df=base)}
+
+        preview = export_manager.create_preview_data(source, columns, mapping_config=mapping_config)
+        assert preview['Región'].tolist() == ['Centro', 'X9', 'Pacifico', 'X9', 'Centro', 'Z']
+
+        result = export_manager.export_excel(
+            source_data=source, column_configs=columns, mapping_config=mapping_config,
+            export_config={'output_file': 'estadisticas.xlsx', 'include_mapping_report': True}
+        )
+        column_stats = result['mapping_stats']['Región']
+        print(column_stats)
+        assert (column_stats['hits'], column_stats['casefold_hits'], column_stats['misses']) == (2, 1, 3)
+        assert 'fuzzy_hits' not in column_stats
+        assert column_stats['missed_keys'] == {'X9': 2, 'Z': 1}
+
+        sheets = pd.read_excel(Path(temp_dir) / 'estadisticas.xlsx', sheet_name=None)
+        assert 'Reporte Mapeo' in sheets
+        summary, _ = export_manager.build_mapping_report()
+        assert summary['Sin distinguir mayúsculas'].tolist() == [1]
+        assert sheets['Datos']['Región'].tolist() == ['Centro', 'X9', 'Pacifico', 'X9', 'Centro', 'Z']
+
+        assert export_manager.export_mapping_report('reporte.xlsx')
+        assert (Path(temp_dir) / 'reporte.xlsx').exists()
+
+    print("✅ ÉXITO: Los aciertos y fallos de mapeo se registran y exportan")
+
+def test_mapping_registry():
+    """Probar que el registro comparte índices y distingue columnas valor de una misma clave"""
+    print("🧪 PRUEBA DE REGISTRO DE MAPEOS")
+    print("=" * 60)
+
+    base = create_base_data()
+    registry = MappingRegistry(MappingManager())
+    registry.set_base(base)
+
+    columns = [
+        ColumnConfig(name='codigo', display_name='Código', data_type=DataType.TEXT, is_generated=True,
+                     mapping_source='Ciudad', mapping_key_column='Ciudad', mapping_value_column='Codigo'),
+        ColumnConfig(name='region', display_name='Región', data_type=DataType.TEXT, is_generated=True,
+                     mapping_source='Ciudad', mapping_key_column='Ciudad', mapping_value_column='Region')
+    ]
+
+    mapping_config = registry.sync(columns)
+    assert set(mapping_config) == {('Ciudad', 'Codigo'), ('Ciudad', 'Region')}
+    assert registry.builds == 2
+
+    # Una nueva sincronización (vista previa -> exportación) reutiliza los índices
+    registry.sync(columns)
+    assert registry.builds == 2 and registry.reuses == 2
+
+    export_manager = ExportManager(AppSettings())
+    source = pd.DataFrame({'Ciudad': ['CALI', 'BOGOTA', 'PASTO']})
+    preview = export_manager.create_preview_data(source, columns, mapping_config=mapping_config)
+    assert preview['Código'].tolist() == ['C1', 'B2', 'PASTO']
+    assert preview['Región'].tolist() == ['Pacifico', 'Centro', 'PASTO']
+
+    # Las configuraciones antiguas indexadas por la columna clave siguen funcionando
+    legacy = {'Ciudad': mapping_config[mapping_config_key('Ciudad', 'Region')]}
+    assert export_manager.create_preview_data(source, columns[1:], mapping_config=legacy)['Región'].tolist() == ['Pacifico', 'Centro', 'PASTO']
+
+    # Al quitar una columna solo se libera su índice
+    registry.sync(columns[1:])
+    assert registry.get_statistics()['entries'] == 1
+
+    # Un archivo base distinto invalida los índices anteriores
+    registry.set_base(base.assign(Region='Otra'))
+    assert registry.get_statistics()['entries'] == 0
+    assert registry.sync(columns)[('Ciudad', 'Region')]['CALI'] == 'Otra'
+
+    print("✅ ÉXITO: Cada mapeo se construye una vez y no se sobrescriben columnas valor")
+
+def test_multi_output_mapping():
+    """Probar que varias columnas con la misma clave se resuelven con una sola búsqueda"""
+    print("🧪 PRUEBA DE MAPEO CON VARIAS SALIDAS")
+    print("=" * 60)
+
+    base = create_base_data()
+    registry = MappingRegistry(MappingManager())
+    registry.set_base(base)
+
+    columns = [
+        ColumnConfig(name=value_column.lower(), display_name=value_column, data_type=DataType.TEXT, is_generated=True,
+                     mapping_source='Codigo', mapping_key_column='Codigo', mapping_value_column=value_column)
+        for value_column in ('Ciudad', 'Sede', 'Region')
+    ]
+    mapping_config = registry.sync(columns)
+
+    export_manager = ExportManager(AppSettings())
+    source = pd.DataFrame({'Codigo': ['C1', 'b2', 'X', 'CS1']})
+    preview = export_manager.create_preview_data(source, columns, mapping_config=mapping_config)
+
+    assert preview['Ciudad'].tolist() == ['CALI', 'BOGOTA', 'X', 'CALI_SUR']
+    assert preview['Sede'].tolist() == ['1', '2', 'X', '1']
+    assert preview['Region'].tolist() == ['Pacifico', 'Centro', 'X', 'Pacifico']
+
+    # Las tres columnas comparten el mismo índice de claves
+    key_indexes = {id(table[0]) for table in export_manager._lookup_tables.values()}
+    assert len(key_indexes) == 1
+    assert all(stats['misses'] == 1 and stats['casefold_hits'] == 1 for stats in export_manager.mapping_stats.values())
+    assert len(export_manager._key_tables) == 1
+
+    # Un mapeo con la misma columna clave pero otras claves no reutiliza el índice
+    mapping_config[mapping_config_key('Codigo', 'Region')] = {'C1': 'Norte'}
+    preview = export_manager.create_preview_data(source, columns, mapping_config=mapping_config)
+    assert preview['Region'].tolist() == ['Norte', 'b2', 'X', 'CS1']
+    assert preview['Ciudad'].tolist() == ['CALI', 'BOGOTA', 'X', 'CALI_SUR']
+    assert len(export_manager._key_tables) == 2
+
+    print("✅ ÉXITO: Las columnas valor se obtienen de una única búsqueda de claves")
+
+def test_range_mapping():
+    """Probar el mapeo por tramos con búsqueda binaria"""
+    print("🧪 PRUEBA DE MAPEO POR RANGOS")
+    print("=" * 60)
+
+    manager = MappingManager()
+    tarifas = pd.DataFrame({
+        'Desde': [10, 0, 1, 5],
+        'Hasta': [None, 1, 5, 10],
+        'Tarifa': ['D', 'A', 'B', 'C']
+    })
+    source = pd.DataFrame({'Peso': [-1, 0, 0.5, 4.99, 5, 100, None, 'x']})
+
+    assert manager.create_range_mapping(tarifas, 'Desde', 'Tarifa', 'tarifas', upper_column='Hasta')
+    result = manager.apply_mapping(source, 'Peso', 'tarifas', default_value='N/A')
+    print(result)
+    assert result == ['N/A', 'A', 'A', 'B', 'C', 'D', 'N/A', 'N/A']
+
+    stats = manager.get_apply_statistics('tarifas')
+    assert (stats['hits'], stats['misses']) == (5, 3)
+
+    # Sin límite superior el último tramo queda abierto; también con fechas
+    periodos = pd.DataFrame({'Inicio': pd.to_datetime(['2024-01-01', '2024-07-01']), 'Semestre': ['S1', 'S2']})
+    assert manager.create_range_mapping(periodos, 'Inicio', 'Semestre', 'semestres')
+    fechas = pd.DataFrame({'Fecha': ['2023-12-31', '2024-03-03', '2024-07-01', '2030-01-01']})
+    assert manager.apply_range_mapping(fechas, 'Fecha', 'semestres') == [None, 'S1', 'S2', 'S2']
+
+    assert manager.validate_mapping('tarifas') == []
+
+    print("✅ ÉXITO: Los valores se asignan a su tramo sin comparaciones fila a fila")
+
+def test_incremental_base_update():
+    """Probar que una recarga del archivo base solo aplica las filas cambiadas"""
+    print("🧪 PRUEBA DE ACTUALIZACIÓN INCREMENTAL")
+    print("=" * 60)
+
+    manager = MappingManager()
+    registry = MappingRegistry(manager)
+    base = pd.DataFrame({
+        'Codigo': [f'P{i:04d}' for i in range(1000)] + ['P0001'],
+        'Precio': list(range(1000)) + [999]
+    })
+    manager.set_base_dataframe(base)
+    registry.set_base(base)
+    assert manager.create_mapping(base, 'Codigo', 'Precio', 'precios')
+    registered = registry.get('Codigo', 'Precio')
+
+    # Nueva versión: un precio cambia, un producto se elimina, otro se agrega y se borra el duplicado
+    new_base = base.iloc[:-1].copy()
+    new_base.loc[5, 'Precio'] = -5
+    new_base = new_base.drop(index=7)
+    new_base = pd.concat([new_base, pd.DataFrame({'Codigo': ['P9999'], 'Precio': [1]})], ignore_index=True)
+
+    manager.set_base_dataframe(new_base)
+    registry.set_base(new_base)
+
+    delta = manager.get_base_delta()
+    print(delta)
+    assert (delta['inserted_rows'], delta['deleted_rows']) == (2, 3)
+    assert delta['mappings']['precios'] == {'inserted': 1, 'updated': 2, 'deleted': 1}
+
+    # El resultado coincide con una reconstrucción completa
+    expected = manager.get_mapping_dict('Codigo', 'Precio', base_df=new_base)
+    assert manager.get_mapping_info('precios')['mapping'] == expected
+    assert registry.get('Codigo', 'Precio') is registered and registered == expected
+    assert registry.builds == 1
+
+    print("✅ ÉXITO: Los mapeos se actualizan solo con las claves insertadas, modificadas o eliminadas")
+
+def test_mapping_from_file():
+    """Probar la construcción del mapeo leyendo por streaming solo dos columnas del archivo base"""
+    print("🧪 PRUEBA DE MAPEO DESDE ARCHIVO")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base_file = Path(temp_dir) / "catalogo.xlsx"
+        base = pd.DataFrame({
+            'Codigo': [1, 2, None, 4, 2, 'A-7'],
+            'Nombre': ['Uno', 'Dos', 'Sin código', None, 'Dos bis', 'Siete'],
+            'Descripcion': ['x' * 50] * 6
+        })
+        base.to_excel(base_file, index=False)
+
+        cache = DiskCache(str(Path(temp_dir) / "cache"), max_size_mb=10)
+        manager = MappingManager(cache=cache)
+
+        assert manager.create_mapping_from_file(str(base_file), 'Codigo', 'Nombre', 'streaming', compact=False)
+        expected = manager.get_mapping_dict('Codigo', 'Nombre', base_df=pd.read_excel(base_file))
+        streamed = manager.get_mapping_info('streaming')['mapping']
+        print(streamed)
+        assert list(streamed) == list(expected)
+        assert all(streamed[k] == expected[k] or (pd.isna(streamed[k]) and pd.isna(expected[k])) for k in expected)
+
+        # El índice compacto se obtiene del cache sin volver a leer el archivo
+        assert manager.create_mapping_from_file(str(base_file), 'Codigo', 'Nombre', 'compacto')
+        assert cache.hits == 1
+        assert manager.get_mapping_info('compacto')['index'].get('2') == 'Dos bis'
+
+        assert not manager.create_mapping_from_file(str(base_file), 'Codigo', 'Precio', 'invalido')
+
+    print("✅ ÉXITO: El mapeo se construye leyendo solo las columnas clave y valor")
+
+def test_key_policies():
+    """Probar las políticas de normalización de claves (1 vs 1.0 vs '001', fechas)"""
+    print("🧪 PRUEBA DE POLÍTICAS DE CLAVE")
+    print("=" * 60)
+
+    manager = MappingManager()
+    base = pd.DataFrame({
+        'Codigo': [1.0, 2.0, 30.0, np.nan],
+        'Fecha': pd.to_datetime(['2024-01-02', '2024-02-03', '2024-03-04', '2024-04-05']),
+        'Nombre': ['Uno', 'Dos', 'Treinta', 'Sin código']
+    })
+    source = pd.DataFrame({
+        'Codigo': ['001', 2, ' 30 ', 'X'],
+        'Fecha': ['02/01/2024', '2024-02-03', '2024-03-04 00:00:00', 'nunca']
+    })
+
+    assert manager.create_mapping(base, 'Codigo', 'Nombre', 'texto')
+    assert manager.apply_mapping(source, 'Codigo', 'texto') == [None, None, None, None]
+
+    assert manager.create_mapping(base, 'Codigo', 'Nombre', 'entero', key_policy='integer')
+    assert manager.apply_mapping(source, 'Codigo', 'entero') == ['Uno', 'Dos', 'Treinta', None]
+
+    assert manager.create_compact_mapping('Codigo', 'Nombre', 'codigos', base_df=base, key_policy='zero_padded:3')
+    assert manager.get_mapping_info('codigos')['index'].get('030') == 'Treinta'
+    assert manager.apply_mapping(source, 'Codigo', 'codigos') == ['Uno', 'Dos', 'Treinta', None]
+
+    assert manager.create_mapping(base, 'Fecha', 'Nombre', 'fechas', key_policy='date')
+    assert manager.apply_mapping(source, 'Fecha', 'fechas', default_value='?') == ['Uno', 'Dos', 'Treinta', '?']
+
+    # En la exportación ambos lados se normalizan con la política de la columna
+    registry = MappingRegistry(manager)
+    registry.set_base(base)
+    columns = [ColumnConfig(
+        name='nombre', display_name='Nombre', data_type=DataType.TEXT, is_generated=True,
+        mapping_source='Codigo', mapping_key_column='Codigo', mapping_value_column='Nombre',
+        mapping_key_policy='integer'
+    )]
+    mapping_config = registry.sync(columns)
+    assert list(mapping_config) == [('Codigo', 'Nombre', 'integer')]
+
+    preview = ExportManager(AppSettings()).create_preview_data(source, columns, mapping_config=mapping_config)
+    assert preview['Nombre'].tolist() == ['Uno', 'Dos', 'Treinta', 'X']
+    assert ColumnConfig.from_dict(columns[0].to_dict()).mapping_key_policy == 'integer'
+
+    print("✅ ÉXITO: Las claves numéricas, con ceros y de fecha coinciden sin ajustes manuales")
+
+def test_incremental_optimized_base():
+    """Probar el cambio de una celda en un archivo base cargado con optimización de tipos"""
+    print("🧪 PRUEBA DE ACTUALIZACIÓN INCREMENTAL CON TIPOS OPTIMIZADOS")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = Path(temp_dir) / "catalogo.xlsx"
+        base = pd.DataFrame({
+            'Codigo': [f'P{i:04d}' for i in range(2000)],
+            'Grupo': [f'G{i % 4}' for i in range(2000)],
+            'Precio': [i * 0.5 for i in range(2000)]
+        })
+        base.to_excel(file_path, index=False)
+
+        file_manager = FileManager(AppSettings(load_cache_enabled=False))
+        manager = MappingManager()
+        file_manager.load_base_file(str(file_path))
+        assert file_manager.base_df['Precio'].dtype == np.float32
+        manager.set_base_dataframe(file_manager.base_df)
+
+        # 0.1 no cabe en float32: la columna completa vuelve a cargarse como float64
+        base.loc[10, 'Precio'] = 0.1
+        base.to_excel(file_path, index=False)
+        file_manager.load_base_file(str(file_path))
+        assert file_manager.base_df['Precio'].dtype == np.float64
+        manager.set_base_dataframe(file_manager.base_df)
+
+        delta = manager.get_base_delta()
+        print(f"Insertadas: {delta['inserted_rows']} - Eliminadas: {delta['deleted_rows']}")
+        assert (delta['inserted_rows'], delta['deleted_rows'], delta['unchanged_rows']) == (1, 1, 1999)
+
+    print("✅ ÉXITO: El cambio de tipo de una columna no cuenta como cambio de todas sus filas")
+
+def test_lookup_tables_across_parts():
+    """Probar que una exportación en varias partes construye los índices de búsqueda una sola vez"""
+    print("🧪 PRUEBA DE ÍNDICES DE BÚSQUEDA ENTRE PARTES")
+    print("=" * 60)
+
+    class CountingTables(dict):
+        """Diccionario que cuenta las tablas construidas"""
+        builds = 0
+
+        def __setitem__(self, key, value):
+            self.builds += 1
+            super().__setitem__(key, value)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        registry = MappingRegistry(MappingManager())
+        registry.set_base(create_base_data())
+        columns = [
+            ColumnConfig(name=value_column.lower(), display_name=value_column, data_type=DataType.TEXT, is_generated=True,
+                         mapping_source='Codigo', mapping_key_column='Codigo', mapping_value_column=value_column)
+            for value_column in ('Ciudad', 'Region')
+        ]
+        mapping_config = registry.sync(columns)
+
+        export_manager = ExportManager(AppSettings(default_export_dir=temp_dir))
+        export_manager._lookup_tables = CountingTables()
+        export_manager._value_matrices = CountingTables()
+        source = pd.DataFrame({'Codigo': ['B1', 'C1', 'CS1', 'X'] * 6250})
+        chunks = (source.iloc[start:start + 5000] for start in range(0, len(source), 5000))
+        result = export_manager.export_excel_stream(chunks, columns, mapping_config=mapping_config,
+                                                    export_config={'output_file': 'partes.xlsx'})
+        print(f"Partes: {result['files_created']} - Tablas construidas: {export_manager._lookup_tables.builds}")
+        assert result['files_created'] == 3
+        assert export_manager._lookup_tables.builds == 2
+        # Las dos columnas valor comparten claves: una sola matriz de valores para el grupo
+        assert export_manager._value_matrices.builds == 1
+
+    print("✅ ÉXITO: Los índices de búsqueda se conservan durante toda la exportación")
+
+if __name__ == "__main__":
+    test_join_mapping()
+    test_mapping_cache()
+    test_compact_mapping()
+    test_fuzzy_mapping()
+    test_mapping_statistics()
+    test_mapping_registry()
+    test_multi_output_mapping()
+    test_lookup_tables_across_parts()
+    test_range_mapping()
+    test_incremental_base_update()
+    test_incremental_optimized_base()
+    test_mapping_from_file()
+    test_key_policies()
@@ -3,7 +3,7 @@ from tkinter import ttk, messagebox
 from typing import List, Optional
 
 from models.column_config import ColumnConfig, DataType
-from config.constants import DATA_TYPE_COLORS
+from config.constants import DATA_TYPE_COLORS, KEY_POLICIES
 
 class ColumnConfigDialog:
     """Diálogo para configurar una columna del archivo destino."""
@@ -69,6 +69,7 @@ class ColumnConfigDialog:
         self.mapping_source_var = tk.StringVar()  # CORREGIDO: era mapping_source_column_var
         self.mapping_key_column_var = tk.StringVar()
         self.mapping_value_column_var = tk.StringVar()
+        self.mapping_key_policy_var = tk.StringVar(value="text")
     
     def _create_widgets(self):
         """Crear widgets del diálogo."""
@@ -317,6 +318,20 @@ class ColumnConfigDialog:
                                        state='readonly', width=47)
         self.value_combo.pack(fill='x', pady=2)
         
+        # Normalización de claves (ambos lados se comparan con la misma política)
+        policy_row = ttk.Frame(self.mapping_options_frame)
+        policy_row.pack(fill='x', pady=2)
+        ttk.Label(policy_row, text="Comparar claves como:").pack(anchor='w')
+        self.key_policy_combo = ttk.Combobox(policy_row,
+                                             textvariable=self.mapping_key_policy_var,
+                                             values=list(KEY_POLICIES),
+                                             width=47)
+        self.key_policy_combo.pack(fill='x', pady=2)
+        ttk.Label(policy_row,
+                 text=" · ".join(f"{name}: {label}" for name, label in KEY_POLICIES.items()) +
+                      " (use zero_padded:N para N dígitos)",
+                 font=('TkDefaultFont', 8), foreground="gray", wraplength=380).pack(anchor='w')
+        
         # Ejemplo práctico
         example_frame = ttk.Frame(self.mapping_options_frame)
         example_frame.pack(fill='x', pady=(10, 0))
@@ -409,6 +424,7 @@ class ColumnConfigDialog:
             self.mapping_key_column_var.set(config.mapping_key_column)
         if config.mapping_value_column:
             self.mapping_value_column_var.set(config.mapping_value_column)
+        self.mapping_key_policy_var.set(getattr(config, 'mapping_key_policy', None) or "text")
         
         # Actualizar estados de los widgets después de cargar
         self._toggle_numeric_options()
@@ -439,6 +455,13 @@ class ColumnConfigDialog:
                 messagebox.showerror("Error", "El ancho debe ser un número entero")
                 return False
         
+        # Validar política de normalización de claves
+        policy_name, _, policy_width = self.mapping_key_policy_var.get().strip().partition(':')
+        if self.is_mapping_enabled_var.get() and (
+                (policy_name or "text") not in KEY_POLICIES or (policy_width and not policy_width.isdigit())):
+            messagebox.showerror("Error", f"Política de clave no válida: {self.mapping_key_policy_var.get()}")
+            return False
+        
         # Validar número inicial para generador numérico
         if self.is_numeric_generator_var.get():
             try:
@@ -478,7 +501,8 @@ class ColumnConfigDialog:
                 numeric_grouping_columns=grouping_columns,  # CORREGIDO: Incluir columnas de agrupación
                 mapping_source=self.mapping_source_var.get().strip() or None if self.is_mapping_enabled_var.get() else None,
                 mapping_key_column=self.mapping_key_column_var.get().strip() or None if self.is_mapping_enabled_var.get() else None,
-                mapping_value_column=self.mapping_value_column_var.get().strip() or None if self.is_mapping_enabled_var.get() else None
+                mapping_value_column=self.mapping_value_column_var.get().strip() or None if self.is_mapping_enabled_var.get() else None,
+                mapping_key_policy=self.mapping_key_policy_var.get().strip() or "text"
             )
             
             self.dialog.destroy()
@@ -18,6 +18,8 @@ class ColumnFrame(ttk.Frame):
         
         self.source_columns: List[str] = []
         self.selected_columns: Dict[str, tk.BooleanVar] = {}
+        self.edit_buttons: List[ttk.Button] = []  # Botones que modifican la configuración
+        self.editing_enabled = True
         
         self._create_widgets()
         
@@ -55,8 +57,10 @@ class ColumnFrame(ttk.Frame):
                   command=self._select_all_columns).pack(side='left', padx=(0, 5))
         ttk.Button(controls_frame, text="Deseleccionar Todo", 
                   command=self._deselect_all_columns).pack(side='left', padx=5)
-        ttk.Button(controls_frame, text="Agregar Seleccionadas", 
-                  command=self._add_selected_columns).pack(side='right')
+        add_btn = ttk.Button(controls_frame, text="Agregar Seleccionadas", 
+                             command=self._add_selected_columns)
+        add_btn.pack(side='right')
+        self.edit_buttons.append(add_btn)
         
         # Lista de columnas con checkboxes
         list_frame = ttk.Frame(source_frame)
@@ -93,21 +97,21 @@ class ColumnFrame(ttk.Frame):
         controls_frame = ttk.Frame(dest_frame)
         controls_frame.pack(fill='x', pady=(0, 10))
         
-        ttk.Button(controls_frame, text="Nueva Columna", 
-                  command=self._add_new_column).pack(side='left', padx=(0, 5))
-        ttk.Button(controls_frame, text="Editar", 
-                  command=self._edit_selected_column).pack(side='left', padx=5)
-        ttk.Button(controls_frame, text="Eliminar", 
-                  command=self._remove_selected_column).pack(side='left', padx=5)
+        for text, command, padx in (("Nueva Columna", self._add_new_column, (0, 5)),
+                                    ("Editar", self._edit_selected_column, 5),
+                                    ("Eliminar", self._remove_selected_column, 5)):
+            button = ttk.Button(controls_frame, text=text, command=command)
+            button.pack(side='left', padx=padx)
+            self.edit_buttons.append(button)
         
         # Controles de orden
         order_frame = ttk.Frame(controls_frame)
         order_frame.pack(side='right')
         
-        ttk.Button(order_frame, text="↑", width=3,
-                  command=self._move_column_up).pack(side='left', padx=2)
-        ttk.Button(order_frame, text="↓", width=3,
-                  command=self._move_column_down).pack(side='left', padx=2)
+        for text, command in (("↑", self._move_column_up), ("↓", self._move_column_down)):
+            button = ttk.Button(order_frame, text=text, width=3, command=command)
+            button.pack(side='left', padx=2)
+            self.edit_buttons.append(button)
         
         # Treeview para columnas destino
         tree_frame = ttk.Frame(dest_frame)
@@ -136,7 +140,13 @@ class ColumnFrame(ttk.Frame):
         tree_scrollbar.pack(side='right', fill='y')
         
         # Bind eventos
-        self.dest_tree.bind('<Double-1>', lambda e: self._edit_selected_column())
+        self.dest_tree.bind('<Double-1>', lambda e: self._edit_selected_column() if self.editing_enabled else None)
+        
+    def set_editing_enabled(self, enabled: bool):
+        """Habilitar o bloquear los cambios de configuración (se bloquean mientras se carga la fuente)."""
+        self.editing_enabled = enabled
+        for button in self.edit_buttons:
+            button.configure(state='normal' if enabled else 'disabled')
         
     def update_source_columns(self, columns: List[str]):
         """Actualizar lista de columnas fuente."""
@@ -106,6 +106,10 @@ class ExportFrame(ttk.Frame):
         ttk.Checkbutton(options_frame, text="Crear copia de seguridad", 
                        variable=self.create_backup).pack(anchor='w')
         
+        self.include_mapping_report = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options_frame, text="Incluir hoja de reporte de mapeo (claves faltantes)", 
+                       variable=self.include_mapping_report).pack(anchor='w')
+        
         # Límites
         limits_frame = ttk.LabelFrame(second_row, text="Límites", padding=10)
         limits_frame.pack(side='right', fill='y', padx=(10, 0))
@@ -491,7 +495,8 @@ class ExportFrame(ttk.Frame):
                 'auto_adjust_columns': self.auto_adjust_columns.get(),
                 'apply_formatting': self.apply_formatting.get(),
                 'create_backup': self.create_backup.get(),
-                'max_rows': self.max_rows.get()
+                'max_rows': self.max_rows.get(),
+                'include_mapping_report': self.include_mapping_report.get()
             }
             
             # Iniciar exportación
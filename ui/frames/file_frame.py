@@ -1,23 +1,38 @@
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
-from typing import Callable, Optional
+from tkinter import ttk, filedialog, messagebox, simpledialog
+from typing import Callable, List, Optional, Union
 import pandas as pd
+from pathlib import Path
 
+from core.background_loader import BackgroundLoader
 from core.file_manager import FileManager
 from config.constants import SUPPORTED_FORMATS
+from core.sqlite_reader import is_sqlite
 
 class FileFrame(ttk.Frame):
     """Frame para gestión de archivos Excel."""
     
+    ALL_SHEETS = "(Todas las hojas)"
+    POLL_INTERVAL_MS = 100  # Frecuencia con que se revisa la carga en segundo plano
+    
     def __init__(self, parent, file_manager: FileManager, 
-                 on_source_loaded: Callable, on_base_loaded: Callable):
+                 on_source_loaded: Callable, on_base_loaded: Callable,
+                 on_loading_changed: Optional[Callable] = None):
         super().__init__(parent)
         self.file_manager = file_manager
         self.on_source_loaded = on_source_loaded
         self.on_base_loaded = on_base_loaded
+        self.on_loading_changed = on_loading_changed  # Avisa al empezar y terminar una carga
         
         self.source_file_var = tk.StringVar()
         self.base_file_var = tk.StringVar()
+        self.source_sheet_var = tk.StringVar()
+        self.source_progress_var = tk.DoubleVar()
+        self.source_status_var = tk.StringVar()
+        self.source_files: List[str] = []  # Archivos de la fuente cargada (varios si se combinan)
+        
+        # El archivo fuente se carga en un hilo para que la ventana siga respondiendo
+        self.source_loader = BackgroundLoader()
         
         self._create_widgets()
         
@@ -65,6 +80,36 @@ class FileFrame(ttk.Frame):
                                     command=self._select_source_file)
         self.source_btn.pack(side='right', padx=(10, 0))
         
+        self.source_files_btn = ttk.Button(file_frame, text="Varios...",
+                                           command=self._select_source_files)
+        self.source_files_btn.pack(side='right', padx=(10, 0))
+        
+        # Selección de hoja
+        sheet_frame = ttk.Frame(source_frame)
+        sheet_frame.pack(fill='x', pady=(0, 10))
+        
+        ttk.Label(sheet_frame, text="Hoja:").pack(side='left')
+        self.source_sheet_combo = ttk.Combobox(sheet_frame, textvariable=self.source_sheet_var,
+                                               state='readonly', width=30)
+        self.source_sheet_combo.pack(side='left', fill='x', expand=True, padx=(10, 0))
+        self.source_sheet_combo.bind('<<ComboboxSelected>>', self._on_source_sheet_selected)
+        self.source_query_btn = ttk.Button(sheet_frame, text="Consulta SQL...",
+                                           command=self._enter_source_query)
+        self.source_query_btn.pack(side='right', padx=(10, 0))
+        
+        # Avance de la carga
+        progress_frame = ttk.Frame(source_frame)
+        progress_frame.pack(fill='x', pady=(0, 5))
+        
+        self.source_progress_bar = ttk.Progressbar(progress_frame, variable=self.source_progress_var,
+                                                   length=200)
+        self.source_progress_bar.pack(side='left', fill='x', expand=True)
+        self.source_cancel_btn = ttk.Button(progress_frame, text="Cancelar", state='disabled',
+                                            command=self._cancel_source_load)
+        self.source_cancel_btn.pack(side='right', padx=(10, 0))
+        ttk.Label(source_frame, textvariable=self.source_status_var,
+                  foreground='gray').pack(anchor='w')
+        
         # Información del archivo
         self.source_info_frame = ttk.LabelFrame(source_frame, text="Información del Archivo")
         self.source_info_frame.pack(fill='both', expand=True, pady=(10, 0))
@@ -123,29 +168,242 @@ class FileFrame(ttk.Frame):
         """Seleccionar archivo fuente."""
         file_path = filedialog.askopenfilename(
             title="Seleccionar Archivo Fuente",
-            filetypes=[("Archivos Excel", "*.xlsx *.xls"), ("Todos los archivos", "*.*")]
+            filetypes=[("Archivos Excel", "*.xlsx *.xls"), ("CSV, Parquet y JSON Lines", "*.csv *.parquet *.jsonl"),
+                       ("Bases de datos SQLite", "*.sqlite *.sqlite3 *.db"), ("Todos los archivos", "*.*")]
         )
         
         if file_path:
-            try:
-                # Cargar archivo
-                df_info = self.file_manager.load_source_file(file_path)
-                
-                # Actualizar UI
-                self.source_file_var.set(file_path)
-                self._update_source_info(df_info)
-                
-                # Notificar callback
-                self.on_source_loaded(file_path, df_info)
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Error al cargar archivo fuente:\n{str(e)}")
+            self._load_source(file_path)
+    
+    def _select_source_files(self):
+        """Seleccionar varios archivos fuente con los mismos encabezados para combinarlos."""
+        file_paths = filedialog.askopenfilenames(
+            title="Seleccionar Archivos Fuente (mismos encabezados)",
+            filetypes=[("Archivos Excel", "*.xlsx *.xls"), ("CSV, Parquet y JSON Lines", "*.csv *.parquet *.jsonl"),
+                       ("Bases de datos SQLite", "*.sqlite *.sqlite3 *.db"), ("Todos los archivos", "*.*")]
+        )
+        
+        if file_paths:
+            self._load_source(list(file_paths) if len(file_paths) > 1 else file_paths[0])
+    
+    def _load_source(self, file_path: Union[str, List[str]], sheet_name: Optional[str] = None):
+        """
+        Cargar una hoja (o todas las hojas) del archivo fuente en segundo plano.
+        
+        Primero se muestran las primeras filas (lectura rápida con nrows) y después
+        la información del archivo completo. Con una lista de archivos se combinan como
+        una sola fuente que se recorre por lotes (la misma hoja de cada archivo).
+        """
+        if self.source_loader.is_running():
+            messagebox.showwarning("Carga en curso", "Espere a que termine o cancele la carga actual")
+            return
+        
+        def task(loader: BackgroundLoader):
+            preview_sheet = None if sheet_name == self.ALL_SHEETS else sheet_name
+            first_file = file_path[0] if isinstance(file_path, list) else file_path
+            loader.publish('preview', self.file_manager.read_source_preview(first_file, preview_sheet))
+            if isinstance(file_path, list):
+                # Con todas las hojas, cada fila indica también la hoja de la que proviene
+                if sheet_name == self.ALL_SHEETS:
+                    sheet_names, sheet_column = self.file_manager.get_sheet_names(first_file), "Hoja"
+                else:
+                    sheet_names, sheet_column = ([sheet_name] if sheet_name else None), None
+                return self.file_manager.load_source_files(file_path, sheet_names, sheet_column=sheet_column,
+                                                           progress_callback=loader.report_progress,
+                                                           cancel_event=loader.cancel_event)
+            if sheet_name == self.ALL_SHEETS:
+                return self.file_manager.load_source_sheets(file_path, progress_callback=loader.report_progress,
+                                                            cancel_event=loader.cancel_event)
+            return self.file_manager.load_source_file(file_path, sheet_name, progress_callback=loader.report_progress,
+                                                      cancel_event=loader.cancel_event)
+        
+        self._set_source_loading(True)
+        self.source_progress_var.set(0)
+        self.source_status_var.set("Leyendo vista previa...")
+        self.source_loader.start(task)
+        self.after(self.POLL_INTERVAL_MS, self._poll_source_load, file_path, sheet_name)
+    
+    def _poll_source_load(self, file_path: Union[str, List[str]], sheet_name: Optional[str]):
+        """Atender los eventos de la carga en segundo plano desde el hilo de la interfaz."""
+        for kind, payload in self.source_loader.poll():
+            if kind in ('done', 'cancelled', 'error'):
+                # El evento final es lo último que hace el hilo: esperar a que termine para
+                # que is_running() ya sea False al notificar a la ventana principal
+                self.source_loader.wait()
+            if kind == 'preview':
+                self._show_source_preview(file_path, sheet_name, payload)
+            elif kind == 'progress':
+                percent, message = payload
+                self.source_progress_var.set(percent)
+                self.source_status_var.set(message)
+            elif kind == 'done':
+                self._finish_source_load(file_path, sheet_name, payload)
+            elif kind == 'cancelled':
+                self._set_source_loading(False)
+                self.source_progress_var.set(0)
+                self.source_status_var.set("Carga cancelada")
+                self._restore_source_info()
+            elif kind == 'error':
+                self._set_source_loading(False)
+                self.source_status_var.set("")
+                self._restore_source_info()
+                messagebox.showerror("Error", f"Error al cargar archivo fuente:\n{str(payload)}")
+            if kind in ('done', 'cancelled', 'error'):
+                return
+        
+        # El hilo siempre termina publicando 'done', 'cancelled' o 'error'
+        self.after(self.POLL_INTERVAL_MS, self._poll_source_load, file_path, sheet_name)
+    
+    def _set_source_loading(self, loading: bool):
+        """Habilitar el botón de cancelar (y bloquear los de carga) mientras se carga."""
+        self.source_cancel_btn.configure(state='normal' if loading else 'disabled')
+        self.source_btn.configure(state='disabled' if loading else 'normal')
+        self.source_files_btn.configure(state='disabled' if loading else 'normal')
+        self.source_sheet_combo.configure(state='disabled' if loading else 'readonly')
+        self.source_query_btn.configure(state='disabled' if loading else 'normal')
+        if self.on_loading_changed:
+            self.on_loading_changed(loading)
+    
+    def reload_source_columns(self, columns: List, on_reloaded: Optional[Callable] = None) -> bool:
+        """
+        Releer en segundo plano la hoja fuente con las columnas indicadas (carga proyectada).
+        
+        on_reloaded recibe la información del archivo releído. Devuelve False si ya hay
+        una carga en curso.
+        """
+        if self.source_loader.is_running():
+            return False
+        
+        def task(loader: BackgroundLoader):
+            return self.file_manager.reload_source_columns(columns, progress_callback=loader.report_progress,
+                                                           cancel_event=loader.cancel_event)
+        
+        self._set_source_loading(True)
+        self.source_progress_var.set(0)
+        self.source_status_var.set(f"Releyendo {len(columns)} columnas...")
+        self.source_loader.start(task)
+        self.after(self.POLL_INTERVAL_MS, self._poll_source_reload, on_reloaded)
+        return True
+    
+    def _poll_source_reload(self, on_reloaded: Optional[Callable]):
+        """Atender los eventos de la relectura de columnas desde el hilo de la interfaz."""
+        for kind, payload in self.source_loader.poll():
+            if kind in ('done', 'cancelled', 'error'):
+                self.source_loader.wait()
+                self._set_source_loading(False)
+            if kind == 'progress':
+                percent, message = payload
+                self.source_progress_var.set(percent)
+                self.source_status_var.set(message)
+            elif kind == 'done':
+                self.source_progress_var.set(100)
+                self.source_status_var.set("")
+                self._update_source_info(payload)
+                if on_reloaded:
+                    on_reloaded(payload)
+            elif kind == 'cancelled':
+                self.source_progress_var.set(0)
+                self.source_status_var.set("Relectura cancelada")
+            elif kind == 'error':
+                self.source_status_var.set("")
+                messagebox.showerror("Error", f"Error al releer el archivo fuente:\n{str(payload)}")
+            if kind in ('done', 'cancelled', 'error'):
+                return
+        
+        self.after(self.POLL_INTERVAL_MS, self._poll_source_reload, on_reloaded)
+    
+    def _cancel_source_load(self):
+        """Pedir la cancelación de la carga en curso."""
+        self.source_loader.cancel()
+        self.source_status_var.set("Cancelando...")
+    
+    def _show_source_preview(self, file_path: Union[str, List[str]], sheet_name: Optional[str], preview_info: dict):
+        """Mostrar las primeras filas mientras continúa la carga completa."""
+        sheets = preview_info['sheets']
+        self.source_sheet_combo['values'] = sheets + ([self.ALL_SHEETS] if len(sheets) > 1 else [])
+        self.source_sheet_var.set(sheet_name or preview_info['active_sheet'])
+        
+        info_text = f"""📊 VISTA PREVIA (cargando el archivo completo...)
+
+📁 Archivo: {preview_info['file_name']}
+📋 Hoja: {preview_info['active_sheet']}
+• Filas leídas: {preview_info['preview_rows']:,}
+
+📋 COLUMNAS:
+"""
+        for i, col in enumerate(preview_info['columns'], 1):
+            info_text += f"{i:2d}. {col}\n"
+        info_text += "\n🔎 PRIMERAS FILAS:\n"
+        info_text += preview_info['preview'].head(10).to_string(max_colwidth=20)
+        self._set_text_content(self.source_info_text, info_text)
+        self.source_status_var.set(f"Vista previa lista ({preview_info['load_time'] or 0:.2f} s); cargando...")
+    
+    def _finish_source_load(self, file_path: Union[str, List[str]], sheet_name: Optional[str], df_info: dict):
+        """Mostrar la información del archivo cargado y notificar a la ventana principal."""
+        self._set_source_loading(False)
+        self.source_progress_var.set(100)
+        self.source_status_var.set("")
+        
+        self.source_files = list(file_path) if isinstance(file_path, list) else [file_path]
+        self.source_file_var.set(self._source_label(df_info) if len(self.source_files) > 1 else file_path)
+        if isinstance(file_path, list):
+            file_path = self.source_files[0]
+        sheets = df_info['sheets']
+        self.source_sheet_combo['values'] = sheets + ([self.ALL_SHEETS] if len(sheets) > 1 else [])
+        self.source_sheet_var.set(sheet_name or df_info['active_sheet'])
+        self._update_source_info(df_info)
+        
+        # Notificar callback
+        self.on_source_loaded(file_path, df_info)
+    
+    def _restore_source_info(self):
+        """Volver a mostrar el archivo fuente que sigue cargado (si lo hay) tras cancelar o fallar."""
+        df_info = self.file_manager.get_source_info()
+        if df_info:
+            self.source_files = df_info['source_files']
+            self.source_file_var.set(self._source_label(df_info) if len(self.source_files) > 1
+                                     else df_info['file_path'])
+            sheets = df_info['sheets']
+            self.source_sheet_combo['values'] = sheets + ([self.ALL_SHEETS] if len(sheets) > 1 else [])
+            self.source_sheet_var.set(df_info['active_sheet'])
+            self._update_source_info(df_info)
+        else:
+            self.source_files = []
+            self.source_sheet_combo['values'] = []
+            self.source_sheet_var.set("")
+            self._set_text_content(self.source_info_text, "")
+    
+    def _source_label(self, df_info: dict) -> str:
+        """Texto del campo de archivo para una fuente de varios archivos."""
+        return f"{df_info['file_name']}: " + ", ".join(Path(path).name for path in df_info['source_files'])
+    
+    def _on_source_sheet_selected(self, event=None):
+        """Recargar el archivo fuente (o todos los archivos combinados) con la hoja seleccionada."""
+        if len(self.source_files) > 1:
+            self._load_source(self.source_files, self.source_sheet_var.get())
+        elif self.source_files:
+            self._load_source(self.source_files[0], self.source_sheet_var.get())
+    
+    def _enter_source_query(self):
+        """Cargar como datos fuente el resultado de una consulta sobre la base de datos SQLite."""
+        file_path = self.source_files[0] if len(self.source_files) == 1 else None
+        if not file_path or not is_sqlite(file_path):
+            messagebox.showinfo("Consulta SQL", "Seleccione primero una base de datos SQLite como archivo fuente")
+            return
+        
+        query = simpledialog.askstring("Consulta SQL",
+                                       "Consulta SELECT sobre la base de datos\n"
+                                       "(las tablas y vistas también se pueden elegir como hojas):",
+                                       initialvalue=self.source_sheet_var.get(), parent=self)
+        if query and query.strip():
+            self._load_source(file_path, query.strip())
                 
     def _select_base_file(self):
         """Seleccionar archivo base."""
         file_path = filedialog.askopenfilename(
             title="Seleccionar Archivo Base",
-            filetypes=[("Archivos Excel", "*.xlsx *.xls"), ("Todos los archivos", "*.*")]
+            filetypes=[("Archivos Excel", "*.xlsx *.xls"), ("CSV, Parquet y JSON Lines", "*.csv *.parquet *.jsonl"),
+                       ("Bases de datos SQLite", "*.sqlite *.sqlite3 *.db"), ("Todos los archivos", "*.*")]
         )
         
         if file_path:
@@ -169,6 +427,14 @@ class FileFrame(ttk.Frame):
         self.file_manager.clear_base_file()
         self._clear_base_info()
         
+    def _memory_text(self, df_info: dict) -> str:
+        """Memoria usada y, si se optimizaron tipos, la memoria antes de optimizar"""
+        report = df_info.get('dtype_report') or {}
+        if not report.get('conversions'):
+            return df_info['memory_usage']
+        return (f"{df_info['memory_usage']} (antes {report['memory_before_mb']:.2f} MB, "
+                f"{len(report['conversions'])} columnas optimizadas)")
+        
     def _update_source_info(self, df_info: dict):
         """Actualizar información del archivo fuente."""
         info_text = f"""📊 INFORMACIÓN DEL ARCHIVO FUENTE
@@ -181,10 +447,24 @@ class FileFrame(ttk.Frame):
 📊 DATOS:
 • Filas: {df_info['rows']:,}
 • Columnas: {df_info['columns_count']}
-• Memoria: {df_info['memory_usage']}
-
-📋 COLUMNAS:
+• Memoria: {self._memory_text(df_info)}
+• Carga: {df_info.get('load_time') or 0:.2f} s ({df_info.get('reader_engine') or '-'})
 """
+        if len(df_info.get('source_files', [])) > 1:
+            info_text += f"• Modo: por lotes ({len(df_info['source_files'])} archivos combinados)\n"
+        elif df_info.get('streaming'):
+            info_text += "• Modo: por lotes (archivo mayor que el umbral de streaming; filas estimadas)\n"
+        if df_info.get('projected'):
+            info_text += f"• Columnas cargadas: {len(df_info['loaded_columns'])} (carga proyectada)\n"
+        schema_report = df_info.get('schema_report') or {}
+        if schema_report.get('columns'):
+            info_text += (f"• Tipos declarados: {len(schema_report['columns'])} columnas, "
+                          f"{schema_report['invalid_total']:,} celdas no conformes\n")
+            for col, rows in schema_report['invalid_rows'].items():
+                shown = ', '.join(str(row) for row in rows[:10])
+                more = '...' if schema_report['invalid_counts'][col] > 10 else ''
+                info_text += f"   ⚠️ {col}: filas {shown}{more}\n"
+        info_text += "\n📋 COLUMNAS:\n"
         
         for i, col in enumerate(df_info['columns'], 1):
             info_text += f"{i:2d}. {col}\n"
@@ -203,7 +483,8 @@ class FileFrame(ttk.Frame):
 📊 DATOS:
 • Filas: {df_info['rows']:,}
 • Columnas: {df_info['columns_count']}
-• Memoria: {df_info['memory_usage']}
+• Memoria: {self._memory_text(df_info)}
+• Carga: {df_info.get('load_time') or 0:.2f} s ({df_info.get('reader_engine') or '-'})
 
 📋 COLUMNAS:
 """
@@ -10,8 +10,12 @@ import pandas as pd
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import logging
+import uuid
 from datetime import datetime
 
+from core.readers import probe_workbook, read_excel_file
+from core.snapshot import split_snapshot, write_snapshot
+
 class UtilitiesFrame(ttk.Frame):
     """Frame para utilidades de archivos Excel"""
     
@@ -236,15 +240,14 @@ class UtilitiesFrame(ttk.Frame):
     def load_file_info(self, file_path: str):
         """Cargar información del archivo"""
         try:
-            # Leer información del archivo
-            df = pd.read_excel(file_path, nrows=1)  # Solo leer encabezados
-            total_rows = len(pd.read_excel(file_path))
+            # Leer solo dimensiones y encabezados de la primera hoja
+            sheet_info = self._probe_first_sheet(file_path)
             
             file_size = Path(file_path).stat().st_size / (1024 * 1024)  # MB
             
             info_text = f"Archivo: {Path(file_path).name}\n"
-            info_text += f"Filas: {total_rows:,}\n"
-            info_text += f"Columnas: {len(df.columns)}\n"
+            info_text += f"Filas: {sheet_info['rows']:,}\n"
+            info_text += f"Columnas: {sheet_info['columns']}\n"
             info_text += f"Tamaño: {file_size:.2f} MB"
             
             self.file_info_label.config(text=info_text)
@@ -259,20 +262,28 @@ class UtilitiesFrame(ttk.Frame):
     def load_duplicates_file_info(self, file_path: str):
         """Cargar información del archivo para duplicados"""
         try:
-            # Leer información del archivo
-            df = pd.read_excel(file_path, nrows=1)  # Solo leer encabezados
-            total_rows = len(pd.read_excel(file_path))
+            # Leer solo dimensiones y encabezados de la primera hoja
+            sheet_info = self._probe_first_sheet(file_path)
             
-            info_text = f"Archivo: {Path(file_path).name} | Filas: {total_rows:,} | Columnas: {len(df.columns)}"
+            info_text = (f"Archivo: {Path(file_path).name} | Filas: {sheet_info['rows']:,} | "
+                         f"Columnas: {sheet_info['columns']}")
             self.dup_file_info_label.config(text=info_text)
             
             # Cargar columnas disponibles
-            self.load_available_columns(df.columns.tolist())
+            self.load_available_columns(sheet_info['column_names'])
             
         except Exception as e:
             self.logger.error(f"Error cargando información del archivo: {e}")
             messagebox.showerror("Error", f"Error al cargar el archivo: {e}")
     
+    def _probe_first_sheet(self, file_path: str) -> Dict[str, Any]:
+        """Filas, columnas y encabezados de la primera hoja sin cargar el archivo"""
+        probe = probe_workbook(file_path, sheet_names=[0])
+        sheet_info = probe['sheets'][probe['sheet_names'][0]]
+        if 'error' in sheet_info:
+            raise ValueError(sheet_info['error'])
+        return sheet_info
+    
     def load_available_columns(self, columns: List[str]):
         """Cargar columnas disponibles en la lista"""
         self.available_columns_listbox.delete(0, tk.END)
@@ -292,9 +303,8 @@ class UtilitiesFrame(ttk.Frame):
                 messagebox.showerror("Error", "El número de filas por archivo debe ser mayor a 0")
                 return
             
-            # Leer archivo para obtener total de filas
-            df = pd.read_excel(file_path)
-            total_rows = len(df)
+            # Obtener el total de filas de las dimensiones de la hoja
+            total_rows = self._probe_first_sheet(file_path)['rows']
             
             # Calcular número de archivos
             num_files = (total_rows + rows_per_file - 1) // rows_per_file
@@ -331,42 +341,22 @@ class UtilitiesFrame(ttk.Frame):
             self.status_var.set("Dividiendo archivo...")
             self.progress_var.set(0)
             
-            # Leer archivo completo
-            df = pd.read_excel(file_path)
-            total_rows = len(df)
-            num_files = (total_rows + rows_per_file - 1) // rows_per_file
-            
-            # Crear directorio de exportación
-            export_dir = Path(self.settings.default_export_dir)
-            export_dir.mkdir(exist_ok=True)
+            # Leer el archivo y dejar una copia en disco que cada proceso lee solo por su rango de filas
+            df, _ = read_excel_file(file_path, self.settings.reader_engine)
+            snapshot_path = Path(self.settings.snapshot_dir) / f"division_{uuid.uuid4().hex[:8]}.arrow"
+            snapshot = write_snapshot(df, snapshot_path)
+            del df
             
-            created_files = []
-            
-            for i in range(num_files):
-                # Actualizar progreso
-                progress = (i / num_files) * 100
-                self.progress_var.set(progress)
-                self.status_var.set(f"Procesando archivo {i + 1} de {num_files}...")
+            def report_progress(done: int, total: int):
+                self.progress_var.set(done / total * 100)
+                self.status_var.set(f"Archivos escritos: {done} de {total}")
                 self.update()
-                
-                # Calcular rango de filas
-                start_row = i * rows_per_file
-                end_row = min((i + 1) * rows_per_file, total_rows)
-                
-                # Extraer datos para este archivo
-                file_data = df.iloc[start_row:end_row].copy()
-                
-                # Generar nombre de archivo
-                if num_files == 1:
-                    output_filename = f"{prefix}.xlsx"
-                else:
-                    output_filename = f"{prefix}_parte_{i + 1:03d}_de_{num_files:03d}.xlsx"
-                
-                output_path = export_dir / output_filename
-                
-                # Guardar archivo
-                file_data.to_excel(output_path, index=False)
-                created_files.append(output_filename)
+            
+            try:
+                created_files = split_snapshot(snapshot, rows_per_file, self.settings.default_export_dir, prefix,
+                                               self.settings.max_split_workers, report_progress)
+            finally:
+                Path(snapshot['path']).unlink(missing_ok=True)
             
             # Completar progreso
             self.progress_var.set(100)
@@ -1,11 +1,11 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import logging
-from typing import Optional
+from typing import Callable, Optional
 import pandas as pd
 
 from config.settings import AppSettings
-from core import FileManager, ColumnManager, NumericGenerator, MappingManager, ExportManager
+from core import FileManager, ColumnManager, NumericGenerator, MappingManager, ExportManager, DiskCache, MappingRegistry
 from .frames import FileFrame, ColumnFrame, ExportFrame, UtilitiesFrame
 
 class MainWindow:
@@ -19,7 +19,11 @@ class MainWindow:
         self.file_manager = FileManager(settings)  # Requires settings
         self.column_manager = ColumnManager()      # No parameters
         self.numeric_generator = NumericGenerator()  # No parameters
-        self.mapping_manager = MappingManager()    # No parameters
+        mapping_cache = None
+        if settings.mapping_cache_enabled:
+            mapping_cache = DiskCache(settings.mapping_cache_dir, settings.mapping_cache_max_mb)
+        self.mapping_manager = MappingManager(cache=mapping_cache)
+        self.mapping_registry = MappingRegistry(self.mapping_manager)
         self.export_manager = ExportManager(settings)  # Requires settings
         
         # Variables de estado
@@ -68,7 +72,8 @@ class MainWindow:
             self.notebook, 
             self.file_manager,
             on_source_loaded=self._on_source_file_loaded,
-            on_base_loaded=self._on_base_file_loaded
+            on_base_loaded=self._on_base_file_loaded,
+            on_loading_changed=self._on_source_loading_changed
         )
         self.notebook.add(self.file_frame, text="📁 Archivos")
         
@@ -116,16 +121,39 @@ class MainWindow:
         
         self._update_status(f"Archivo fuente cargado: {df_info['rows']} filas, {df_info['columns_count']} columnas")
         
+        # Aplicar la configuración de columnas a la fuente recién cargada
+        try:
+            self._sync_source_projection()
+        except Exception as e:
+            self._update_status(f"Error releyendo el archivo fuente: {e}")
+        
+    def _on_source_loading_changed(self, loading: bool):
+        """Callback al empezar o terminar la carga del archivo fuente."""
+        # El hilo de carga modifica el gestor de archivos: la configuración no cambia mientras tanto
+        self.column_frame.set_editing_enabled(not loading)
+        
     def _on_base_file_loaded(self, file_path: str, df_info: dict):
         """Callback cuando se carga el archivo base."""
         self.base_file_path = file_path
         self.logger.info(f"Archivo base cargado: {file_path}")
         
-        self._update_status(f"Archivo base cargado: {df_info['rows']} filas, {df_info['columns_count']} columnas")
+        self.mapping_manager.set_base_dataframe(self.file_manager.base_df, file_path)
+        self.mapping_registry.set_base(self.file_manager.base_df, file_path)
+        
+        status = f"Archivo base cargado: {df_info['rows']} filas, {df_info['columns_count']} columnas"
+        base_delta = self.mapping_manager.get_base_delta()
+        if base_delta:
+            status += (f" ({base_delta['inserted_rows']} filas nuevas o modificadas, "
+                       f"{base_delta['deleted_rows']} eliminadas)")
+        self._update_status(status)
         
     def _on_column_config_changed(self, config_data: dict):
         """Callback cuando cambia la configuración de columnas."""
         self.logger.debug("Configuración de columnas actualizada")
+        try:
+            self._sync_source_projection()
+        except Exception as e:
+            self._update_status(f"Error releyendo el archivo fuente: {e}")
         self.export_frame.update_column_config(config_data)
         
         # Actualizar también el mapeo dinámico en el export frame
@@ -141,19 +169,42 @@ class MainWindow:
             # Validar que hay archivo fuente
             if not self.file_manager.source_df is not None:
                 raise ValueError("No se ha cargado un archivo fuente")
+            if self.file_frame.source_loader.is_running():
+                raise ValueError("Espere a que termine la carga del archivo fuente")
+            
+            # Asegurar que están cargadas todas las columnas fuente que usa la configuración;
+            # si hay que releer el archivo, la exportación sigue al terminar la relectura
+            if not self._sync_source_projection(lambda: self._on_export_requested(export_config)):
+                return
             
             # Crear mapeo dinámico desde las columnas configuradas
             mapping_config = self._create_mapping_from_columns()
             
-            # Realizar exportación
-            result = self.export_manager.export_excel(
-                source_data=self.file_manager.get_source_data(),
-                column_configs=self.column_manager.get_all_columns(),
-                numeric_config=self.numeric_generator.get_config(),
-                mapping_config=mapping_config,
-                export_config=export_config,
-                progress_callback=self._update_progress
-            )
+            # Realizar exportación (por lotes si el archivo fuente supera el umbral de streaming)
+            if self.file_manager.source_streaming:
+                result = self.export_manager.export_excel_stream(
+                    source_chunks=self.file_manager.iter_source_chunks(),
+                    column_configs=self.column_manager.get_all_columns(),
+                    mapping_config=mapping_config,
+                    export_config=export_config,
+                    progress_callback=self._update_progress,
+                    total_rows=self.file_manager.get_source_info().get('rows')
+                )
+            else:
+                result = self.export_manager.export_excel(
+                    source_data=self.file_manager.get_source_data(),
+                    column_configs=self.column_manager.get_all_columns(),
+                    numeric_config=self.numeric_generator.get_config(),
+                    mapping_config=mapping_config,
+                    export_config=export_config,
+                    progress_callback=self._update_progress
+                )
+            
+            # Resumen de claves sin mapeo
+            mapping_summary = ""
+            total_misses = sum(stats.get('misses', 0) for stats in result.get('mapping_stats', {}).values())
+            if total_misses:
+                mapping_summary = f"\n\nValores sin mapeo: {total_misses:,}"
             
             # Actualizar estado final
             if result.get('files_created', 1) > 1:
@@ -163,13 +214,15 @@ class MainWindow:
                     f"Se crearon {result['files_created']} archivos exitosamente:\n\n" +
                     f"Archivo principal: {result['file_path']}\n" +
                     f"Filas procesadas: {result['rows_processed']:,}\n\n" +
-                    f"Todos los archivos:\n" + "\n".join(result.get('all_files', []))
+                    f"Todos los archivos:\n" + "\n".join(result.get('all_files', [])) +
+                    mapping_summary
                 )
             else:
                 self._update_status(f"Exportación completada: {result['file_path']}")
                 messagebox.showinfo(
                     "Exportación Exitosa",
-                    f"Archivo exportado exitosamente:\n{result['file_path']}\n\nFilas procesadas: {result['rows_processed']:,}"
+                    f"Archivo exportado exitosamente:\n{result['file_path']}\n\nFilas procesadas: {result['rows_processed']:,}" +
+                    mapping_summary
                 )
             
             self.progress_var.set(100)
@@ -179,39 +232,45 @@ class MainWindow:
             self._update_status(f"Error en exportación: {str(e)}")
             messagebox.showerror("Error de Exportación", str(e))
     
+    def _sync_source_projection(self, on_synced: Optional[Callable] = None) -> bool:
+        """
+        Pasar al gestor de archivos los tipos declarados (se validan sin releer) y releer
+        el archivo fuente si la configuración usa columnas que la carga proyectada no leyó.
+        
+        La relectura se hace en segundo plano con source_loader, como la carga inicial,
+        y on_synced se llama al terminar. Devuelve True si la fuente ya está sincronizada.
+        Durante una carga en segundo plano no se toca el gestor de archivos: la
+        sincronización se hace al terminar la carga (_on_source_file_loaded).
+        """
+        if self.file_frame.source_loader.is_running():
+            return False
+        self.file_manager.set_source_schema(self.column_manager.get_source_schema())
+        columns = self.column_manager.get_referenced_source_columns(self.file_manager.source_all_columns)
+        needed = self.file_manager.request_source_projection(columns)
+        if needed is None:
+            return True
+        
+        def on_reloaded(df_info: dict):
+            self._update_status(f"Archivo fuente releído: {len(needed)} columnas cargadas")
+            if on_synced:
+                on_synced()
+        
+        self.file_frame.reload_source_columns(needed, on_reloaded)
+        self._update_status("Releyendo el archivo fuente con las columnas de la configuración...")
+        return False
+        
     def _create_mapping_from_columns(self) -> dict:
         """Crear configuración de mapeo desde las columnas configuradas"""
-        mapping_config = {}
-        
         # Obtener datos del archivo base si está cargado
         if self.file_manager.base_df is None:
-            return mapping_config
-        
-        base_data = self.file_manager.base_df
-        
-        # Revisar cada columna configurada que tenga mapeo dinámico
-        for col_config in self.column_manager.get_all_columns():
-            if (hasattr(col_config, 'mapping_source') and col_config.mapping_source and 
-                hasattr(col_config, 'mapping_key_column') and col_config.mapping_key_column and 
-                hasattr(col_config, 'mapping_value_column') and col_config.mapping_value_column):
-                
-                # Verificar que las columnas existen en el archivo base
-                if (col_config.mapping_key_column in base_data.columns and 
-                    col_config.mapping_value_column in base_data.columns):
-                    
-                    # Crear diccionario de mapeo
-                    mapping_dict = {}
-                    for _, row in base_data.iterrows():
-                        key = str(row[col_config.mapping_key_column]).strip()
-                        value = row[col_config.mapping_value_column]
-                        
-                        if key and not pd.isna(key) and key != "":
-                            mapping_dict[key] = value
-                    
-                    # Guardar el mapeo usando la columna clave como identificador
-                    mapping_config[col_config.mapping_key_column] = mapping_dict
-                    
-                    self.logger.info(f"Mapeo creado para '{col_config.display_name}': {len(mapping_dict)} entradas")
+            return {}
+        
+        # El registro construye cada par (columna clave, columna valor) una sola vez
+        # y reutiliza los índices mientras el archivo base no cambie
+        mapping_config = self.mapping_registry.sync(self.column_manager.get_all_columns())
+        
+        stats = self.mapping_registry.get_statistics()
+        self.logger.info(f"Mapeos activos: {stats['entries']} (construidos: {stats['builds']}, reutilizados: {stats['reuses']})")
         
         return mapping_config
             
@@ -21,6 +21,10 @@ class FileProcessingError(ExcelBuilderError):
         super().__init__(message)
         self.file_path = file_path
 
+class LoadCancelledError(FileProcessingError):
+    """Carga de archivo cancelada por el usuario"""
+    pass
+
 class ConfigurationError(ExcelBuilderError):
     """Error en configuración"""
     pass
@@ -72,36 +72,33 @@ class ExcelHelper:
     
     @staticmethod
     def get_file_info(file_path: str) -> Dict[str, Any]:
-        """Obtener información detallada de un archivo Excel"""
+        """Obtener información detallada de un archivo Excel sin leer sus datos"""
+        from core.readers import probe_workbook
+
         try:
             path = Path(file_path)
-            excel_file = pd.ExcelFile(file_path)
+            probe = probe_workbook(file_path)
             
             info = {
                 'file_name': path.name,
                 'file_size': path.stat().st_size,
                 'file_size_mb': round(path.stat().st_size / (1024 * 1024), 2),
                 'modified_date': datetime.fromtimestamp(path.stat().st_mtime),
-                'sheet_count': len(excel_file.sheet_names),
-                'sheet_names': excel_file.sheet_names,
+                'sheet_count': len(probe['sheet_names']),
+                'sheet_names': probe['sheet_names'],
                 'sheets_info': {}
             }
             
-            # Información de cada hoja
-            for sheet_name in excel_file.sheet_names:
-                try:
-                    df = pd.read_excel(file_path, sheet_name=sheet_name, nrows=1)
-                    full_df = pd.read_excel(file_path, sheet_name=sheet_name)
-                    
-                    info['sheets_info'][sheet_name] = {
-                        'rows': len(full_df),
-                        'columns': len(full_df.columns),
-                        'column_names': full_df.columns.tolist()
-                    }
-                except Exception as e:
-                    info['sheets_info'][sheet_name] = {
-                        'error': str(e)
-                    }
+            # Información de cada hoja (dimensiones y encabezados)
+            for sheet_name, sheet_info in probe['sheets'].items():
+                if 'error' in sheet_info:
+                    info['sheets_info'][sheet_name] = {'error': sheet_info['error']}
+                    continue
+                info['sheets_info'][sheet_name] = {
+                    'rows': sheet_info['rows'],
+                    'columns': sheet_info['columns'],
+                    'column_names': sheet_info['column_names']
+                }
             
             return info
             
@@ -131,7 +128,7 @@ class ExcelHelper:
                 try:
                     pd.to_datetime(series.head(10), errors='raise')
                     type_mapping[column] = 'date'
-                except:
+                except Exception:
                     # Verificar si es booleano
                     unique_values = set(series.astype(str).str.lower())
                     bool_values = {'true', 'false', '1', '0', 'si', 'no', 'yes', 'no'}